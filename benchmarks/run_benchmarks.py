@@ -0,0 +1,289 @@
+"""Throughput benchmarks for ProjectilePy simulations and solvers.
+
+Run the suite and save the results:
+    python benchmarks/run_benchmarks.py run --output results.json
+
+Compare results against the stored baseline, exiting with a non-zero status if anything regressed:
+    python benchmarks/run_benchmarks.py compare benchmarks/baseline.json results.json
+
+Passing a single file to compare runs the suite and compares the fresh results against it.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+import projectilepy  # noqa: E402
+
+# Projectile used by the drag benchmarks, the Newtonian drag example from the README demos
+PROJECTILE = {"mass": 43, "drag_coefficient": 0.45, "cross_sectional_area": 0.1}
+# Time steps and launch velocities (a short and a long flight) swept by the simulation benchmarks
+TIME_STEPS = [1e-3, 5e-4, 1e-4]
+VELOCITIES = [150, 600]
+
+
+class CountingModel(projectilepy.model):
+    """A simulation object that counts the number of simulations run, for measuring solver cost."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.runs = 0
+
+    def run(self, *args, **kwargs):
+        self.runs += 1
+        return super().run(*args, **kwargs)
+
+
+def measure(function, repeat):
+    """Times a function, then runs it once more while tracing memory allocations.
+
+    Parameters
+    ----------
+    function : callable
+        The function to benchmark, which may return a dictionary of extra metrics to report.
+    repeat : int
+        The number of timed calls, of which the fastest is reported.
+
+    Returns
+    -------
+    result : dict
+        The fastest time in seconds, the peak traced memory in bytes, and any extra metrics.
+    """
+    times = []
+    extra = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extra = function() or {}
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result = {"seconds": min(times), "peak_bytes": peak}
+    result.update(extra)
+    return result
+
+
+def simulation_benchmarks(quick):
+    """Builds the benchmarks of single simulations for each drag model, time step and flight length.
+
+    Parameters
+    ----------
+    quick : bool
+        Should only the coarsest time step and the short flight be benchmarked.
+
+    Returns
+    -------
+    benchmarks : dict
+        Benchmark functions keyed by name.
+    """
+    benchmarks = {}
+    for drag in ["None", "Stokes", "Newtonian"]:
+        for time_step in TIME_STEPS[:1] if quick else TIME_STEPS:
+            for velocity in VELOCITIES[:1] if quick else VELOCITIES:
+                simulator = projectilepy.model(velocity, 45, time_step=time_step, drag=drag, **PROJECTILE)
+
+                def benchmark(simulator=simulator):
+                    start = time.perf_counter()
+                    simulator.run()
+                    steps = len(simulator.trajectory)
+                    return {"steps": steps, "steps_per_second": steps / (time.perf_counter() - start)}
+
+                benchmarks["run/{}/dt={:g}/v={}".format(drag, time_step, velocity)] = benchmark
+    return benchmarks
+
+
+def solver_benchmarks(quick):
+    """Builds the benchmarks of the launch angle and velocity solvers.
+
+    Parameters
+    ----------
+    quick : bool
+        Should only the dragless solvers be benchmarked.
+
+    Returns
+    -------
+    benchmarks : dict
+        Benchmark functions keyed by name.
+    """
+    benchmarks = {}
+    for drag in ["None"] if quick else ["None", "Newtonian"]:
+        simulator = CountingModel(150, 30, drag=drag, **PROJECTILE)
+        target = [950, 0]
+        for lofted in [False, True]:
+            def benchmark(simulator=simulator, lofted=lofted):
+                simulator.runs = 0
+                angle = simulator.solve_angle(target, lofted)
+                return {"simulations": simulator.runs, "solved": angle is not None and angle is not False}
+
+            benchmarks["solve_angle/{}/{}".format(drag, "lofted" if lofted else "direct")] = benchmark
+
+        def benchmark(simulator=simulator):
+            simulator.runs = 0
+            velocity = simulator.solve_velocity(target)
+            return {"simulations": simulator.runs, "solved": velocity is not None and velocity is not False}
+
+        benchmarks["solve_velocity/{}".format(drag)] = benchmark
+    return benchmarks
+
+
+def query_benchmarks(quick, calls=1000):
+    """Builds the benchmarks of impact queries on a recorded simulation, and of constructing simulation objects.
+
+    Parameters
+    ----------
+    quick : bool
+        Unused, the query benchmarks are always fast.
+    calls : int
+        The number of calls timed by each benchmark.
+
+    Returns
+    -------
+    benchmarks : dict
+        Benchmark functions keyed by name.
+    """
+    simulator = projectilepy.model(150, 30, drag="Newtonian", **PROJECTILE)
+    simulator.run()
+    heights = np.linspace(-0.5, 0.9, calls) * simulator.max_height()
+
+    def surface_impact():
+        for height in heights.tolist():
+            simulator.surface_impact(height)
+        return {"calls": calls}
+
+    def time_of_flight():
+        for height in heights.tolist():
+            simulator.time_of_flight(height, False)
+        return {"calls": calls}
+
+    def construct():
+        for _ in range(calls):
+            projectilepy.model(150, 30, drag="Newtonian", **PROJECTILE)
+        return {"calls": calls}
+
+    return {"surface_impact": surface_impact, "time_of_flight": time_of_flight, "construct": construct}
+
+
+def run(quick=False, repeat=3, pattern=None):
+    """Runs the benchmark suite.
+
+    Parameters
+    ----------
+    quick : bool
+        Should a reduced suite be run.
+    repeat : int
+        The number of timed calls of each benchmark.
+    pattern : str, optional
+        Only run benchmarks whose name contains this string.
+
+    Returns
+    -------
+    results : dict
+        The environment the suite ran in and the results of each benchmark.
+    """
+    benchmarks = {}
+    for build in [simulation_benchmarks, solver_benchmarks, query_benchmarks]:
+        benchmarks.update(build(quick))
+
+    results = {}
+    for name, function in benchmarks.items():
+        if pattern is not None and pattern not in name:
+            continue
+        results[name] = measure(function, repeat)
+        print("{:<40} {:>10.4f} s".format(name, results[name]["seconds"]), file=sys.stderr)
+
+    environment = {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+                   "processor": platform.processor(), "quick": quick, "repeat": repeat}
+    return {"environment": environment, "benchmarks": results}
+
+
+def compare(baseline, current, threshold=0.1):
+    """Compares benchmark results against a baseline. A benchmark regresses if it became more than the threshold
+    slower, or needed more simulations to solve, or no longer solved.
+
+    Parameters
+    ----------
+    baseline : dict
+        The baseline results, as returned by the run function.
+    current : dict
+        The results to check.
+    threshold : float
+        The tolerated fractional slowdown.
+
+    Returns
+    -------
+    regressions : list
+        The names of the benchmarks that regressed.
+    """
+    regressions = []
+    print("{:<40} {:>12} {:>12} {:>8}".format("benchmark", "baseline (s)", "current (s)", "ratio"))
+    for name, result in current["benchmarks"].items():
+        reference = baseline["benchmarks"].get(name)
+        if reference is None:
+            print("{:<40} {:>12} {:>12.4f} {:>8}".format(name, "-", result["seconds"], "new"))
+            continue
+
+        ratio = result["seconds"] / reference["seconds"]
+        flags = []
+        if ratio > 1 + threshold:
+            flags.append("slower")
+        if result.get("simulations", 0) > reference.get("simulations", 0):
+            flags.append("more simulations")
+        if reference.get("solved") and not result.get("solved", True):
+            flags.append("unsolved")
+        if flags:
+            regressions.append(name)
+        print("{:<40} {:>12.4f} {:>12.4f} {:>8.2f} {}".format(name, reference["seconds"], result["seconds"], ratio,
+                                                              ", ".join(flags)))
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="ProjectilePy throughput benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmark suite")
+    compare_parser = commands.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("baseline", help="baseline results file")
+    compare_parser.add_argument("current", nargs="?", help="results file, by default the suite is run")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="tolerated fractional slowdown")
+    for subparser in [run_parser, compare_parser]:
+        subparser.add_argument("--quick", action="store_true", help="run a reduced suite")
+        subparser.add_argument("--repeat", type=int, default=3, help="timed calls per benchmark")
+        subparser.add_argument("--filter", dest="pattern", help="only run benchmarks containing this string")
+    run_parser.add_argument("--output", help="file to save the results to, by default they are printed")
+    arguments = parser.parse_args(arguments)
+
+    if arguments.command == "run":
+        results = run(arguments.quick, arguments.repeat, arguments.pattern)
+        if arguments.output:
+            with open(arguments.output, "w") as file:
+                json.dump(results, file, indent=2)
+        else:
+            print(json.dumps(results, indent=2))
+        return 0
+
+    with open(arguments.baseline) as file:
+        baseline = json.load(file)
+    if arguments.current:
+        with open(arguments.current) as file:
+            current = json.load(file)
+    else:
+        current = run(arguments.quick, arguments.repeat, arguments.pattern)
+    regressions = compare(baseline, current, arguments.threshold)
+    if regressions:
+        print("\n{} benchmark(s) regressed: {}".format(len(regressions), ", ".join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,14 @@
-__all__ = ["model"]
+__all__ = ["model", "Trajectory", "FiringTable", "SimulationCache", "Atmosphere", "SolveResult", "DispersionResult",
+           "SimulationConfig", "simulate", "DragTable", "TrajectoryArchive", "save_batch", "load_batch",
+           "AsyncService", "simulate_async", "SimulationCancelled"]
 from projectilepy.model import model
+from projectilepy.trajectory import Trajectory
+from projectilepy.simulation import SimulationCancelled, SimulationConfig, simulate
+from projectilepy.firingtable import FiringTable
+from projectilepy.cache import SimulationCache
+from projectilepy.atmosphere import Atmosphere
+from projectilepy.drag import DragTable
+from projectilepy.telemetry import SolveResult
+from projectilepy.dispersion import DispersionResult
+from projectilepy.archive import TrajectoryArchive, save_batch, load_batch
+from projectilepy.service import AsyncService, simulate_async
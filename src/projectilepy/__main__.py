@@ -0,0 +1,5 @@
+import sys
+
+from projectilepy.cli import main
+
+sys.exit(main())
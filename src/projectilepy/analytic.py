@@ -0,0 +1,479 @@
+import math
+import numpy as np
+
+from projectilepy.trajectory import Trajectory
+
+# Launches whose horizontal velocity is at most this fraction of their speed are treated as vertical, since the
+# cosine of a vertical launch angle in degrees is rounded to about 6e-17 rather than zero
+_VERTICAL_COSINE = 1e-9
+
+
+class DraglessSolution:
+    def __init__(self, angle, velocity, gravity):
+        """The exact trajectory of a projectile launched from the origin without drag.
+
+        Parameters
+        ----------
+        angle : float
+            The initial launch angle of the projectile in degrees.
+        velocity : float
+            The initial launch velocity of the projectile.
+        gravity : float
+            The acceleration due to gravity that the projectile experiences.
+        """
+        self.angle = angle
+        self.speed = velocity
+        self.gravity = gravity
+        self.vx0 = math.cos(math.radians(angle)) * velocity
+        self.vy0 = math.sin(math.radians(angle)) * velocity
+
+    def position(self, time):
+        """Evaluates the position of the projectile.
+
+        Parameters
+        ----------
+        time : float or array_like
+            The time or times since launch.
+
+        Returns
+        -------
+        x, y : float or ndarray
+            The distance and height of the projectile at the given times.
+        """
+        time = np.asarray(time, dtype=float)
+        return self.vx0 * time, (self.vy0 - 0.5 * self.gravity * time) * time
+
+    def velocity(self, time):
+        """Evaluates the velocity of the projectile.
+
+        Parameters
+        ----------
+        time : float or array_like
+            The time or times since launch.
+
+        Returns
+        -------
+        vx, vy : float or ndarray
+            The horizontal and vertical velocity of the projectile at the given times.
+        """
+        time = np.asarray(time, dtype=float)
+        return np.full_like(time, self.vx0), self.vy0 - self.gravity * time
+
+    def apex_time(self):
+        """Returns the time at which the projectile reaches its highest point, which is the launch if it is fired
+        level or downwards.
+
+        Returns
+        -------
+        time : float
+            The time of the apex.
+        """
+        return max(self.vy0, 0) / self.gravity
+
+    def time_at_height(self, height, descending=True):
+        """Finds the time at which the projectile passes through the given height.
+
+        Parameters
+        ----------
+        height : float
+            The height to find the crossing time for.
+        descending : bool
+            Should the crossing on the descending trajectory be returned, rather than the ascending one.
+
+        Returns
+        -------
+        time : float
+            The crossing time, or None if the projectile never reaches the height.
+        """
+        if not descending and height <= 0:
+            return 0.0
+        if height > max(self.vy0, 0) ** 2 / (2 * self.gravity) or (not descending and self.vy0 <= 0):
+            return None
+        root = math.sqrt(self.vy0 * self.vy0 - 2 * self.gravity * height)
+        return (self.vy0 + root) / self.gravity if descending else (self.vy0 - root) / self.gravity
+
+    def time_at_range(self, distance):
+        """Finds the time at which the projectile reaches the given distance.
+
+        Parameters
+        ----------
+        distance : float
+            The horizontal distance from the launch point.
+
+        Returns
+        -------
+        time : float
+            The time at the given distance, or None if it is never reached.
+        """
+        if distance == 0:
+            return 0.0
+        if self.vx0 <= 0:
+            return None
+        return distance / self.vx0
+
+    def height_at_range(self, distance):
+        """Finds the height of the projectile when it reaches the given distance.
+
+        Parameters
+        ----------
+        distance : float
+            The horizontal distance from the launch point.
+
+        Returns
+        -------
+        height : float
+            The height at the given distance, or negative infinity if it is never reached.
+        """
+        time = self.time_at_range(distance)
+        if time is None:
+            return -math.inf
+        return float(self.position(time)[1])
+
+    def stop_time(self, stop_height):
+        """Finds the time at which a simulation halting at the given height would end. This is the descending
+        crossing of the stop height, or the apex if the projectile never reaches it.
+
+        Parameters
+        ----------
+        stop_height : float
+            The height at which the simulation halts during the descending phase.
+
+        Returns
+        -------
+        time : float
+            The final time of the simulation.
+        """
+        time = self.time_at_height(stop_height)
+        return self.apex_time() if time is None else time
+
+    def sample(self, time_step, stop_height):
+        """Samples the trajectory at a fixed time step up to the stop time, finishing exactly at the stop time.
+
+        Parameters
+        ----------
+        time_step : float
+            The interval between samples.
+        stop_height : float
+            The height at which the sampled trajectory ends during the descending phase.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The sampled time, position and velocity of the projectile.
+        """
+        stop_time = self.stop_time(stop_height)
+        times = np.append(np.arange(0, math.ceil(stop_time / time_step)) * time_step, stop_time)
+        rows = np.column_stack((times,) + self.position(times) + self.velocity(times))
+        trajectory = Trajectory(capacity=len(times))
+        trajectory.extend(rows)
+        return trajectory
+
+    def iterate(self, time_step, stop_height, chunk_size=1024):
+        """Lazily samples the trajectory at the same times as the sample method, evaluating one chunk of samples
+        at a time.
+
+        Parameters
+        ----------
+        time_step : float
+            The interval between samples.
+        stop_height : float
+            The height at which the sampled trajectory ends during the descending phase.
+        chunk_size : int
+            The number of samples evaluated together.
+
+        Yields
+        ------
+        state : tuple
+            The time, position and velocity of the projectile at each sample.
+        """
+        stop_time = self.stop_time(stop_height)
+        count = math.ceil(stop_time / time_step)
+        for start in range(0, count, chunk_size):
+            times = np.arange(start, min(start + chunk_size, count)) * time_step
+            yield from zip(times.tolist(), *(values.tolist() for values in self.position(times) + self.velocity(times)))
+        yield (stop_time,) + tuple(float(value) for value in self.position(stop_time) + self.velocity(stop_time))
+
+
+class StokesSolution(DraglessSolution):
+    def __init__(self, angle, velocity, gravity, drag_rate):
+        """The exact trajectory of a projectile launched from the origin with Stokes (linear) drag, where the drag
+        deceleration is the drag rate multiplied by the velocity.
+
+        Parameters
+        ----------
+        angle : float
+            The initial launch angle of the projectile in degrees.
+        velocity : float
+            The initial launch velocity of the projectile.
+        gravity : float
+            The acceleration due to gravity that the projectile experiences.
+        drag_rate : float
+            The linear drag coefficient divided by the mass of the projectile, in units of 1/s.
+        """
+        assert drag_rate > 0, "Drag rate must be positive"
+        super().__init__(angle, velocity, gravity)
+        self.drag_rate = drag_rate
+        self.terminal_velocity = gravity / drag_rate
+
+    def position(self, time):
+        time = np.asarray(time, dtype=float)
+        decay = -np.expm1(-self.drag_rate * time) / self.drag_rate
+        return self.vx0 * decay, (self.vy0 + self.terminal_velocity) * decay - self.terminal_velocity * time
+
+    def velocity(self, time):
+        time = np.asarray(time, dtype=float)
+        decay = np.exp(-self.drag_rate * time)
+        return self.vx0 * decay, (self.vy0 + self.terminal_velocity) * decay - self.terminal_velocity
+
+    def apex_time(self):
+        return math.log1p(max(self.vy0, 0) / self.terminal_velocity) / self.drag_rate
+
+    def time_at_height(self, height, descending=True):
+        if not descending and height <= 0:
+            return 0.0
+        apex_time = self.apex_time()
+        apex_height = float(self.position(apex_time)[1])
+        if apex_height < height or (not descending and self.vy0 <= 0):
+            return None
+
+        if descending:
+            lower, upper = apex_time, apex_time + 1
+            while float(self.position(upper)[1]) > height:
+                lower, upper = upper, apex_time + 2 * (upper - apex_time)
+        else:
+            lower, upper = 0.0, apex_time
+
+        def residual(time):
+            return float(self.position(time)[1]) - height
+
+        return _bracketed_newton(residual, lambda time: float(self.velocity(time)[1]), lower, upper)
+
+    def time_at_range(self, distance):
+        if distance == 0:
+            return 0.0
+        if self.vx0 <= 0 or self.drag_rate * distance >= self.vx0:
+            return None
+        return -math.log1p(-self.drag_rate * distance / self.vx0) / self.drag_rate
+
+
+def _bracketed_newton(function, derivative, lower, upper, tolerance=1e-12, max_iterations=100):
+    """Finds a root of a function within a bracket using Newton steps, falling back to bisection whenever a step
+    would leave the bracket.
+
+    Parameters
+    ----------
+    function : callable
+        The function to find a root of.
+    derivative : callable
+        The derivative of the function, or None to only use bisection.
+    lower, upper : float
+        The bracket containing the root, where the function changes sign.
+    tolerance : float
+        The termination width of the bracket.
+    max_iterations : int
+        The maximum number of iterations before returning the current estimate.
+
+    Returns
+    -------
+    root : float
+        The estimated root of the function.
+    """
+    f_lower = function(lower)
+    if f_lower == 0:
+        return lower
+    f_upper = function(upper)
+    if f_upper == 0:
+        return upper
+
+    estimate = 0.5 * (lower + upper)
+    for iterations in range(max_iterations):
+        value = function(estimate)
+        if value == 0 or upper - lower < tolerance * max(1.0, abs(estimate)):
+            return estimate
+        if (value > 0) == (f_lower > 0):
+            lower, f_lower = estimate, value
+        else:
+            upper = estimate
+
+        slope = derivative(estimate) if derivative is not None else 0
+        step = estimate - value / slope if slope else None
+        estimate = step if step is not None and lower < step < upper else 0.5 * (lower + upper)
+    return estimate
+
+
+def _golden_section_maximum(function, lower, upper, tolerance=1e-9):
+    """Finds the maximum of a unimodal function on an interval using golden-section search.
+
+    Parameters
+    ----------
+    function : callable
+        The function to maximise.
+    lower, upper : float
+        The interval to search.
+    tolerance : float
+        The termination width of the interval.
+
+    Returns
+    -------
+    argument, value : float
+        The location and value of the maximum.
+    """
+    ratio = (math.sqrt(5) - 1) / 2
+    left = upper - ratio * (upper - lower)
+    right = lower + ratio * (upper - lower)
+    f_left, f_right = function(left), function(right)
+    while upper - lower > tolerance:
+        if f_left > f_right:
+            upper, right, f_right = right, left, f_left
+            left = upper - ratio * (upper - lower)
+            f_left = function(left)
+        else:
+            lower, left, f_left = left, right, f_right
+            right = lower + ratio * (upper - lower)
+            f_right = function(right)
+    argument = 0.5 * (lower + upper)
+    return argument, function(argument)
+
+
+def trajectory_solution(angle, velocity, gravity, drag_rate=0):
+    """Constructs the exact trajectory for a dragless projectile, or one with Stokes drag if a drag rate is given.
+
+    Parameters
+    ----------
+    angle : float
+        The initial launch angle of the projectile in degrees.
+    velocity : float
+        The initial launch velocity of the projectile.
+    gravity : float
+        The acceleration due to gravity that the projectile experiences.
+    drag_rate : float
+        The linear drag coefficient divided by the mass of the projectile, or zero for no drag.
+
+    Returns
+    -------
+    solution : DraglessSolution or StokesSolution
+        The exact trajectory of the projectile.
+    """
+    if drag_rate:
+        return StokesSolution(angle, velocity, gravity, drag_rate)
+    return DraglessSolution(angle, velocity, gravity)
+
+
+def _descends_through(angle, velocity, gravity, drag_rate, distance):
+    """Checks whether a launch reaches the target distance on its descending path, as the numerical solvers and
+    the surface_impact method only consider the descending crossing of the target height.
+
+    Parameters
+    ----------
+    angle : float
+        The launch angle in degrees.
+    velocity : float
+        The launch velocity.
+    gravity : float
+        The acceleration due to gravity that the projectile experiences.
+    drag_rate : float
+        The linear drag coefficient divided by the mass of the projectile, or zero for no drag.
+    distance : float
+        The target distance.
+
+    Returns
+    -------
+    descending : bool
+        Is the projectile at or past its apex when it reaches the target distance.
+    """
+    solution = trajectory_solution(angle, velocity, gravity, drag_rate)
+    time = solution.time_at_range(distance)
+    return time is not None and time >= solution.apex_time()
+
+
+def solve_angle(target_vec, velocity, gravity, drag_rate=0, lofted=False):
+    """Finds the launch angle that passes through the target on its descending path, using the closed form
+    solution for dragless projectiles and root finding on the exact trajectory for Stokes drag.
+
+    Parameters
+    ----------
+    target_vec : array_like
+        The first two elements of the object should correspond to the target distance and relative height.
+    velocity : float
+        The initial launch velocity of the projectile.
+    gravity : float
+        The acceleration due to gravity that the projectile experiences.
+    drag_rate : float
+        The linear drag coefficient divided by the mass of the projectile, or zero for no drag.
+    lofted : bool
+        Defines whether the calculated firing angle should be the lofted or un-lofted solution.
+
+    Returns
+    -------
+    angle : float
+        Firing solution angle in degrees, or None if the target cannot be reached, or is only reached on the
+        ascending path.
+    """
+    distance, height = target_vec[0], target_vec[1]
+    assert distance > 0, "Target distance must be positive"
+
+    if not drag_rate:
+        discriminant = velocity ** 4 - gravity * (gravity * distance * distance + 2 * height * velocity * velocity)
+        if discriminant < 0:
+            return None
+        root = math.sqrt(discriminant)
+        angle = math.degrees(math.atan2(velocity * velocity + (root if lofted else -root), gravity * distance))
+        return angle if _descends_through(angle, velocity, gravity, drag_rate, distance) else None
+
+    if drag_rate * distance >= velocity:
+        return None
+    limit = math.degrees(math.acos(drag_rate * distance / velocity))
+
+    def residual(angle):
+        return trajectory_solution(angle, velocity, gravity, drag_rate).height_at_range(distance) - height
+
+    best_angle, best_residual = _golden_section_maximum(residual, -limit, limit)
+    if best_residual < 0:
+        return None
+    if lofted:
+        angle = _bracketed_newton(residual, None, best_angle, limit)
+    else:
+        angle = _bracketed_newton(residual, None, -limit, best_angle)
+    return angle if _descends_through(angle, velocity, gravity, drag_rate, distance) else None
+
+
+def solve_velocity(target_vec, angle, gravity, drag_rate=0):
+    """Finds the launch velocity that passes through the target on its descending path, using the closed form
+    solution for dragless projectiles and root finding on the exact trajectory for Stokes drag.
+
+    Parameters
+    ----------
+    target_vec : array_like
+        The first two elements of the object should correspond to the target distance and relative height.
+    angle : float
+        The initial launch angle of the projectile in degrees.
+    gravity : float
+        The acceleration due to gravity that the projectile experiences.
+    drag_rate : float
+        The linear drag coefficient divided by the mass of the projectile, or zero for no drag.
+
+    Returns
+    -------
+    velocity : float
+        Firing solution velocity, or None if the target cannot be reached, or is only reached on the ascending path.
+    """
+    distance, height = target_vec[0], target_vec[1]
+    assert distance > 0, "Target distance must be positive"
+
+    cosine = math.cos(math.radians(angle))
+    rise = distance * math.tan(math.radians(angle)) - height
+    if cosine < _VERTICAL_COSINE or rise <= 0:
+        return None
+
+    if not drag_rate:
+        velocity = distance / cosine * math.sqrt(gravity / (2 * rise))
+    else:
+        def residual(velocity):
+            return trajectory_solution(angle, velocity, gravity, drag_rate).height_at_range(distance) - height
+
+        lower = drag_rate * distance / cosine
+        upper = 2 * lower
+        while residual(upper) < 0:
+            lower, upper = upper, 2 * upper
+        velocity = _bracketed_newton(residual, None, lower, upper)
+    return velocity if _descends_through(angle, velocity, gravity, drag_rate, distance) else None
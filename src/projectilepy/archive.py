@@ -0,0 +1,249 @@
+import json
+import os
+import numpy as np
+
+from projectilepy.atmosphere import Atmosphere
+from projectilepy.drag import DragTable
+from projectilepy.trajectory import Trajectory
+
+
+def _json_default(value):
+    """Converts the values of a configuration that JSON cannot store directly.
+
+    Parameters
+    ----------
+    value : object
+        A NumPy scalar or array, a drag table or an atmosphere.
+
+    Returns
+    -------
+    value : object
+        The value as a JSON compatible number or list, where drag tables become Mach-drag coefficient pairs and
+        atmospheres become the altitude-density pairs of their grid.
+    """
+    if isinstance(value, DragTable):
+        return np.column_stack([value.machs, value.grid]).tolist()
+    if isinstance(value, Atmosphere):
+        return np.column_stack([value.altitudes, value.grid]).tolist()
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError("Value of type {} cannot be stored as metadata".format(type(value).__name__))
+
+
+def _write_metadata(path, config, metadata):
+    """Writes the metadata file of an archive.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the archive.
+    config : dict, optional
+        The configuration of the simulation object, as returned by model.get_config.
+    metadata : dict
+        Any further JSON compatible values to store.
+    """
+    metadata = dict(metadata, config=config)
+    with open(os.path.join(path, "metadata.json"), "w") as file:
+        json.dump(metadata, file, default=_json_default)
+
+
+def _read_metadata(path):
+    """Reads the metadata file of an archive.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the archive.
+
+    Returns
+    -------
+    metadata : dict
+        The stored metadata, including the "config" entry.
+    """
+    with open(os.path.join(path, "metadata.json")) as file:
+        return json.load(file)
+
+
+def _write_header(file, shape, dtype="<f8"):
+    """Writes the header of a .npy file. Headers are padded to a fixed size, so the placeholder header of a file
+    being streamed can be overwritten once the number of rows is known.
+
+    Parameters
+    ----------
+    file : file
+        The binary file, positioned at its start.
+    shape : tuple
+        The shape of the array, where only the number of rows may change when the header is overwritten.
+    dtype : data-type, optional
+        The data type of the array, by default little-endian float64.
+
+    Returns
+    -------
+    size : int
+        The number of bytes written.
+    """
+    start = file.tell()
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": shape}
+    np.lib.format.write_array_header_1_0(file, header)
+    return file.tell() - start
+
+
+class TrajectoryArchive:
+    # Arrays stored by the write method, one .npy file each
+    ARRAYS = ["data", "offsets"]
+
+    def __init__(self, data, offsets, metadata):
+        """A columnar archive of many recorded trajectories. The steps of every trajectory are stored one after
+        another in a single float64 array with the Trajectory columns, and the offsets array holds the first row of
+        each trajectory followed by the total number of rows. Archives are usually written with the write method,
+        and opened from disk with the load method.
+
+        Parameters
+        ----------
+        data : ndarray
+            The concatenated steps of every trajectory.
+        offsets : ndarray
+            The first row of each trajectory in the data array, followed by the total number of rows.
+        metadata : dict
+            The stored metadata, where the "config" entry holds the configuration of the simulation object if it
+            was given.
+        """
+        self.data = data
+        self.offsets = offsets
+        self.metadata = metadata
+
+    @property
+    def config(self):
+        """dict : The configuration of the simulation object that recorded the trajectories, or None. It can be
+        passed to model.from_config to recreate the object."""
+        return self.metadata.get("config")
+
+    def __len__(self):
+        return self.offsets.size - 1
+
+    def __getitem__(self, index):
+        """Returns a trajectory of the archive as a view of the stored steps, which stays memory-mapped if the
+        archive was loaded that way.
+
+        Parameters
+        ----------
+        index : int
+            The position of the trajectory in the archive.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The recorded trajectory.
+        """
+        index = range(len(self))[index]
+        return Trajectory.from_data(self.data[self.offsets[index]:self.offsets[index + 1]])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @classmethod
+    def write(cls, path, trajectories, config=None, **metadata):
+        """Writes trajectories to a directory as uncompressed .npy files, so that the archive can be
+        memory-mapped when loaded. The trajectories are streamed to disk one at a time, so an archive of any size
+        can be written from a generator without holding it in memory.
+
+        Parameters
+        ----------
+        path : str
+            The directory to write the archive in, which is created if needed.
+        trajectories : iterable
+            The Trajectory objects to store, which must all have the same columns.
+        config : dict, optional
+            The configuration of the simulation object that recorded the trajectories, as returned by
+            model.get_config, which records the drag model, time step and projectile parameters.
+        metadata : dict
+            Any further JSON compatible values to store, such as the stop height of the simulations.
+
+        Returns
+        -------
+        archive : TrajectoryArchive
+            The written archive, memory-mapped read-only.
+        """
+        os.makedirs(path, exist_ok=True)
+        offsets = [0]
+        columns = None
+        with open(os.path.join(path, "data.npy"), "wb") as file:
+            size = _write_header(file, (0, 5))
+            for trajectory in trajectories:
+                data = trajectory.data
+                if columns is None:
+                    columns = data.shape[1]
+                assert data.shape[1] == columns, "Trajectories must all have the same columns"
+                file.write(np.ascontiguousarray(data, dtype="<f8").tobytes())
+                offsets.append(offsets[-1] + data.shape[0])
+            file.seek(0)
+            rewritten = _write_header(file, (offsets[-1], columns or 5))
+            assert rewritten == size, "Archive header size changed"
+
+        np.save(os.path.join(path, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+        _write_metadata(path, config, metadata)
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Loads an archive written with the write method. By default the arrays are memory-mapped read-only, so
+        that only the trajectories that are accessed are read from disk.
+
+        Parameters
+        ----------
+        path : str
+            The directory the archive was written in.
+        mmap_mode : str, optional
+            The memory-map mode passed to numpy.load, or None to read the arrays fully into memory.
+
+        Returns
+        -------
+        archive : TrajectoryArchive
+            The loaded archive.
+        """
+        arrays = [np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode) for name in cls.ARRAYS]
+        return cls(*arrays, _read_metadata(path))
+
+
+def save_batch(path, results, config=None, **metadata):
+    """Saves the results of a batch simulation to a directory, with one uncompressed .npy file per array so that
+    they can be memory-mapped when loaded.
+
+    Parameters
+    ----------
+    path : str
+        The directory to save the results in, which is created if needed.
+    results : dict
+        The arrays returned by model.run_batch, or any other dictionary of arrays.
+    config : dict, optional
+        The configuration of the simulation object that ran the batch, as returned by model.get_config.
+    metadata : dict
+        Any further JSON compatible values to store, such as the stop height of the simulations.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name, array in results.items():
+        np.save(os.path.join(path, name + ".npy"), np.asarray(array))
+    _write_metadata(path, config, dict(metadata, arrays=list(results)))
+
+
+def load_batch(path, mmap_mode="r"):
+    """Loads batch simulation results saved with the save_batch function. By default the arrays are memory-mapped
+    read-only.
+
+    Parameters
+    ----------
+    path : str
+        The directory the results were saved in.
+    mmap_mode : str, optional
+        The memory-map mode passed to numpy.load, or None to read the arrays fully into memory.
+
+    Returns
+    -------
+    results, metadata : dict
+        The stored arrays keyed by name, and the stored metadata including the "config" entry.
+    """
+    metadata = _read_metadata(path)
+    results = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode)
+               for name in metadata["arrays"]}
+    return results, metadata
@@ -0,0 +1,306 @@
+import math
+import numpy as np
+
+# Credit to www.engineeringtoolbox.com for this data.
+EARTH_DENSITY_PROFILE = [[-1000, 1.347], [0, 1.225], [1000, 1.112], [2000, 1.007], [3000, 0.9093], [4000, 0.8194],
+                         [5000, 0.7364], [6000, 0.6601], [7000, 0.5900], [8000, 0.5258], [9000, 0.4671],
+                         [10000, 0.4135], [15000, 0.1948], [20000, 0.08891], [25000, 0.04008], [30000, 0.01841],
+                         [40000, 0.003996], [50000, 0.001027], [60000, 0.0003097], [70000, 0.00008283],
+                         [80000, 0.00001846], [90000, 0]]
+
+# Speed of sound of the International Standard Atmosphere, from the temperature of each layer.
+EARTH_SPEED_OF_SOUND_PROFILE = [[-1000, 344.11], [0, 340.29], [1000, 336.43], [2000, 332.53], [3000, 328.58],
+                                [4000, 324.58], [5000, 320.53], [6000, 316.43], [7000, 312.27], [8000, 308.06],
+                                [9000, 303.79], [10000, 299.46], [11000, 295.07], [20000, 295.07], [25000, 298.45],
+                                [32000, 303.13], [40000, 317.63], [47000, 329.8], [51000, 329.8], [60000, 314.07],
+                                [71000, 293.7], [80000, 281.12], [85000, 274.1], [90000, 274.1]]
+
+
+# Default grids may split the smallest spacing of a profile into up to this many intervals to keep its coordinates
+_GRID_DIVISIONS = 64
+
+
+def _uniform_grid(profile, interval=None):
+    """Resamples a profile of coordinate pairs onto a uniform grid by linear interpolation. Both ends of the
+    profile are always grid points, and the default grid also has a point at every coordinate of the profile where
+    possible, so that the resampled profile is the same as the original.
+
+    Parameters
+    ----------
+    profile : array_like or dict
+        The coordinate pairs of the profile, either as a 2-D array with one pair per row or as a dictionary mapping
+        the first coordinate to the second. The first coordinates need not be evenly spaced.
+    interval : float, optional
+        The largest spacing of the grid, which is reduced to divide the span of the profile. By default the
+        smallest spacing of the profile, or the largest fraction of it that puts every coordinate on the grid.
+
+    Returns
+    -------
+    base, interval, values : float, float, ndarray
+        The first coordinate of the first grid point, the grid spacing, and the read-only value at each grid point.
+    """
+    if isinstance(profile, dict):
+        profile = sorted(profile.items())
+    profile = np.array(profile, dtype=float)
+    assert profile.ndim == 2 and profile.shape[1] == 2 and profile.shape[0] >= 2, \
+        "Profile must contain at least two coordinate pairs"
+    profile = profile[np.argsort(profile[:, 0])]
+    assert np.all(np.diff(profile[:, 0]) > 0), "Profile coordinates must be unique"
+
+    base, span = float(profile[0, 0]), float(profile[-1, 0] - profile[0, 0])
+    if interval is None:
+        spacing = float(np.min(np.diff(profile[:, 0])))
+        interval = spacing
+        for divisions in range(1, _GRID_DIVISIONS + 1):
+            positions = (profile[:, 0] - base) * divisions / spacing
+            if np.allclose(positions, np.round(positions), rtol=0, atol=1e-6):
+                interval = spacing / divisions
+                break
+    assert 0 < interval <= span, "Interval must be positive and within the profile"
+    # Rounding the number of intervals up keeps the end of the profile on the grid, without widening the spacing
+    count = math.ceil(span / interval * (1 - 1e-9))
+    interval = span / count
+
+    values = np.interp(base + np.arange(count + 1) * interval, profile[:, 0], profile[:, 1])
+    values.flags.writeable = False
+    return base, float(interval), values
+
+
+class Atmosphere:
+    def __init__(self, profile, interval=None, bounds="clamp", speed_of_sound=None):
+        """An immutable fluid density profile stored on a uniform altitude grid, so that the density at any
+        altitude is found with direct index arithmetic and linear interpolation between the neighbouring grid
+        points. The speed of sound, which Mach dependent drag needs, is stored on a second uniform grid in the
+        same way. Atmospheres never change once built, so a single instance can be shared by any number of
+        simulation objects.
+
+        Parameters
+        ----------
+        profile : array_like or dict
+            The altitude-density coordinate pairs of the profile, either as a 2-D array with one pair per row or as
+            a dictionary mapping altitudes to densities. The altitudes need not be evenly spaced.
+        interval : float, optional
+            The largest spacing of the altitude grid, which is reduced to divide the altitude span of the profile.
+            By default the grid has a point at every altitude of the profile where possible.
+        bounds : string
+            Either "clamp" to use the density at the nearest end of the profile for altitudes outside of it, or
+            "raise" to raise a ValueError instead.
+        speed_of_sound : array_like or dict, optional
+            The altitude-speed of sound coordinate pairs, by default those of the International Standard
+            Atmosphere. The speed of sound is always clamped outside of its profile.
+        """
+        assert bounds in ["clamp", "raise"], "Bounds handling not recognised"
+        self.__base, self.__interval, self.__densities = _uniform_grid(profile, interval)
+        self.__bounds = bounds
+        # Scalar lookups index a list, which is much faster than indexing an array one element at a time
+        self.__values = self.__densities.tolist()
+
+        self.__sound_base, self.__sound_interval, self.__sounds = _uniform_grid(
+            EARTH_SPEED_OF_SOUND_PROFILE if speed_of_sound is None else speed_of_sound)
+        assert np.all(self.__sounds > 0), "Speeds of sound must be positive"
+        self.__sound_values = self.__sounds.tolist()
+        self.__hash = hash((self.__base, self.__interval, bounds, self.__densities.tobytes(), self.__sound_base,
+                            self.__sound_interval, self.__sounds.tobytes()))
+
+    @property
+    def base(self):
+        """float : The altitude of the first grid point."""
+        return self.__base
+
+    @property
+    def interval(self):
+        """float : The spacing of the altitude grid."""
+        return self.__interval
+
+    @property
+    def bounds(self):
+        """string : How altitudes outside the profile are handled, either "clamp" or "raise"."""
+        return self.__bounds
+
+    @property
+    def altitudes(self):
+        """ndarray : The altitude of each grid point."""
+        return self.__base + np.arange(self.__densities.size) * self.__interval
+
+    @property
+    def grid(self):
+        """ndarray : A read-only view of the density at each grid point."""
+        return self.__densities
+
+    @property
+    def sound_grid(self):
+        """ndarray : A read-only view of the speed of sound at each point of its own altitude grid."""
+        return self.__sounds
+
+    def __eq__(self, other):
+        return isinstance(other, Atmosphere) and self.__hash == other.__hash and self.__base == other.__base and \
+            self.__interval == other.__interval and self.__bounds == other.__bounds and \
+            np.array_equal(self.__densities, other.__densities) and self.__sound_base == other.__sound_base and \
+            self.__sound_interval == other.__sound_interval and np.array_equal(self.__sounds, other.__sounds)
+
+    def __hash__(self):
+        return self.__hash
+
+    def __getitem__(self, altitude):
+        return self.density(altitude)
+
+    def density(self, altitude):
+        """Finds the fluid density at a single altitude.
+
+        Parameters
+        ----------
+        altitude : float
+            The altitude to find the density at.
+
+        Returns
+        -------
+        density : float
+            The linearly interpolated density.
+        """
+        position = (altitude - self.__base) / self.__interval
+        index = math.floor(position)
+        values = self.__values
+        if index < 0 or index >= len(values) - 1:
+            if self.__bounds == "raise" and not 0 <= position <= len(values) - 1:
+                raise ValueError("The fluid density profile does not extend to an altitude of", altitude)
+            return values[0] if index < 0 else values[-1]
+        return values[index] + (position - index) * (values[index + 1] - values[index])
+
+    def gradient(self, altitude):
+        """Finds the rate of change of the fluid density with altitude, which is constant between grid points and
+        zero where the density is clamped.
+
+        Parameters
+        ----------
+        altitude : float
+            The altitude to find the density gradient at.
+
+        Returns
+        -------
+        gradient : float
+            The density gradient per unit altitude.
+        """
+        index = math.floor((altitude - self.__base) / self.__interval)
+        values = self.__values
+        if index < 0 or index >= len(values) - 1:
+            return 0.0
+        return (values[index + 1] - values[index]) / self.__interval
+
+    def densities(self, altitudes):
+        """Finds the fluid density at many altitudes at once.
+
+        Parameters
+        ----------
+        altitudes : array_like
+            The altitudes to find the density at.
+
+        Returns
+        -------
+        densities : ndarray
+            The linearly interpolated densities, shaped like the altitudes.
+        """
+        position = (np.asarray(altitudes, dtype=float) - self.__base) / self.__interval
+        last = self.__densities.size - 1
+        if self.__bounds == "raise" and position.size and (position.min() < 0 or position.max() > last):
+            outside = np.asarray(altitudes)[(position < 0) | (position > last)]
+            raise ValueError("The fluid density profile does not extend to an altitude of", float(outside.flat[0]))
+        np.clip(position, 0, last, out=position)
+        index = np.minimum(position.astype(np.int64), last - 1)
+        lower = self.__densities[index]
+        return lower + (position - index) * (self.__densities[index + 1] - lower)
+
+    def speed_of_sound(self, altitude):
+        """Finds the speed of sound at a single altitude.
+
+        Parameters
+        ----------
+        altitude : float
+            The altitude to find the speed of sound at.
+
+        Returns
+        -------
+        speed : float
+            The linearly interpolated speed of sound.
+        """
+        position = (altitude - self.__sound_base) / self.__sound_interval
+        index = math.floor(position)
+        values = self.__sound_values
+        if index < 0 or index >= len(values) - 1:
+            return values[0] if index < 0 else values[-1]
+        return values[index] + (position - index) * (values[index + 1] - values[index])
+
+    def speed_of_sound_gradient(self, altitude):
+        """Finds the rate of change of the speed of sound with altitude, which is constant between grid points and
+        zero where the speed of sound is clamped.
+
+        Parameters
+        ----------
+        altitude : float
+            The altitude to find the speed of sound gradient at.
+
+        Returns
+        -------
+        gradient : float
+            The speed of sound gradient per unit altitude.
+        """
+        index = math.floor((altitude - self.__sound_base) / self.__sound_interval)
+        values = self.__sound_values
+        if index < 0 or index >= len(values) - 1:
+            return 0.0
+        return (values[index + 1] - values[index]) / self.__sound_interval
+
+    def speeds_of_sound(self, altitudes):
+        """Finds the speed of sound at many altitudes at once.
+
+        Parameters
+        ----------
+        altitudes : array_like
+            The altitudes to find the speed of sound at.
+
+        Returns
+        -------
+        speeds : ndarray
+            The linearly interpolated speeds of sound, shaped like the altitudes.
+        """
+        position = (np.asarray(altitudes, dtype=float) - self.__sound_base) / self.__sound_interval
+        last = self.__sounds.size - 1
+        np.clip(position, 0, last, out=position)
+        index = np.minimum(position.astype(np.int64), last - 1)
+        lower = self.__sounds[index]
+        return lower + (position - index) * (self.__sounds[index + 1] - lower)
+
+
+_default_atmosphere = None
+
+
+def default_atmosphere():
+    """Returns the shared Earth atmosphere built from real world air density measurements, building it on first
+    use.
+
+    Returns
+    -------
+    atmosphere : Atmosphere
+        The default atmosphere.
+    """
+    global _default_atmosphere
+    if _default_atmosphere is None:
+        _default_atmosphere = Atmosphere(EARTH_DENSITY_PROFILE)
+    return _default_atmosphere
+
+
+def as_atmosphere(profile):
+    """Converts a fluid density profile into an atmosphere that is clamped outside of the profile altitudes.
+
+    Parameters
+    ----------
+    profile : Atmosphere, array_like or dict
+        The fluid density profile.
+
+    Returns
+    -------
+    atmosphere : Atmosphere
+        The profile as an atmosphere, or the profile itself if it already is one.
+    """
+    if isinstance(profile, Atmosphere):
+        return profile
+    return Atmosphere(profile)
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+
+
+class SimulationCache:
+    def __init__(self, max_entries=128, max_steps=None, max_bytes=None):
+        """A least recently used cache of simulation results, bounded by the number of entries and optionally by
+        the total number of stored steps and bytes. Entries are evicted from the least recently used end until all
+        of the bounds are met.
+
+        Parameters
+        ----------
+        max_entries : int
+            The maximum number of cached simulations.
+        max_steps : int, optional
+            The maximum total number of trajectory steps held by the cache.
+        max_bytes : int, optional
+            The maximum total number of bytes of trajectory storage held by the cache.
+        """
+        assert max_entries is None or max_entries > 0, "Maximum entries must be positive"
+        self.max_entries = max_entries
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+
+        self.__entries = OrderedDict()
+        self.steps = 0
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def get(self, key):
+        """Looks up a cached simulation result and marks it as the most recently used.
+
+        Parameters
+        ----------
+        key : tuple
+            The hashable description of the simulation.
+
+        Returns
+        -------
+        value : object
+            The cached result, or None if the simulation is not cached.
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, steps=0, nbytes=0):
+        """Stores a simulation result as the most recently used entry, evicting older entries as needed. Results
+        that could never fit within the bounds are not stored.
+
+        Parameters
+        ----------
+        key : tuple
+            The hashable description of the simulation.
+        value : object
+            The simulation result.
+        steps : int
+            The number of trajectory steps held by the result.
+        nbytes : int
+            The number of bytes of storage held by the result.
+        """
+        if (self.max_steps is not None and steps > self.max_steps) or \
+                (self.max_bytes is not None and nbytes > self.max_bytes):
+            return
+        if key in self.__entries:
+            self.__remove(key)
+
+        self.__entries[key] = (value, steps, nbytes)
+        self.steps += steps
+        self.nbytes += nbytes
+
+        while (self.max_entries is not None and len(self.__entries) > self.max_entries) or \
+                (self.max_steps is not None and self.steps > self.max_steps) or \
+                (self.max_bytes is not None and self.nbytes > self.max_bytes):
+            self.__remove(next(iter(self.__entries)))
+            self.evictions += 1
+
+    def __remove(self, key):
+        """Removes an entry and releases its share of the bounds.
+
+        Parameters
+        ----------
+        key : tuple
+            The key of the entry to remove.
+        """
+        value, steps, nbytes = self.__entries.pop(key)
+        self.steps -= steps
+        self.nbytes -= nbytes
+
+    def clear(self):
+        """Removes every entry from the cache. The hit and miss statistics are kept."""
+        self.__entries.clear()
+        self.steps = 0
+        self.nbytes = 0
+
+    def info(self):
+        """Summarises the usage statistics of the cache.
+
+        Returns
+        -------
+        info : dict
+            The hit, miss and eviction counts, hit rate, and the current number of entries, steps and bytes.
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0, "entries": len(self.__entries),
+                "steps": self.steps, "bytes": self.nbytes}
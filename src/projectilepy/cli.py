@@ -0,0 +1,340 @@
+"""Command line interface for ProjectilePy.
+
+Solve the direct and lofted firing angles of every target in a file across worker processes:
+    projectilepy solve --config shell.json --input targets.csv --output solutions.csv
+
+The configuration is a JSON object of model constructor arguments, such as the one returned by model.get_config.
+Targets are read as distance and height pairs from CSV or JSON lines files, and solutions are written as CSV, JSON
+lines or a .npy file of solution records, in the order of the targets.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from projectilepy.archive import _write_header
+from projectilepy.model import model
+from projectilepy.parallel import SOLUTION_DTYPE, iter_solve_angles
+from projectilepy.telemetry import SolveResult
+
+# File formats recognised from the extension of the input and output paths
+INPUT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+OUTPUT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".npy": "npy"}
+
+
+def _parse_number(value):
+    """Parses a target coordinate, treating anything that is not a number as missing.
+
+    Parameters
+    ----------
+    value : object
+        The field read from the input file.
+
+    Returns
+    -------
+    number : float
+        The coordinate, or NaN if it is missing or malformed.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _read_csv(file):
+    """Lazily reads targets from a CSV file. A header row naming "distance" and "height" columns selects them,
+    otherwise the first two columns are used. A first row is only treated as a header if none of its fields are
+    numbers. Malformed rows are kept as NaN targets, so that every row of the input has a solution in the output.
+
+    Parameters
+    ----------
+    file : file
+        The open text file.
+
+    Yields
+    ------
+    target : tuple
+        The target distance and relative height.
+    """
+    columns, first = (0, 1), True
+    for row in csv.reader(file):
+        if not "".join(row).strip():
+            continue
+        if first:
+            first = False
+            names = [name.strip().lower() for name in row]
+            if "distance" in names and "height" in names:
+                columns = (names.index("distance"), names.index("height"))
+                continue
+            if all(math.isnan(_parse_number(field)) and field.strip() for field in row):
+                continue
+        yield tuple(_parse_number(row[column]) if column < len(row) else math.nan for column in columns)
+
+
+def _read_jsonl(file):
+    """Lazily reads targets from a JSON lines file, where each line is either an object with "distance" and
+    "height" entries or a distance-height pair. Malformed lines are kept as NaN targets.
+
+    Parameters
+    ----------
+    file : file
+        The open text file.
+
+    Yields
+    ------
+    target : tuple
+        The target distance and relative height.
+    """
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            target = json.loads(line)
+        except ValueError:
+            target = None
+        if isinstance(target, dict):
+            target = (target.get("distance"), target.get("height"))
+        elif not isinstance(target, list) or len(target) < 2:
+            target = (None, None)
+        yield _parse_number(target[0]), _parse_number(target[1])
+
+
+class _CsvWriter:
+    def __init__(self, file):
+        """Writes solution records as CSV rows, with a header row of the record fields.
+
+        Parameters
+        ----------
+        file : file
+            The open text file.
+        """
+        self.file = file
+        self.writer = csv.writer(file, lineterminator="\n")
+        self.writer.writerow(SOLUTION_DTYPE.names)
+
+    def write(self, solutions):
+        self.writer.writerows(solutions.tolist())
+        self.file.flush()
+
+    def close(self):
+        pass
+
+
+class _JsonlWriter:
+    def __init__(self, file):
+        """Writes solution records as JSON lines, with null angles for failed solutions.
+
+        Parameters
+        ----------
+        file : file
+            The open text file.
+        """
+        self.file = file
+
+    def write(self, solutions):
+        for solution in solutions.tolist():
+            record = {name: (None if isinstance(value, float) and math.isnan(value) else value)
+                      for name, value in zip(SOLUTION_DTYPE.names, solution)}
+            self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def close(self):
+        pass
+
+
+class _NpyWriter:
+    def __init__(self, file):
+        """Streams solution records into a .npy file, rewriting its header with the number of records once they
+        are all written. The file can then be memory-mapped with numpy.load.
+
+        Parameters
+        ----------
+        file : file
+            The open binary file, which must be seekable.
+        """
+        self.file = file
+        self.rows = 0
+        self.size = _write_header(file, (0,), SOLUTION_DTYPE)
+
+    def write(self, solutions):
+        self.file.write(np.ascontiguousarray(solutions, dtype=SOLUTION_DTYPE).tobytes())
+        self.rows += len(solutions)
+
+    def close(self):
+        self.file.seek(0)
+        rewritten = _write_header(self.file, (self.rows,), SOLUTION_DTYPE)
+        assert rewritten == self.size, "Solution file header size changed"
+
+
+# Readers and writers of each file format
+READERS = {"csv": _read_csv, "jsonl": _read_jsonl}
+WRITERS = {"csv": _CsvWriter, "jsonl": _JsonlWriter, "npy": _NpyWriter}
+
+
+def _file_format(path, given, formats, default):
+    """Chooses the format of a file from the given format, or else from the extension of its path.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file, or "-" for the standard streams.
+    given : str
+        The format given on the command line, or None.
+    formats : dict
+        The formats recognised from each extension.
+    default : str
+        The format of the standard streams and of unrecognised extensions.
+
+    Returns
+    -------
+    format : str
+        The format of the file.
+    """
+    if given is not None:
+        return given
+    return formats.get(os.path.splitext(path)[1].lower(), default) if path != "-" else default
+
+
+def _report(stream, solved, solutions, start, final=False):
+    """Reports the progress and throughput of a solve on the error stream.
+
+    Parameters
+    ----------
+    stream : file
+        The stream to report on.
+    solved : int
+        The number of targets solved so far.
+    solutions : int
+        The number of direct and lofted solutions found so far.
+    start : float
+        The performance counter time at which solving started.
+    final : bool
+        Is this the report of the finished solve.
+    """
+    elapsed = time.perf_counter() - start
+    rate = solved / elapsed if elapsed > 0 else 0.0
+    message = "{} {} targets, {} solutions found, {:.1f} s, {:.1f} targets/s".format(
+        "Solved" if final else "Solving:", solved, solutions, elapsed, rate)
+    if stream.isatty():
+        stream.write("\r" + message + ("\n" if final else ""))
+    else:
+        stream.write(message + "\n")
+    stream.flush()
+
+
+def solve(args, parser):
+    """Runs the solve command, streaming targets from the input file through worker processes and writing their
+    solutions in the order of the targets. Only a few chunks of targets per worker are held in memory at once.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+    parser : argparse.ArgumentParser
+        The parser of the command, used to report invalid arguments.
+
+    Returns
+    -------
+    status : int
+        The exit status of the command.
+    """
+    input_format = _file_format(args.input, args.input_format, INPUT_FORMATS, "csv")
+    output_format = _file_format(args.output, args.output_format, OUTPUT_FORMATS, "csv")
+    if output_format == "npy" and args.output == "-":
+        parser.error("npy output must be written to a file")
+    if args.chunksize <= 0 or (args.workers is not None and args.workers <= 0):
+        parser.error("chunk size and number of workers must be positive")
+
+    try:
+        with open(args.config) as file:
+            config = json.load(file)
+        model.from_config(config)
+    except (OSError, ValueError, TypeError, AssertionError) as error:
+        parser.error("invalid configuration {}: {}".format(args.config, error))
+
+    try:
+        input_file = sys.stdin if args.input == "-" else open(args.input, newline="")
+    except OSError as error:
+        parser.error("cannot read input {}: {}".format(args.input, error))
+    if args.output == "-":
+        output_file = sys.stdout
+    else:
+        output_file = open(args.output, "wb") if output_format == "npy" else open(args.output, "w", newline="")
+    try:
+        writer = WRITERS[output_format](output_file)
+        targets = READERS[input_format](input_file)
+        solved, solutions, start, reported = 0, 0, time.perf_counter(), 0.0
+        for _, chunk in iter_solve_angles(config, targets, args.workers, args.chunksize, True, args.max_error):
+            writer.write(chunk)
+            solved += len(chunk)
+            solutions += int(np.sum(chunk["direct_status"] == SolveResult.SOLVED) +
+                             np.sum(chunk["lofted_status"] == SolveResult.SOLVED))
+            if not args.quiet and time.perf_counter() - reported >= args.progress_interval:
+                reported = time.perf_counter()
+                _report(sys.stderr, solved, solutions, start)
+        writer.close()
+        if not args.quiet:
+            _report(sys.stderr, solved, solutions, start, final=True)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    return 0
+
+
+def build_parser():
+    """Builds the parser of the command line arguments.
+
+    Returns
+    -------
+    parser : argparse.ArgumentParser
+        The parser of every command.
+    """
+    parser = argparse.ArgumentParser(prog="projectilepy", description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    command = commands.add_parser("solve", help="solve the direct and lofted firing angles of a file of targets")
+    command.add_argument("--config", required=True,
+                         help="JSON file of model constructor arguments, as returned by model.get_config")
+    command.add_argument("--input", default="-", help="CSV or JSON lines file of targets, or - for standard input")
+    command.add_argument("--output", default="-", help="CSV, JSON lines or .npy file of solutions, or - for "
+                                                       "standard output")
+    command.add_argument("--input-format", choices=sorted(READERS), help="format of the input, by default chosen "
+                                                                         "from its extension")
+    command.add_argument("--output-format", choices=sorted(WRITERS), help="format of the output, by default "
+                                                                          "chosen from its extension")
+    command.add_argument("--workers", type=int, help="number of worker processes, by default the number of "
+                                                     "processors")
+    command.add_argument("--chunksize", type=int, default=256, help="number of targets sent to a worker at a time")
+    command.add_argument("--max-error", type=float, default=0.1, help="termination accuracy of the solver")
+    command.add_argument("--progress-interval", type=float, default=1.0,
+                         help="seconds between progress reports on standard error")
+    command.add_argument("--quiet", action="store_true", help="do not report progress")
+    command.set_defaults(function=solve)
+    return parser
+
+
+def main(argv=None):
+    """Runs the command line interface.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments, by default those of the process.
+
+    Returns
+    -------
+    status : int
+        The exit status of the command.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.function(args, parser)
+
@@ -0,0 +1,472 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from time import perf_counter
+
+import numpy as np
+
+from projectilepy.model import model
+
+# Launch parameters that can be drawn from a distribution, in the order they are drawn from each chunk's generator
+PARAMETERS = ["velocity", "angle", "mass", "drag_coefficient"]
+# Impact quantities summarised by a dispersion analysis
+QUANTITIES = ["distance", "time_of_flight"]
+
+# Simulation object of a worker process, created once from the configuration passed to the pool initialiser
+_worker_simulator = None
+
+
+class RunningStatistics:
+    def __init__(self, dimensions):
+        """The running mean and covariance of a stream of vectors, updated a batch at a time with the parallel
+        form of Welford's algorithm so that memory is independent of the number of vectors. Statistics gathered
+        separately can be combined exactly with the merge method.
+
+        Parameters
+        ----------
+        dimensions : int
+            The length of each vector.
+        """
+        self.count = 0
+        self.mean = np.zeros(dimensions)
+        self.m2 = np.zeros((dimensions, dimensions))
+
+    def update(self, values):
+        """Adds a batch of vectors to the statistics.
+
+        Parameters
+        ----------
+        values : array_like
+            The vectors, one per row.
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, self.mean.size)
+        if len(values):
+            batch = RunningStatistics(self.mean.size)
+            batch.count = len(values)
+            batch.mean = values.mean(axis=0)
+            deviations = values - batch.mean
+            batch.m2 = deviations.T @ deviations
+            self.merge(batch)
+
+    def merge(self, other):
+        """Combines the statistics of another stream into these statistics.
+
+        Parameters
+        ----------
+        other : RunningStatistics
+            The statistics of the other stream.
+        """
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + np.outer(delta, delta) * (self.count * other.count / count)
+        self.mean = self.mean + delta * (other.count / count)
+        self.count = count
+
+    @property
+    def covariance(self):
+        """ndarray : The sample covariance matrix, which is NaN until there are at least two vectors."""
+        if self.count < 2:
+            return np.full(self.m2.shape, np.nan)
+        return self.m2 / (self.count - 1)
+
+
+class StreamingHistogram:
+    def __init__(self, edges):
+        """Histograms of a stream of vectors over fixed bins, one histogram per vector component. Values outside of
+        the bins are counted as underflow or overflow, so no value is lost.
+
+        Parameters
+        ----------
+        edges : array_like
+            The increasing bin edges of each component, one row per component.
+        """
+        self.edges = np.atleast_2d(np.asarray(edges, dtype=float))
+        self.counts = np.zeros((self.edges.shape[0], self.edges.shape[1] - 1), dtype=np.int64)
+        self.underflow = np.zeros(self.edges.shape[0], dtype=np.int64)
+        self.overflow = np.zeros(self.edges.shape[0], dtype=np.int64)
+
+    def update(self, values):
+        """Adds a batch of vectors to the histograms.
+
+        Parameters
+        ----------
+        values : array_like
+            The vectors, one per row.
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, self.edges.shape[0])
+        for component, edges in enumerate(self.edges):
+            self.counts[component] += np.histogram(values[:, component], edges)[0]
+            self.underflow[component] += np.count_nonzero(values[:, component] < edges[0])
+            self.overflow[component] += np.count_nonzero(values[:, component] > edges[-1])
+
+    def merge(self, other):
+        """Combines the histograms of another stream over the same bins into these histograms.
+
+        Parameters
+        ----------
+        other : StreamingHistogram
+            The histograms of the other stream.
+        """
+        assert np.array_equal(self.edges, other.edges), "Histograms must share the same bins"
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def cumulative(self, component, values):
+        """Counts the values of a component below each of the given values, interpolating linearly within bins.
+
+        Parameters
+        ----------
+        component : int
+            The index of the vector component.
+        values : array_like
+            The values to count below.
+
+        Returns
+        -------
+        counts : ndarray
+            The interpolated number of values below each value.
+        """
+        totals = self.underflow[component] + np.append(0, np.cumsum(self.counts[component]))
+        return np.interp(values, self.edges[component], totals, left=0,
+                         right=totals[-1] + self.overflow[component])
+
+    def deviation_quantile(self, component, centre, fraction):
+        """Finds the distance from a centre within which the given fraction of the values of a component lie.
+
+        Parameters
+        ----------
+        component : int
+            The index of the vector component.
+        centre : float
+            The value that distances are measured from.
+        fraction : float
+            The fraction of values that lie within the distance.
+
+        Returns
+        -------
+        distance : float
+            The distance, resolved to a small fraction of a bin width.
+        """
+        total = self.counts[component].sum() + self.underflow[component] + self.overflow[component]
+        edges = self.edges[component]
+        lower, upper = 0.0, max(abs(edges[0] - centre), abs(edges[-1] - centre))
+        while upper - lower > 1e-6 * (edges[1] - edges[0]):
+            distance = 0.5 * (lower + upper)
+            inside = self.cumulative(component, centre + distance) - self.cumulative(component, centre - distance)
+            if inside < fraction * total:
+                lower = distance
+            else:
+                upper = distance
+        return upper
+
+
+class DispersionResult:
+    def __init__(self, samples, misses, statistics, histogram, seconds):
+        """The impact dispersion of a Monte Carlo analysis, summarised by streaming statistics of the impact
+        distance and time of flight of every sample that reached the stop height.
+
+        Parameters
+        ----------
+        samples : int
+            The number of samples simulated.
+        misses : int
+            The number of samples that never reached the stop height, which are left out of the statistics.
+        statistics : RunningStatistics
+            The mean and covariance of the impact distance and time of flight.
+        histogram : StreamingHistogram
+            Histograms of the impact distance and time of flight.
+        seconds : float
+            The total wall time of the analysis.
+        """
+        self.samples = samples
+        self.misses = misses
+        self.statistics = statistics
+        self.histogram = histogram
+        self.seconds = seconds
+
+    @property
+    def mean(self):
+        """ndarray : The mean impact distance and time of flight."""
+        return self.statistics.mean
+
+    @property
+    def covariance(self):
+        """ndarray : The covariance matrix of the impact distance and time of flight."""
+        return self.statistics.covariance
+
+    @property
+    def std(self):
+        """ndarray : The standard deviations of the impact distance and time of flight."""
+        return np.sqrt(np.diag(self.covariance))
+
+    @property
+    def cep(self):
+        """float : The circular error probable, which for impacts along the line of fire is the distance from the
+        mean impact within which half of the impacts land."""
+        return self.histogram.deviation_quantile(0, self.mean[0], 0.5)
+
+    def __repr__(self):
+        return "DispersionResult(samples={}, misses={}, mean={}, std={}, cep={:.6g}, seconds={:.6f})".format(
+            self.samples, self.misses, self.mean.tolist(), self.std.tolist(), self.cep, self.seconds)
+
+
+def _initialise_worker(config):
+    """Creates the simulation object used by every chunk simulated in this worker process.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation object, including its air density profile.
+    """
+    global _worker_simulator
+    _worker_simulator = model.from_config(config)
+
+
+def _draw(generator, nominal, distributions, size):
+    """Draws the launch parameters of a chunk of samples.
+
+    Parameters
+    ----------
+    generator : numpy.random.Generator
+        The random number generator of the chunk.
+    nominal : dict
+        The nominal value of each launch parameter.
+    distributions : dict
+        The distribution of each varied launch parameter, as described by the model.dispersion method.
+    size : int
+        The number of samples.
+
+    Returns
+    -------
+    parameters : dict
+        An array of samples for each varied launch parameter, and the nominal value of the others.
+    """
+    parameters = dict(nominal)
+    for name in PARAMETERS:
+        if name not in distributions:
+            continue
+        distribution = distributions[name]
+        if callable(distribution):
+            parameters[name] = np.asarray(distribution(generator, size), dtype=float)
+            continue
+        if not isinstance(distribution, tuple):
+            distribution = ("normal", distribution)
+        assert nominal[name] is not None, "A nominal value must be specified to vary the " + name
+        if distribution[0] == "normal":
+            parameters[name] = nominal[name] + distribution[1] * generator.standard_normal(size)
+        elif distribution[0] == "uniform":
+            parameters[name] = nominal[name] + generator.uniform(-distribution[1], distribution[1], size)
+        else:
+            raise ValueError("Distribution not recognised", distribution[0])
+    return parameters
+
+
+def _simulate_chunk(seed, size, nominal, distributions, stop_height, simulator=None):
+    """Draws and simulates a chunk of samples with the batch engine.
+
+    Parameters
+    ----------
+    seed : numpy.random.SeedSequence
+        The seed of the chunk's random number generator.
+    size : int
+        The number of samples.
+    nominal : dict
+        The nominal value of each launch parameter.
+    distributions : dict
+        The distribution of each varied launch parameter.
+    stop_height : float
+        The height at which each simulation will halt during the descending phase.
+    simulator : model, optional
+        The simulation object used for simulating, by default that of the worker process.
+
+    Returns
+    -------
+    impacts : ndarray
+        The impact distance and time of flight of each sample, one pair per row, which are NaN if the sample never
+        reached the stop height.
+    """
+    simulator = _worker_simulator if simulator is None else simulator
+    parameters = _draw(np.random.default_rng(seed), nominal, distributions, size)
+    results = simulator.run_batch(np.broadcast_to(parameters["angle"], size), parameters["velocity"], stop_height,
+                                  masses=parameters["mass"] if "mass" in distributions else None,
+                                  drag_coefficients=parameters["drag_coefficient"]
+                                  if "drag_coefficient" in distributions else None)
+    return np.column_stack([results["impact"][:, 0], results["time_of_flight"]])
+
+
+def _summarise(impacts, edges):
+    """Gathers the streaming statistics of a chunk of impacts.
+
+    Parameters
+    ----------
+    impacts : ndarray
+        The impact distance and time of flight of each sample, one pair per row.
+    edges : ndarray
+        The histogram bin edges of each impact quantity.
+
+    Returns
+    -------
+    statistics, histogram, misses : RunningStatistics, StreamingHistogram, int
+        The statistics and histograms of the impacts that reached the stop height, and the number that did not.
+    """
+    reached = np.all(np.isfinite(impacts), axis=1)
+    statistics = RunningStatistics(len(QUANTITIES))
+    statistics.update(impacts[reached])
+    histogram = StreamingHistogram(edges)
+    histogram.update(impacts[reached])
+    return statistics, histogram, int(np.count_nonzero(~reached))
+
+
+def _dispersion_chunk(seed, size, nominal, distributions, stop_height, edges, simulator=None):
+    """Simulates a chunk of samples and gathers their streaming statistics.
+
+    Parameters
+    ----------
+    seed : numpy.random.SeedSequence
+        The seed of the chunk's random number generator.
+    size : int
+        The number of samples.
+    nominal : dict
+        The nominal value of each launch parameter.
+    distributions : dict
+        The distribution of each varied launch parameter.
+    stop_height : float
+        The height at which each simulation will halt during the descending phase.
+    edges : ndarray
+        The histogram bin edges of each impact quantity.
+    simulator : model, optional
+        The simulation object used for simulating, by default that of the worker process.
+
+    Returns
+    -------
+    statistics, histogram, misses : RunningStatistics, StreamingHistogram, int
+        The statistics of the chunk, as returned by _summarise.
+    """
+    impacts = _simulate_chunk(seed, size, nominal, distributions, stop_height, simulator)
+    return _summarise(impacts, edges)
+
+
+def _histogram_edges(impacts, bins, span):
+    """Chooses histogram bins that cover the impacts of the first chunk of samples.
+
+    Parameters
+    ----------
+    impacts : ndarray
+        The impact distance and time of flight of each sample of the first chunk, one pair per row.
+    bins : int
+        The number of bins of each histogram.
+    span : float
+        The number of standard deviations either side of the mean covered by the bins.
+
+    Returns
+    -------
+    edges : ndarray
+        The bin edges of each impact quantity, one row per quantity.
+    """
+    reached = impacts[np.all(np.isfinite(impacts), axis=1)]
+    if not len(reached):
+        reached = np.zeros((1, len(QUANTITIES)))
+    centre = reached.mean(axis=0)
+    # Spread the bins over a small width when every sample landed in the same place
+    width = np.maximum(span * reached.std(axis=0), np.maximum(1e-9 * np.abs(centre), 1e-9))
+    return np.linspace(centre - width, centre + width, bins + 1).T
+
+
+def dispersion(simulator, n_samples, distributions, seed=None, stop_height=0, chunksize=4096, workers=1, bins=256,
+               span=8.0):
+    """Runs a Monte Carlo dispersion analysis, as described by the model.dispersion method.
+
+    Parameters
+    ----------
+    simulator : model
+        The simulation object describing the nominal launch and projectile.
+    n_samples : int
+        The number of samples to simulate.
+    distributions : dict
+        The distribution of each varied launch parameter.
+    seed : int or numpy.random.SeedSequence, optional
+        The root seed that the seed of every chunk is spawned from.
+    stop_height : float
+        The height at which each simulation will halt during the descending phase.
+    chunksize : int
+        The number of samples simulated in each batch.
+    workers : int, optional
+        The number of worker processes, or None for the number of processors.
+    bins : int
+        The number of bins of each histogram.
+    span : float
+        The number of standard deviations either side of the first chunk's mean covered by the histograms.
+
+    Returns
+    -------
+    result : DispersionResult
+        The statistics of the impacts.
+    """
+    assert n_samples > 0, "Number of samples must be positive"
+    assert chunksize > 0, "Chunk size must be positive"
+    assert bins > 0, "Number of bins must be positive"
+    for name in distributions:
+        assert name in PARAMETERS, "Launch parameter not recognised"
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    assert workers > 0, "Number of workers must be positive"
+    start = perf_counter()
+
+    nominal = {"velocity": simulator.initial_velocity, "angle": simulator.initial_angle, "mass": simulator.mass,
+               "drag_coefficient": simulator.drag_coefficient}
+    sizes = [chunksize] * (n_samples // chunksize) + ([n_samples % chunksize] if n_samples % chunksize else [])
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(len(sizes))
+
+    # The first chunk is always simulated here, so that it can place the histogram bins for every other chunk
+    impacts = _simulate_chunk(seeds[0], sizes[0], nominal, distributions, stop_height, simulator)
+    edges = _histogram_edges(impacts, bins, span)
+    statistics, histogram, misses = _summarise(impacts, edges)
+
+    chunks = ((seeds[index], sizes[index], nominal, distributions, stop_height, edges)
+              for index in range(1, len(sizes)))
+    # Chunks are always merged in order, so the results do not depend on the number of workers
+    for chunk_statistics, chunk_histogram, chunk_misses in _summaries(simulator, chunks, workers):
+        statistics.merge(chunk_statistics)
+        histogram.merge(chunk_histogram)
+        misses += chunk_misses
+
+    return DispersionResult(n_samples, misses, statistics, histogram, perf_counter() - start)
+
+
+def _summaries(simulator, chunks, workers):
+    """Simulates chunks of samples, across a pool of worker processes if there is more than one worker, with only a
+    few chunks per worker in flight at once.
+
+    Parameters
+    ----------
+    simulator : model
+        The simulation object used in this process, whose configuration is sent to each worker.
+    chunks : iterator
+        The arguments of each chunk, as taken by _dispersion_chunk.
+    workers : int
+        The number of worker processes.
+
+    Yields
+    ------
+    summary : tuple
+        The summary of each chunk in order, as returned by _dispersion_chunk.
+    """
+    if workers == 1:
+        for chunk in chunks:
+            yield _dispersion_chunk(*chunk, simulator=simulator)
+        return
+
+    # The immutable configuration carries the air density profile, which the constructor arguments leave out
+    config = simulator.simulation_config()
+    with ProcessPoolExecutor(workers, initializer=_initialise_worker, initargs=(config,)) as executor:
+        pending = deque(executor.submit(_dispersion_chunk, *chunk) for chunk in islice(chunks, 2 * workers))
+        while pending:
+            future = pending.popleft()
+            for chunk in islice(chunks, 1):
+                pending.append(executor.submit(_dispersion_chunk, *chunk))
+            yield future.result()
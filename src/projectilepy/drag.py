@@ -0,0 +1,161 @@
+import math
+import numpy as np
+
+from projectilepy.atmosphere import _uniform_grid
+
+# The standard G1 (flat base) and G7 (long boat tail) drag functions as Mach-drag coefficient pairs.
+G1_TABLE = [[0.0, 0.2629], [0.05, 0.2558], [0.1, 0.2487], [0.15, 0.2413], [0.2, 0.2344], [0.25, 0.2278],
+            [0.3, 0.2214], [0.35, 0.2155], [0.4, 0.2104], [0.45, 0.2061], [0.5, 0.2032], [0.55, 0.2020],
+            [0.6, 0.2034], [0.65, 0.2083], [0.7, 0.2165], [0.725, 0.2230], [0.75, 0.2313], [0.775, 0.2417],
+            [0.8, 0.2546], [0.825, 0.2706], [0.85, 0.2901], [0.875, 0.3136], [0.9, 0.3415], [0.925, 0.3734],
+            [0.95, 0.4084], [0.975, 0.4448], [1.0, 0.4805], [1.025, 0.5136], [1.05, 0.5427], [1.075, 0.5677],
+            [1.1, 0.5883], [1.125, 0.6053], [1.15, 0.6191], [1.2, 0.6393], [1.25, 0.6518], [1.3, 0.6589],
+            [1.35, 0.6621], [1.4, 0.6625], [1.45, 0.6607], [1.5, 0.6573], [1.55, 0.6528], [1.6, 0.6474],
+            [1.65, 0.6413], [1.7, 0.6347], [1.75, 0.6280], [1.8, 0.6210], [1.85, 0.6141], [1.9, 0.6072],
+            [1.95, 0.6003], [2.0, 0.5934], [2.05, 0.5867], [2.1, 0.5804], [2.15, 0.5743], [2.2, 0.5685],
+            [2.25, 0.5630], [2.3, 0.5577], [2.35, 0.5527], [2.4, 0.5481], [2.45, 0.5438], [2.5, 0.5397],
+            [2.6, 0.5325], [2.7, 0.5264], [2.8, 0.5211], [2.9, 0.5168], [3.0, 0.5133], [3.1, 0.5105],
+            [3.2, 0.5084], [3.3, 0.5067], [3.4, 0.5054], [3.5, 0.5040], [3.6, 0.5030], [3.7, 0.5022],
+            [3.8, 0.5016], [3.9, 0.5010], [4.0, 0.5006], [4.2, 0.4998], [4.4, 0.4995], [4.6, 0.4992],
+            [4.8, 0.4990], [5.0, 0.4988]]
+G7_TABLE = [[0.0, 0.1198], [0.05, 0.1197], [0.1, 0.1196], [0.15, 0.1194], [0.2, 0.1193], [0.25, 0.1194],
+            [0.3, 0.1194], [0.35, 0.1194], [0.4, 0.1193], [0.45, 0.1193], [0.5, 0.1194], [0.55, 0.1193],
+            [0.6, 0.1194], [0.65, 0.1197], [0.7, 0.1202], [0.725, 0.1207], [0.75, 0.1215], [0.775, 0.1226],
+            [0.8, 0.1242], [0.825, 0.1266], [0.85, 0.1306], [0.875, 0.1368], [0.9, 0.1464], [0.925, 0.1660],
+            [0.95, 0.2054], [0.975, 0.2993], [1.0, 0.3803], [1.025, 0.4015], [1.05, 0.4043], [1.075, 0.4034],
+            [1.1, 0.4014], [1.125, 0.3987], [1.15, 0.3955], [1.2, 0.3884], [1.25, 0.3810], [1.3, 0.3732],
+            [1.35, 0.3657], [1.4, 0.3580], [1.5, 0.3440], [1.55, 0.3376], [1.6, 0.3315], [1.65, 0.3260],
+            [1.7, 0.3209], [1.75, 0.3160], [1.8, 0.3117], [1.85, 0.3078], [1.9, 0.3042], [1.95, 0.3010],
+            [2.0, 0.2980], [2.05, 0.2951], [2.1, 0.2922], [2.15, 0.2892], [2.2, 0.2864], [2.25, 0.2835],
+            [2.3, 0.2807], [2.35, 0.2779], [2.4, 0.2752], [2.45, 0.2725], [2.5, 0.2697], [2.55, 0.2670],
+            [2.6, 0.2643], [2.65, 0.2615], [2.7, 0.2588], [2.75, 0.2561], [2.8, 0.2533], [2.85, 0.2506],
+            [2.9, 0.2479], [2.95, 0.2451], [3.0, 0.2424], [3.1, 0.2368], [3.2, 0.2313], [3.3, 0.2258],
+            [3.4, 0.2205], [3.5, 0.2154], [3.6, 0.2106], [3.7, 0.2060], [3.8, 0.2017], [3.9, 0.1975],
+            [4.0, 0.1935], [4.2, 0.1861], [4.4, 0.1793], [4.6, 0.1730], [4.8, 0.1672], [5.0, 0.1618]]
+STANDARD_TABLES = {"G1": G1_TABLE, "G7": G7_TABLE}
+
+
+class DragTable:
+    def __init__(self, table, interval=None):
+        """An immutable drag coefficient curve against Mach number stored on a uniform Mach grid, so that the drag
+        coefficient at any Mach number is found with direct index arithmetic and linear interpolation between the
+        neighbouring grid points. The drag coefficient is clamped outside of the table.
+
+        Parameters
+        ----------
+        table : array_like or dict
+            The Mach-drag coefficient coordinate pairs of the curve, either as a 2-D array with one pair per row or
+            as a dictionary mapping Mach numbers to drag coefficients. The Mach numbers need not be evenly spaced.
+        interval : float, optional
+            The largest spacing of the Mach grid, which is reduced to divide the Mach span of the table. By default
+            the grid has a point at every Mach number of the table where possible.
+        """
+        self.__base, self.__interval, self.__coefficients = _uniform_grid(table, interval)
+        assert np.all(self.__coefficients >= 0), "Drag coefficients must be positive"
+        # Scalar lookups index a list, which is much faster than indexing an array one element at a time
+        self.__values = self.__coefficients.tolist()
+        self.__hash = hash((self.__base, self.__interval, self.__coefficients.tobytes()))
+
+    @property
+    def machs(self):
+        """ndarray : The Mach number of each grid point."""
+        return self.__base + np.arange(self.__coefficients.size) * self.__interval
+
+    @property
+    def grid(self):
+        """ndarray : A read-only view of the drag coefficient at each grid point."""
+        return self.__coefficients
+
+    def __eq__(self, other):
+        return isinstance(other, DragTable) and self.__hash == other.__hash and self.__base == other.__base and \
+            self.__interval == other.__interval and np.array_equal(self.__coefficients, other.__coefficients)
+
+    def __hash__(self):
+        return self.__hash
+
+    def coefficient(self, mach):
+        """Finds the drag coefficient at a single Mach number.
+
+        Parameters
+        ----------
+        mach : float
+            The Mach number to find the drag coefficient at.
+
+        Returns
+        -------
+        drag_coefficient : float
+            The linearly interpolated drag coefficient.
+        """
+        position = (mach - self.__base) / self.__interval
+        index = math.floor(position)
+        values = self.__values
+        if index < 0 or index >= len(values) - 1:
+            return values[0] if index < 0 else values[-1]
+        return values[index] + (position - index) * (values[index + 1] - values[index])
+
+    def slope(self, mach):
+        """Finds the rate of change of the drag coefficient with Mach number, which is constant between grid
+        points and zero where the drag coefficient is clamped.
+
+        Parameters
+        ----------
+        mach : float
+            The Mach number to find the slope at.
+
+        Returns
+        -------
+        slope : float
+            The drag coefficient slope per unit Mach number.
+        """
+        index = math.floor((mach - self.__base) / self.__interval)
+        values = self.__values
+        if index < 0 or index >= len(values) - 1:
+            return 0.0
+        return (values[index + 1] - values[index]) / self.__interval
+
+    def coefficients(self, machs):
+        """Finds the drag coefficient at many Mach numbers at once.
+
+        Parameters
+        ----------
+        machs : array_like
+            The Mach numbers to find the drag coefficient at.
+
+        Returns
+        -------
+        drag_coefficients : ndarray
+            The linearly interpolated drag coefficients, shaped like the Mach numbers.
+        """
+        position = (np.asarray(machs, dtype=float) - self.__base) / self.__interval
+        last = self.__coefficients.size - 1
+        np.clip(position, 0, last, out=position)
+        index = np.minimum(position.astype(np.int64), last - 1)
+        lower = self.__coefficients[index]
+        return lower + (position - index) * (self.__coefficients[index + 1] - lower)
+
+
+_standard_tables = {}
+
+
+def as_drag_table(table):
+    """Converts a drag curve into a drag table, building the shared standard tables on first use.
+
+    Parameters
+    ----------
+    table : DragTable, string, array_like or dict
+        The drag curve, either as a drag table, the name of a standard table such as "G1" or "G7", or as Mach-drag
+        coefficient pairs.
+
+    Returns
+    -------
+    drag_table : DragTable
+        The curve as a drag table, or the table itself if it already is one.
+    """
+    if isinstance(table, DragTable):
+        return table
+    if isinstance(table, str):
+        assert table in STANDARD_TABLES, "Drag table not recognised"
+        if table not in _standard_tables:
+            _standard_tables[table] = DragTable(STANDARD_TABLES[table])
+        return _standard_tables[table]
+    return DragTable(table)
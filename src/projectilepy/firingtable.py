@@ -0,0 +1,363 @@
+import json
+import os
+import numpy as np
+
+from projectilepy.archive import _json_default
+from projectilepy.model import model
+
+
+class FiringTable:
+    # Arrays stored by the save method, one .npy file each
+    ARRAYS = ["angles", "velocities", "heights", "ranges", "times", "apex_heights"]
+
+    def __init__(self, config, angles, velocities, heights, ranges, times, apex_heights):
+        """A precomputed table of impact ranges over a grid of launch angles and velocities, used to answer firing
+        solution queries by interpolation followed by a short refinement with full simulations. Tables are usually
+        created with the build method, or opened from disk with the load method.
+
+        Parameters
+        ----------
+        config : dict
+            The configuration of the simulation object the table was built from, including its air density profile,
+            as taken by model.from_config.
+        angles : array_like
+            The increasing launch angles of the grid in degrees.
+        velocities : array_like
+            The increasing launch velocities of the grid.
+        heights : array_like
+            The increasing surface heights that impact ranges were recorded for.
+        ranges : array_like
+            The descending impact distance for each height, angle and velocity, or NaN if the height is not reached.
+        times : array_like
+            The time of flight to each impact in the ranges array.
+        apex_heights : array_like
+            The maximum height reached for each angle and velocity.
+        """
+        self.config = dict(config)
+        self.angles = angles
+        self.velocities = velocities
+        self.heights = heights
+        self.ranges = ranges
+        self.times = times
+        self.apex_heights = apex_heights
+        self.simulator = model.from_config(self.config)
+
+    @classmethod
+    def build(cls, simulator, angles=None, velocities=None, heights=(0,)):
+        """Builds a firing table by simulating every combination of the grid angles and velocities in a single run
+        of the simulator's batch engine.
+
+        Parameters
+        ----------
+        simulator : model
+            The simulation object describing the projectile.
+        angles : array_like, optional
+            The launch angles of the grid in degrees, by default every degree from 1 to 89.
+        velocities : array_like, optional
+            The launch velocities of the grid, by default 21 values from half to one and a half times the initial
+            velocity of the simulator.
+        heights : array_like, optional
+            The surface heights to record impact ranges for.
+
+        Returns
+        -------
+        table : FiringTable
+            The computed firing table.
+        """
+        angles = np.linspace(1, 89, 89) if angles is None else np.sort(np.asarray(angles, dtype=float))
+        if velocities is None:
+            velocities = np.linspace(0.5, 1.5, 21) * simulator.initial_velocity
+        velocities = np.sort(np.asarray(velocities, dtype=float))
+        heights = np.sort(np.asarray(heights, dtype=float))
+
+        # A single batch run down to the lowest height records the impacts at every height
+        results = simulator.run_batch(angles[:, None], velocities[None, :], stop_height=heights[0],
+                                      surface_heights=heights)
+        ranges = np.moveaxis(results["surface_impact"][..., 0], -1, 0)
+        times = np.moveaxis(results["surface_time_of_flight"], -1, 0)
+
+        # The full configuration keeps the air density profile, so refinements simulate the same physics
+        return cls(simulator.simulation_config().as_dict(), angles, velocities, heights,
+                   np.ascontiguousarray(ranges), np.ascontiguousarray(times), results["apex"][..., 1])
+
+    def save(self, path):
+        """Saves the table to a directory, with one uncompressed .npy file per array so that it can be
+        memory-mapped when loaded. Drag tables in the configuration are stored as Mach-drag coefficient pairs, and
+        the air density profile as the altitude-density pairs of its grid.
+
+        Parameters
+        ----------
+        path : str
+            The directory to save the table in, which is created if needed.
+        """
+        # The configuration is serialised before anything is written, and its file replaced in one step, so a
+        # failed save never leaves a truncated configuration behind
+        config = json.dumps(self.config, default=_json_default)
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, name + ".npy"), np.asarray(getattr(self, name)))
+        temporary = os.path.join(path, "config.json.tmp")
+        with open(temporary, "w") as file:
+            file.write(config)
+        os.replace(temporary, os.path.join(path, "config.json"))
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Loads a table saved with the save method. By default the arrays are memory-mapped read-only, so that
+        processes loading the same table share a single copy through the operating system's page cache.
+
+        Parameters
+        ----------
+        path : str
+            The directory the table was saved in.
+        mmap_mode : str, optional
+            The memory-map mode passed to numpy.load, or None to read the arrays fully into memory.
+
+        Returns
+        -------
+        table : FiringTable
+            The loaded firing table.
+        """
+        with open(os.path.join(path, "config.json")) as file:
+            config = json.load(file)
+        arrays = [np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode) for name in cls.ARRAYS]
+        return cls(config, *arrays)
+
+    @staticmethod
+    def __bracket(grid, value):
+        """Finds the grid interval containing a value for linear interpolation.
+
+        Parameters
+        ----------
+        grid : ndarray
+            The increasing grid values.
+        value : float
+            The value to locate.
+
+        Returns
+        -------
+        index, weight : int, float
+            The index of the lower grid value and the interpolation weight of the upper grid value, or None if the
+            value lies outside the grid.
+        """
+        if not grid[0] <= value <= grid[-1]:
+            return None
+        if grid.size == 1:
+            return 0, 0.0
+        index = min(int(np.searchsorted(grid, value, side="right")) - 1, grid.size - 2)
+        return index, (value - grid[index]) / (grid[index + 1] - grid[index])
+
+    @staticmethod
+    def __blend(array, axis, bracket):
+        """Linearly interpolates an array along one axis.
+
+        Parameters
+        ----------
+        array : ndarray
+            The array to interpolate.
+        axis : int
+            The axis to interpolate along.
+        bracket : tuple
+            The index and weight returned by the bracket method.
+
+        Returns
+        -------
+        values : ndarray
+            The interpolated array, with the given axis removed.
+        """
+        index, weight = bracket
+        lower = np.take(array, index, axis=axis)
+        if weight == 0:
+            return lower
+        return (1 - weight) * lower + weight * np.take(array, index + 1, axis=axis)
+
+    @staticmethod
+    def __branch_crossing(grid, curve, target, indices):
+        """Walks along a range curve and linearly interpolates the first crossing of the target range.
+
+        Parameters
+        ----------
+        grid : ndarray
+            The grid values the curve is defined on.
+        curve : ndarray
+            The impact range at each grid value.
+        target : float
+            The target range.
+        indices : array_like
+            The order of grid indices to walk along.
+
+        Returns
+        -------
+        value, slope : float
+            The interpolated grid value at the crossing and the local rate of change of range, or None if the curve
+            does not cross the target.
+        """
+        for first, second in zip(indices[:-1], indices[1:]):
+            if np.isnan(curve[first]) or np.isnan(curve[second]):
+                continue
+            if (curve[first] - target) * (curve[second] - target) <= 0 and curve[first] != curve[second]:
+                slope = (curve[second] - curve[first]) / (grid[second] - grid[first])
+                return float(grid[first] + (target - curve[first]) / slope), float(slope)
+        return None
+
+    def __fallback(self, method, parameter, launch, *args):
+        """Solves with the simulator's own solver at a given launch angle or velocity, restoring the simulator's
+        launch parameters afterwards.
+
+        Parameters
+        ----------
+        method : string
+            The name of the simulator's solver method.
+        parameter : string
+            Either "initial_angle" or "initial_velocity", the launch parameter that is held fixed.
+        launch : float
+            The value of the fixed launch parameter.
+        args : object
+            The arguments of the solver method.
+
+        Returns
+        -------
+        value : float
+            The result of the solver method.
+        """
+        initial = getattr(self.simulator, parameter)
+        setattr(self.simulator, parameter, launch)
+        try:
+            return getattr(self.simulator, method)(*args)
+        finally:
+            setattr(self.simulator, parameter, initial)
+
+    def __refine(self, target_vec, value, slope, max_error, max_iterations, override, fixed, launch):
+        """Refines an interpolated firing solution with secant iterations on full simulations, using the slope from
+        the table for the first step. Both launch parameters are passed as overrides, so the simulator's own launch
+        parameters are left unchanged.
+
+        Parameters
+        ----------
+        target_vec : array_like
+            The first two elements of the object should correspond to the target distance and relative height.
+        value : float
+            The interpolated launch angle or velocity.
+        slope : float
+            The rate of change of impact range with the launch angle or velocity from the table.
+        max_error : float
+            The termination accuracy of the impact range.
+        max_iterations : int
+            The maximum number of simulations to run.
+        override : string
+            Either "angle" or "velocity", the launch parameter being solved for.
+        fixed : string
+            Either "angle" or "velocity", the launch parameter held fixed.
+        launch : float
+            The value of the fixed launch parameter.
+
+        Returns
+        -------
+        value : float
+            The refined launch angle or velocity, or None if the refinement did not converge.
+        """
+        previous = None
+        for iterations in range(max_iterations):
+            try:
+                self.simulator.run(stop_height=min(0, target_vec[1]), **{"override_" + override: float(value),
+                                                                         "override_" + fixed: float(launch)})
+                impact = self.simulator.surface_impact(target_vec[1])[0]
+            except (AssertionError, IndexError, ValueError):
+                return None
+
+            error = target_vec[0] - impact
+            if abs(error) < max_error:
+                return value
+            if previous is not None and impact != previous[1]:
+                slope = (impact - previous[1]) / (value - previous[0])
+            previous = value, impact
+            value += error / slope
+        return None
+
+    def solve_angle(self, target_vec, lofted=False, velocity=None, max_error=0.1, refine=True, max_iterations=10):
+        """Finds a launch angle firing solution on the target by interpolating the table, then refining the
+        estimate with a few full simulations. Targets outside the heights and velocities covered by the table fall
+        back to the simulator's own solver.
+
+        Parameters
+        ----------
+        target_vec : array_like
+            The first two elements of the object should correspond to the target distance and relative height.
+        lofted : bool
+            Defines whether the calculated firing angle should be the lofted or un-lofted solution.
+        velocity : float, optional
+            The launch velocity, by default the initial velocity of the table's configuration.
+        max_error : float
+            Defines the termination accuracy of the refinement.
+        refine : bool
+            Should the interpolated angle be refined with full simulations.
+        max_iterations : int
+            The maximum number of simulations used by the refinement.
+
+        Returns
+        -------
+        angle : float
+            Firing solution angle in degrees, or None if not found.
+        """
+        velocity = self.config["initial_velocity"] if velocity is None else velocity
+        height_bracket = self.__bracket(self.heights, target_vec[1])
+        velocity_bracket = self.__bracket(self.velocities, velocity)
+        if height_bracket is None or velocity_bracket is None:
+            return self.__fallback("solve_angle", "initial_velocity", velocity, target_vec, lofted, max_error)
+
+        curve = self.__blend(self.__blend(self.ranges, 0, height_bracket), 1, velocity_bracket)
+        if np.all(np.isnan(curve)):
+            return None
+        peak = int(np.nanargmax(curve))
+        if curve[peak] < target_vec[0]:
+            return None
+
+        indices = np.arange(peak, self.angles.size) if lofted else np.arange(peak, -1, -1)
+        crossing = self.__branch_crossing(self.angles, curve, target_vec[0], indices)
+        if crossing is None:
+            return None
+        if not refine:
+            return crossing[0]
+
+        return self.__refine(target_vec, crossing[0], crossing[1], max_error, max_iterations, "angle", "velocity",
+                             velocity)
+
+    def solve_velocity(self, target_vec, angle=None, max_error=0.1, refine=True, max_iterations=10):
+        """Finds a launch velocity firing solution on the target by interpolating the table, then refining the
+        estimate with a few full simulations. Targets outside the heights and angles covered by the table, or that
+        need a velocity outside the table's velocities, fall back to the simulator's own solver.
+
+        Parameters
+        ----------
+        target_vec : array_like
+            The first two elements of the object should correspond to the target distance and relative height.
+        angle : float, optional
+            The launch angle in degrees, by default the initial angle of the table's configuration.
+        max_error : float
+            Defines the termination accuracy of the refinement.
+        refine : bool
+            Should the interpolated velocity be refined with full simulations.
+        max_iterations : int
+            The maximum number of simulations used by the refinement.
+
+        Returns
+        -------
+        velocity : float
+            Firing solution velocity in meters per second, or False if not found.
+        """
+        angle = self.config["initial_angle"] if angle is None else angle
+        height_bracket = self.__bracket(self.heights, target_vec[1])
+        angle_bracket = self.__bracket(self.angles, angle)
+        curve = None
+        if height_bracket is not None and angle_bracket is not None:
+            curve = self.__blend(self.__blend(self.ranges, 0, height_bracket), 0, angle_bracket)
+        crossing = None if curve is None else \
+            self.__branch_crossing(self.velocities, curve, target_vec[0], np.arange(self.velocities.size))
+        if crossing is None:
+            return self.__fallback("solve_velocity", "initial_angle", angle, target_vec, max_error)
+        if not refine:
+            return crossing[0]
+
+        velocity = self.__refine(target_vec, crossing[0], crossing[1], max_error, max_iterations, "velocity", "angle",
+                                 angle)
+        return False if velocity is None else velocity
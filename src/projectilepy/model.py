@@ -1,10 +1,44 @@
 import math
+from time import perf_counter
+
 import numpy as np
 
+from projectilepy import analytic
+from projectilepy.atmosphere import Atmosphere, as_atmosphere, default_atmosphere
+from projectilepy.cache import SimulationCache
+from projectilepy.drag import as_drag_table
+from projectilepy.simulation import SimulationCancelled, SimulationConfig, analytic_drag_rate, iter_simulate, _run, \
+    _stokes_drag_rate, _validate_drag_parameters
+from projectilepy.telemetry import Counters, SolveResult
+from projectilepy.trajectory import Trajectory
+
+# Coarse sweeps that seed the firing solution solvers take this many steps for a vertical dragless launch, and no
+# step may lose more than this fraction of the speed to drag
+_SWEEP_STEPS = 400
+_SWEEP_DRAG_LOSS = 0.05
+# Fraction by which a coarse sweep may fall short of the target before the target is treated as out of reach
+_SWEEP_MARGIN = 0.05
+# Maximum range searches sweep launch angles at this spacing in degrees before refining the best one to the tolerance
+_ENVELOPE_SPACING = 2.0
+_ENVELOPE_TOLERANCE = 0.01
+# Half width in degrees of the launches at the global time step that correct a coarse maximum range angle
+_ENVELOPE_WIDTH = 0.5
+# Fraction of the maximum range by which a target must lie beyond it before a solve rejects it without simulating
+_ENVELOPE_MARGIN = 0.01
+# Multi-resolution solves start at a time step where a vertical launch takes this many steps, and solve the coarse
+# steps to this fraction of the required accuracy
+_RESOLUTION_STEPS = 1600
+_RESOLUTION_ACCURACY = 0.25
+# Solves end rather than simulate a launch whose dragless flight to the target height takes more Euler steps than this
+_SOLVE_MAX_STEPS = 10 ** 6
+# Number of configurations whose maximum ranges are kept by each simulation object
+_ENVELOPE_CONFIGURATIONS = 64
+
 
 class model:
     def __init__(self, initial_velocity, initial_angle, initial_height=0, time_step=0.0005, gravity=9.981,
-                 drag="None", mass=None, drag_coefficient=None, cross_sectional_area=None):
+                 drag="None", mass=None, drag_coefficient=None, cross_sectional_area=None, integrator="euler",
+                 relative_tolerance=1e-6, absolute_tolerance=1e-6, drag_table=None):
         """A projectile simulation object with associated methods for simulating projectile motion and solving for
         various firing solutions. To start a simulation use the run method.
 
@@ -25,13 +59,31 @@ class model:
         mass : float
             Optional, the mass of the projectile used in drag calculations
         drag_coefficient : float
-            Optional, the drag coefficient of the projectile used in drag calculations
+            Optional, the drag coefficient of the projectile used in drag calculations. For Stokes drag this is the
+            linear drag constant in kilograms per second, such that the drag force is this constant times velocity.
         cross_sectional_area : float
             Optional, the cross-sectional area of the projectile in square meters used in drag calculations.
+        integrator : string
+            The integration method, either fixed step "euler", adaptive step "rk45", or the exact closed form
+            "analytic" solution which is available for dragless and Stokes drag simulations.
+        relative_tolerance : float
+            Optional, the relative error tolerance of each step taken by the adaptive integrator.
+        absolute_tolerance : float
+            Optional, the absolute error tolerance of each step taken by the adaptive integrator.
+        drag_table : DragTable, string, array_like or dict
+            Optional, the drag coefficient curve against Mach number used for Newtonian drag, either as a drag
+            table, the name of a standard table such as "G1" or "G7", or as Mach-drag coefficient pairs. The drag
+            coefficient then scales the curve as the form factor of the projectile, so a value of 1 gives the curve
+            itself. The Mach number uses the speed of sound at each altitude of the atmosphere.
         """
 
         assert drag in ["None", "Stokes", "Newtonian"], "Drag type not recognised"
+        assert integrator in ["euler", "rk45", "analytic"], "Integrator not recognised"
         self.drag = drag
+        self.integrator = integrator
+        self.relative_tolerance = relative_tolerance
+        self.absolute_tolerance = absolute_tolerance
+        self.drag_table = drag_table
         self.initial_angle = initial_angle
         self.initial_height = initial_height
         self.initial_velocity = initial_velocity
@@ -42,395 +94,1623 @@ class model:
         self.drag_coefficient = drag_coefficient
         self.mass = mass
 
-        # Credit to www.engineeringtoolbox.com for this data.
-        self.default_earth_atmospheric_density = [[-1000, 1.347], [0, 1.225], [1000, 1.112], [2000, 1.007],
-                                                  [3000, 0.9093], [4000, 0.8194], [5000, 0.7364], [6000, 0.6601],
-                                                  [7000, 0.5900], [8000, 0.5258], [9000, 0.4671], [10000, 0.4135],
-                                                  [15000, 0.1948], [20000, 0.08891], [25000, 0.04008], [30000, 0.01841],
-                                                  [40000, 0.003996], [50000, 0.001027], [60000, 0.0003097],
-                                                  [70000, 0.00008283], [80000, 0.00001846], [90000, 0]]
+        # A single immutable air density profile is shared by every simulation object
+        self.default_earth_atmospheric_density = default_atmosphere()
+
+        self.__trajectory = Trajectory(capacity=1)
+        self.__dense_trajectory = False
+        self.__solution = None
+        self.__stop_height = 0
+        self.cache = None
+        self.__envelope = {}
+        self.counters = Counters()
+        self.observer = None
+        self.last_solve_result = None
+        # Setting this event from another thread stops the running simulations of this object
+        self.cancel_event = None
+
+    # Constructor parameters that fully describe the configuration of a model
+    CONFIG_PARAMETERS = ["initial_velocity", "initial_angle", "initial_height", "time_step", "gravity", "drag", "mass",
+                         "drag_coefficient", "cross_sectional_area", "integrator", "relative_tolerance",
+                         "absolute_tolerance", "drag_table"]
+
+    def get_config(self):
+        """Returns the configuration of this object as a dictionary of constructor arguments, suitable for storing
+        as JSON or sending to another process.
 
-        # Construct an air density lookup table with entries at multiples of 50 meters using linear interpolation
-        self.default_earth_atmospheric_density = \
-            self.__construct_linearised_dictionary(self.default_earth_atmospheric_density)
+        Returns
+        -------
+        config : dict
+            The constructor arguments that recreate this object's configuration.
+        """
+        return {name: getattr(self, name) for name in self.CONFIG_PARAMETERS}
 
-        self.positionValues = []
-        self.velocityValues = []
+    @classmethod
+    def from_config(cls, config):
+        """Creates a new simulation object from a configuration dictionary, or from an immutable configuration. An
+        optional "density_profile" entry sets the air density profile of the new object.
 
-    def __construct_linearised_dictionary(self, input_list, interval=50):
-        """Constructs a dictionary with key-value pairs at the given interval for use in drag calculations.
-        Linearly interpolates missing values to give a more complete lookup table for drag calculations.
+        Parameters
+        ----------
+        config : dict or SimulationConfig
+            Constructor arguments, as returned by the get_config method, or a configuration as returned by the
+            simulation_config method.
+
+        Returns
+        -------
+        simulator : model
+            A new simulation object with the given configuration.
+        """
+        config = config.as_dict() if isinstance(config, SimulationConfig) else dict(config)
+        density_profile = config.pop("density_profile", None)
+        simulator = cls(**config)
+        if density_profile is not None:
+            simulator.default_earth_atmospheric_density = density_profile
+        return simulator
+
+    @property
+    def trajectory(self):
+        """Trajectory : The recorded steps of the last simulation. For analytic simulations the exact trajectory is
+        only sampled at the global time step when this is first accessed."""
+        if self.__trajectory is None:
+            self.__trajectory = self.__solution.sample(self.time_step, self.__stop_height)
+        return self.__trajectory
+
+    @property
+    def positionValues(self):
+        """ndarray : A view of the distance-height coordinate pairs recorded in the last simulation."""
+        return self.trajectory.positions
+
+    @property
+    def velocityValues(self):
+        """ndarray : A view of the velocity coordinate pairs recorded in the last simulation."""
+        return self.trajectory.velocities
+
+    @property
+    def timeValues(self):
+        """ndarray : A view of the time of each step recorded in the last simulation."""
+        return self.trajectory.times
+
+    def __analytic_solution(self, drag, angle, velocity):
+        """Constructs the exact trajectory for a dragless or Stokes drag projectile.
 
         Parameters
         ----------
-        input_list : array-like
-            The input list of x-y coordinate pairs that are used to create the dictionary.
-        interval : int
-            The interval of x values to create dictionary key-value pairs for.
+        drag : string
+            The drag model of the trajectory, either "None" or "Stokes".
+        angle : float
+            The initial angle of the fired projectile.
+        velocity : float
+            The initial velocity of the fired projectile.
 
         Returns
         -------
-        dictionary : dict
-            An linearly interpolated dictionary created from the input list x-y coordinate pairs.
+        solution : DraglessSolution or StokesSolution
+            The exact trajectory of the projectile.
         """
-        x_list, y_list = zip(*input_list)
-        interpolated_x = range(input_list[0][0] + interval, input_list[-1][0], interval)
-        dictionary = {}
+        return analytic.trajectory_solution(angle, velocity, self.gravity, self.__analytic_drag_rate(drag))
 
-        for x in interpolated_x:
-            dictionary[x] = self.__linear_interpolation(x, x_list, y_list)
-        return dictionary
+    def __analytic_drag_rate(self, drag):
+        """Finds the drag rate used by the exact trajectory solutions for the given drag model.
 
-    @staticmethod
-    def __linear_interpolation(x, x_data, y_data):
-        """Perform linear interpolation to estimate the value of y at a given value of x.
+        Parameters
+        ----------
+        drag : string
+            The drag model of the trajectory, either "None" or "Stokes".
+
+        Returns
+        -------
+        drag_rate : float
+            The linear drag constant divided by the mass, or zero for dragless trajectories.
+        """
+        return analytic_drag_rate(drag, self.mass, self.drag_coefficient)
+
+    def __resolve_overrides(self, override_drag, override_angle, override_velocity, override_density_profile):
+        """Validates the method overrides of a simulation and fills in the object parameters for those not given.
 
         Parameters
         ----------
-        x : float
-            The x value at which to estimate y.
-        x_data : array-like
-            A 1-D array of x values.
-        y_data : array-like
-            A 1-D array of y values corresponding to the x values.
+        override_drag : string, optional
+            Override that forces using a specific drag model for the numerical simulation.
+        override_angle : float, optional
+            Override that forces using a given initial launch angle in degrees between -90 and 90.
+        override_velocity : float, optional
+            Override that forces using a given initial launch velocity, if given it must be at least zero.
+        override_density_profile : Atmosphere, array_like or dict, optional
+            Override the fluid density profile used in drag calculations, either as an atmosphere or as
+            altitude-density coordinate pairs.
 
         Returns
         -------
-        float
-            The estimated value of y at the given value of x.
+        drag, angle, velocity, density_profile : tuple
+            The drag model, launch angle, launch velocity and fluid density profile of the simulation.
+        """
+        if override_drag is not None:
+            assert override_drag in ["None", "Stokes", "Newtonian"], "Drag type not recognised"
+            drag = override_drag
+        else:
+            drag = self.drag
 
-        Raises
-        ------
-        ValueError
-            If the input arrays do not have the same length or if the x value is out of range of the input data.
+        if override_angle is not None:
+            assert type(override_angle) == int or type(override_angle) == float, "Angle must be numerical"
+            assert -90 <= override_angle <= 90, "Angle must be between -90 and 90 degrees"
+            angle = override_angle
+        else:
+            angle = self.initial_angle
+
+        if override_velocity is not None:
+            assert type(override_velocity) == int or type(override_velocity) == float, "Velocity must be numerical"
+            assert override_velocity >= 0, "Initial velocity must be positive or zero"
+            velocity = override_velocity
+        else:
+            velocity = self.initial_velocity
+
+        if override_density_profile is not None:
+            assert isinstance(override_density_profile, (Atmosphere, dict, list, tuple, np.ndarray)), \
+                "Density profile must be an atmosphere, or altitude-density pairs"
+            density_profile = as_atmosphere(override_density_profile)
+        else:
+            density_profile = as_atmosphere(self.default_earth_atmospheric_density)
+
+        if drag not in ["None", "Stokes", "Newtonian"]:
+            raise ValueError("Drag type not recognised")
+        return drag, angle, velocity, density_profile
+
+    def simulation_config(self, override_drag=None, override_angle=None, override_velocity=None,
+                          override_density_profile=None, override_time_step=None):
+        """Captures the current parameters of this object as an immutable configuration, which can be simulated
+        with the simulate function concurrently from many threads without sharing this object's stored simulation
+        points.
+
+        Parameters
+        ----------
+        override_drag : string, optional
+            Override that forces using a specific drag model.
+        override_angle : float, optional
+            Override that forces using a given initial launch angle in degrees between -90 and 90.
+        override_velocity : float, optional
+            Override that forces using a given initial launch velocity, if given it must be at least zero.
+        override_density_profile : Atmosphere, array_like or dict, optional
+            Override the fluid density profile used in drag calculations, either as an atmosphere or as
+            altitude-density coordinate pairs.
+        override_time_step : float, optional
+            Override that forces using a given time step, if given it must be positive.
+
+        Returns
+        -------
+        config : SimulationConfig
+            The configuration of this object with the overrides applied.
         """
-        # Check that the input lists have the same length
-        if len(x_data) != len(y_data):
-            raise ValueError("The input lists must have the same length.")
+        drag, angle, velocity, density_profile = self.__resolve_overrides(override_drag, override_angle,
+                                                                          override_velocity, override_density_profile)
+        config = self.get_config()
+        config.update(drag=drag, initial_angle=angle, initial_velocity=velocity)
+        if override_time_step is not None:
+            assert override_time_step > 0, "Time step must be positive"
+            config.update(time_step=override_time_step)
+        return SimulationConfig(density_profile=density_profile, **config)
 
-        # Find the indices of the two x values that bracket x
-        i = np.searchsorted(x_data, x) - 1
-        if i < 0 or i >= len(x_data) - 1:
-            raise ValueError("The x value is out of range of the input data.")
-        j = i + 1
+    def run(self, stop_height=0, override_drag=None, override_angle=None, override_velocity=None,
+            override_density_profile=None, record="all", record_every=1, sensitivity=None, stop_range=None,
+            override_time_step=None):
+        """Manages a numerical projectile motion simulation using the object parameters or method overrides.
+        This replaces the stored simulation points from previous simulations with newly computed values.
+        The simulation is integrated with the method given by the integrator attribute. The parameters are captured
+        with the simulation_config method and integrated by the same engine as the simulate function, and the
+        resulting trajectory is then stored on this object, counted, and kept in its cache if one is enabled. The
+        simulate function should be used instead to share one configuration between threads.
 
-        # Perform linear interpolation
-        y = y_data[i] + ((y_data[j] - y_data[i]) / (x_data[j] - x_data[i])) * (x - x_data[i])
+        Long simulations at small time steps can be recorded with bounded memory by keeping only every k-th step,
+        or only the launch, apex, impact and final steps. The max_height, final_position and time_of_flight methods and
+        impacts at the stop height are unaffected, while other impacts are interpolated between the kept steps.
 
-        return y
+        Parameters
+        ----------
+        stop_height : float, optional
+            Height at which the numerical simulation will be halted during the descending path.
+        override_drag : string, optional
+            Override that forces using a specific drag model for the numerical simulation.
+        override_angle : float, optional
+            Override that forces using a given initial launch angle in degrees between -90 and 90.
+        override_velocity : float, optional
+            Override that forces using a given initial launch velocity, if given it must be at least zero.
+        override_density_profile : Atmosphere, array_like or dict, optional
+            Override the fluid density profile used in drag calculations, either as an atmosphere or as
+            altitude-density coordinate pairs.
+        record : string, optional
+            Either "all" to record the simulation steps, or "endpoints" to keep only the launch, apex, impact and
+            final steps.
+        record_every : int, optional
+            Record every k-th simulation step when recording "all" steps.
+        sensitivity : string, optional
+            Also record the derivatives of the position and velocity at each step with respect to a launch
+            parameter, either "angle" in degrees or "velocity". These are used by the surface_impact_derivative
+            method, and are not available with the analytic integrator.
+        stop_range : float, optional
+            Distance at which the numerical simulation will be halted if it is passed during the descending path,
+            which is not available with the analytic integrator.
+        override_time_step : float, optional
+            Override that forces using a given time step, if given it must be positive.
+        """
+        assert record in ["all", "endpoints"], "Recording mode not recognised"
+        assert type(record_every) == int and record_every > 0, "Recording interval must be a positive integer"
+        config = self.simulation_config(override_drag, override_angle, override_velocity, override_density_profile,
+                                        override_time_step)
+        drag, angle, velocity = config.drag, config.initial_angle, config.initial_velocity
+        record_every = record_every if record == "all" else None
+
+        start = perf_counter()
+        self.__solution = None
+        self.__stop_height = stop_height
+        self.__dense_trajectory = self.integrator == "rk45"
+        if self.integrator == "analytic" and sensitivity is None and stop_range is None:
+            self.__solution = self.__analytic_solution(drag, angle, velocity)
+            self.__trajectory = None
+            self.__count_simulation(drag, angle, velocity, stop_height, 0, start, False)
+            return
+
+        key = None
+        if self.cache is not None:
+            key = self.__cache_key(drag, angle, velocity, stop_height, config.density_profile) + \
+                (config.time_step, record_every, sensitivity, stop_range)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.__trajectory = cached
+                self.__count_simulation(drag, angle, velocity, stop_height, 0, start, True)
+                return
+
+        self.__trajectory, steps = _run(config, stop_height, record_every, sensitivity, stop_range, self.cancel_event)
+        self.__count_simulation(drag, angle, velocity, stop_height, steps, start, False)
+
+        if key is not None:
+            self.__trajectory.freeze()
+            self.cache.put(key, self.__trajectory, len(self.__trajectory), self.__trajectory.nbytes)
+
+    def __count_simulation(self, drag, angle, velocity, stop_height, steps, start, cached):
+        """Adds a finished simulation to the counters and notifies the observer.
 
-    def __simulate_dragless(self, angle, velocity, stop_height):
-        """Runs a single numerical simulation for a dragless projectile. Simulations are run using numerical
-        integration with the Euler method. Time step is defined globally with the class constructor.
+        Parameters
+        ----------
+        drag : string
+            The drag model of the simulation.
+        angle : float
+            The initial angle of the fired projectile.
+        velocity : float
+            The initial velocity of the fired projectile.
+        stop_height : float
+            The height at which the simulation halted during the descending phase.
+        steps : int
+            The number of integration steps taken.
+        start : float
+            The performance counter value when the simulation started.
+        cached : bool
+            Was the simulation restored from the cache.
+        """
+        seconds = perf_counter() - start
+        counters = self.counters
+        counters.simulations += 1
+        counters.cache_hits += cached
+        counters.steps += steps
+        counters.simulate_seconds += seconds
+        if self.observer is not None:
+            self.observer("simulation", {"drag": drag, "angle": angle, "velocity": velocity,
+                                         "stop_height": stop_height, "steps": steps, "seconds": seconds,
+                                         "cached": cached})
+
+    def iter_run(self, stop_height=0, override_drag=None, override_angle=None, override_velocity=None,
+                 override_density_profile=None, sensitivity=None, stop_range=None):
+        """Lazily simulates the projectile, generating its state after each step without recording anything.
+        This takes the same parameters as the run method, and leaves the stored simulation points unchanged.
 
         Parameters
         ----------
+        stop_height : float, optional
+            Height at which the numerical simulation will be halted during the descending path.
+        override_drag : string, optional
+            Override that forces using a specific drag model for the numerical simulation.
+        override_angle : float, optional
+            Override that forces using a given initial launch angle in degrees between -90 and 90.
+        override_velocity : float, optional
+            Override that forces using a given initial launch velocity, if given it must be at least zero.
+        override_density_profile : Atmosphere, array_like or dict, optional
+            Override the fluid density profile used in drag calculations, either as an atmosphere or as
+            altitude-density coordinate pairs.
+        sensitivity : string, optional
+            Also generate the derivatives of the position and velocity with respect to a launch parameter, either
+            "angle" in degrees or "velocity".
+        stop_range : float, optional
+            Distance at which the numerical simulation will be halted if it is passed during the descending path.
+
+        Yields
+        ------
+        state : tuple
+            The time, distance, height, horizontal velocity and vertical velocity of the projectile at each step,
+            followed by the derivatives of the position and velocity if a sensitivity parameter is given.
+        """
+        config = self.simulation_config(override_drag, override_angle, override_velocity, override_density_profile)
+        return iter_simulate(config, stop_height, sensitivity, stop_range)
+
+    def __cache_key(self, drag, angle, velocity, stop_height, density_profile):
+        """Builds the key identifying a simulation in the cache from every parameter that affects its result.
+        Keys are built from the current attribute values, so changing any attribute of this object automatically
+        stops earlier results from being returned.
+
+        Parameters
+        ----------
+        drag : string
+            The drag model of the simulation.
         angle : float
             The initial angle of the fired projectile.
         velocity : float
             The initial velocity of the fired projectile.
         stop_height : float
             The height at which the simulation will halt during the descending phase.
+        density_profile : Atmosphere
+            The fluid density profile of the simulation, which is compared by its contents.
+
+        Returns
+        -------
+        key : tuple
+            The hashable cache key.
+        """
+        config = self.get_config()
+        config.update(drag=drag, initial_angle=angle, initial_velocity=velocity)
+        if config["drag_table"] is not None:
+            config["drag_table"] = as_drag_table(config["drag_table"])
+        return tuple(config[name] for name in self.CONFIG_PARAMETERS) + \
+            (stop_height, density_profile if drag == "Newtonian" else None)
+
+    def enable_cache(self, max_entries=128, max_steps=None, max_bytes=None):
+        """Enables memoisation of the run method, so that repeating a simulation with identical parameters
+        restores the stored result instead of recomputing it. Cached trajectories are read-only. A cache can also be
+        shared between simulation objects by assigning it to their cache attribute.
+
+        Parameters
+        ----------
+        max_entries : int
+            The maximum number of cached simulations.
+        max_steps : int, optional
+            The maximum total number of trajectory steps held by the cache.
+        max_bytes : int, optional
+            The maximum total number of bytes of trajectory storage held by the cache.
 
         Returns
         -------
-        positionValues, velocityValues : list
-            Output lists of coordinate pairs for both position and velocity.
+        cache : SimulationCache
+            The newly enabled cache, which also reports hit and miss statistics.
         """
-        positionVec = [0, 0]
-        velocityVec = [math.cos(math.radians(angle)) * velocity, math.sin(math.radians(angle)) * velocity]
+        self.cache = SimulationCache(max_entries, max_steps, max_bytes)
+        return self.cache
+
+    def disable_cache(self):
+        """Disables memoisation of the run method and releases the cached simulations."""
+        self.cache = None
+
+    def __simulate_batch(self, angles, velocities, stop_height, drag, surface_heights, time_step=None, masses=None,
+                         drag_coefficients=None):
+        """Runs many numerical simulations in lockstep using the Euler method on NumPy arrays. Each lane
+        follows exactly the same update rule as the single shot simulations, and is retired from the batch once it
+        has descended past the stop height.
 
-        positionValues = [positionVec[:]]
-        velocityValues = [velocityVec[:]]
+        Parameters
+        ----------
+        angles : ndarray
+            A 1-D array of initial launch angles in degrees.
+        velocities : ndarray
+            A 1-D array of initial launch velocities, the same length as angles.
+        stop_height : float
+            The height at which each simulation will halt during the descending phase.
+        drag : string
+            The drag model used for every lane.
+        surface_heights : ndarray
+            A 1-D array of heights to record descending impacts for, in addition to the stop height.
+        time_step : float, optional
+            The time step of the simulations, by default the global time step.
+        masses : ndarray, optional
+            A 1-D array of the mass of each lane, by default the mass of this object for every lane.
+        drag_coefficients : ndarray, optional
+            A 1-D array of the drag coefficient of each lane, by default the drag coefficient of this object for
+            every lane.
 
-        while True:  # numerical integration (Euler method)
-            positionVec[0] += self.time_step * velocityVec[0]
-            positionVec[1] += self.time_step * velocityVec[1]
+        Returns
+        -------
+        impacts, apex, times : ndarray
+            The descending impact position at each surface height followed by the stop height, the highest
+            position, and the time of each impact. Impacts are linearly interpolated between the steps either side
+            of the surface, or are the final position if the simulation halted above the surface.
+        """
+        if time_step is None:
+            time_step = self.time_step
+        count = angles.size
+        levels = np.append(surface_heights, stop_height)[:, None]
+        impacts = np.full((levels.size, count, 2), np.nan)
+        impacts[:, :, 1] = levels
+        apex = np.zeros((count, 2))
+        times = np.full((levels.size, count), np.nan)
+
+        if masses is None:
+            masses = self.mass
+        if drag_coefficients is None:
+            drag_coefficients = self.drag_coefficient
+        if drag == "Newtonian":
+            atmosphere = as_atmosphere(self.default_earth_atmospheric_density)
+            densities, speeds_of_sound = atmosphere.densities, atmosphere.speeds_of_sound
+            drag_factor = np.broadcast_to(0.5 * drag_coefficients * self.cross_sectional_area / masses, count).copy()
+            table = None if self.drag_table is None else as_drag_table(self.drag_table)
+        elif drag == "Stokes":
+            drag_rate = np.broadcast_to(np.divide(drag_coefficients, masses), count).copy()
+
+        # Working arrays only hold the lanes that are still in flight
+        lanes = np.arange(count)
+        x = np.zeros(count)
+        y = np.zeros(count)
+        vx = np.cos(np.radians(angles)) * velocities
+        vy = np.sin(np.radians(angles)) * velocities
+        previousX, previousY = np.zeros(count), np.zeros(count)
+        apexX, apexY = np.zeros(count), np.zeros(count)
+        impactX, impactTime = np.full((levels.size, count), np.nan), np.full((levels.size, count), np.nan)
+
+        step = 0
+        cancel_event = self.cancel_event
+        while lanes.size:  # numerical integration (Euler method)
+            step += 1
+            if cancel_event is not None and cancel_event.is_set():
+                raise SimulationCancelled("Simulation cancelled")
+            np.copyto(previousX, x)
+            np.copyto(previousY, y)
+            x += time_step * vx
+            y += time_step * vy
+
+            if drag == "Newtonian":
+                # Reducing the speed along the direction of travel is a rescaling of both velocity components
+                speed = np.hypot(vx, vy)
+                if table is None:
+                    scale = 1 - drag_factor * time_step * densities(y) * speed
+                else:
+                    scale = 1 - drag_factor * table.coefficients(speed / speeds_of_sound(y)) * time_step * \
+                        densities(y) * speed
+                vx *= scale
+                vy *= scale
+            elif drag == "Stokes":
+                vx -= time_step * drag_rate * vx
+                vy -= time_step * drag_rate * vy
 
             # Apply gravity
-            velocityVec[1] -= self.time_step * self.gravity
+            vy -= time_step * self.gravity
+
+            higher = y > apexY
+            np.copyto(apexX, x, where=higher)
+            np.copyto(apexY, y, where=higher)
+
+            # Interpolate the lanes that have just descended through a surface
+            level, lane = np.nonzero((previousY >= levels) & (y < levels))
+            if level.size:
+                fraction = (previousY[lane] - levels[level, 0]) / (previousY[lane] - y[lane])
+                impactX[level, lane] = previousX[lane] + fraction * (x[lane] - previousX[lane])
+                impactTime[level, lane] = (step - 1 + fraction) * time_step
+
+            finished = (y < previousY) & (previousY < stop_height)
+            if finished.any():
+                done = lanes[finished]
+                apex[done, 0], apex[done, 1] = apexX[finished], apexY[finished]
+
+                # Surfaces that were reached but not descended through before halting take the final position
+                halted = np.isnan(impactX[:, finished]) & (apexY[finished] >= levels)
+                impactX[:, finished] = np.where(halted, x[finished], impactX[:, finished])
+                impactTime[:, finished] = np.where(halted, step * time_step, impactTime[:, finished])
+                impacts[:, done, 0] = impactX[:, finished]
+                impacts[:, done, 1] = np.where(halted, y[finished], levels)
+                times[:, done] = impactTime[:, finished]
+
+                flying = ~finished
+                lanes = lanes[flying]
+                x, y, vx, vy = x[flying], y[flying], vx[flying], vy[flying]
+                previousX, previousY = previousX[flying], previousY[flying]
+                apexX, apexY = apexX[flying], apexY[flying]
+                impactX, impactTime = impactX[:, flying], impactTime[:, flying]
+                if drag == "Newtonian":
+                    drag_factor = drag_factor[flying]
+                elif drag == "Stokes":
+                    drag_rate = drag_rate[flying]
+
+        impacts[np.isnan(impacts[..., 0])] = np.nan
+        return impacts, apex, times
+
+    def run_batch(self, angles, velocities, stop_height=0, override_drag=None, surface_heights=None, masses=None,
+                  drag_coefficients=None):
+        """Simulates many projectiles at once, advancing every (angle, velocity) pair in lockstep on NumPy arrays.
+        This gives the same results as calling the run method for each pair, but without the per-shot interpreter
+        overhead. Unlike the run method, the stored simulation points of this object are left untouched.
 
-            # Record position and velocity
-            positionValues.append(positionVec[:])
-            velocityValues.append(velocityVec[:])
+        Parameters
+        ----------
+        angles : array_like
+            Initial launch angles in degrees between -90 and 90.
+        velocities : array_like
+            Initial launch velocities, broadcast against the angles. Each must be at least zero.
+        stop_height : float, optional
+            Height at which each simulation will be halted during the descending path.
+        override_drag : string, optional
+            Override that forces using a specific drag model for the numerical simulations.
+        surface_heights : array_like, optional
+            Additional surface heights to record descending impacts for during the same simulations.
+        masses : array_like, optional
+            The mass of each projectile, broadcast against the angles and velocities. By default every projectile
+            has the mass of this object.
+        drag_coefficients : array_like, optional
+            The drag coefficient of each projectile, broadcast against the angles and velocities. By default every
+            projectile has the drag coefficient of this object.
 
-            if positionValues[-1][1] < positionValues[-2][1] < stop_height:
-                break
+        Returns
+        -------
+        results : dict
+            A dictionary of arrays shaped like the broadcast inputs. "impact" and "apex" hold distance-height
+            coordinate pairs for the descending impact at the stop height and the highest position, and
+            "time_of_flight" holds the time in seconds at which the impact position was reached. Impacts are
+            interpolated between steps in the same way as the surface_impact method, and are NaN if the projectile
+            never reached the stop height. If surface heights are given, "surface_impact" and
+            "surface_time_of_flight" hold the impacts and times for each surface height along an extra axis before
+            the coordinate axis. Surface heights below the stop height are only recorded up to the stop height.
+        """
+        if override_drag is not None:
+            assert override_drag in ["None", "Stokes", "Newtonian"], "Drag type not recognised"
+            drag = override_drag
+        else:
+            drag = self.drag
+
+        parameters = [angles, velocities, masses, drag_coefficients]
+        given = [index for index, value in enumerate(parameters) if value is not None]
+        arrays = np.broadcast_arrays(*(np.asarray(parameters[index], dtype=float) for index in given))
+        shape = arrays[0].shape
+        for index, array in zip(given, arrays):
+            parameters[index] = array.ravel()
+        angles, velocities, masses, drag_coefficients = parameters
+        assert np.all((-90 <= angles) & (angles <= 90)), "Angle must be between -90 and 90 degrees"
+        assert np.all(velocities >= 0), "Initial velocity must be positive or zero"
+
+        # Per projectile parameters are only checked against the scalar rules when they are not given
+        if masses is not None:
+            assert np.all(masses > 0), "A positive mass must be specified for drag simulation"
+        if drag_coefficients is not None:
+            assert np.all(drag_coefficients >= 0), "A positive drag coefficient must be specified for drag simulation"
+        if drag == "Newtonian":
+            _validate_drag_parameters(self.mass if masses is None else 1.0,
+                                      self.drag_coefficient if drag_coefficients is None else 0.0,
+                                      self.cross_sectional_area)
+        elif drag == "Stokes":
+            _stokes_drag_rate(self.mass if masses is None else 1.0,
+                              self.drag_coefficient if drag_coefficients is None else 0.0)
+        elif drag != "None":
+            raise ValueError("Drag type not recognised")
 
-        return positionValues, velocityValues
+        surface_heights = np.atleast_1d(np.asarray([] if surface_heights is None else surface_heights, dtype=float))
+        impacts, apex, times = self.__simulate_batch(angles, velocities, stop_height, drag, surface_heights,
+                                                     masses=masses, drag_coefficients=drag_coefficients)
 
-    def __simulate_newtonian(self, angle, velocity, stop_height, mass, drag_coefficient, cross_sectional_area,
-                             fluid_density_profile="Default"):
-        """Runs a single numerical simulation for a projectile as influenced by Newtonian drag.
+        results = {"angle": angles.reshape(shape),
+                   "velocity": velocities.reshape(shape),
+                   "impact": impacts[-1].reshape(shape + (2,)),
+                   "apex": apex.reshape(shape + (2,)),
+                   "time_of_flight": times[-1].reshape(shape)}
+        if surface_heights.size:
+            results["surface_impact"] = np.moveaxis(impacts[:-1], 0, -2).reshape(shape + (surface_heights.size, 2))
+            results["surface_time_of_flight"] = np.moveaxis(times[:-1], 0, -1).reshape(shape + (surface_heights.size,))
+        return results
+
+    def max_range(self, surface_height=0, override_velocity=None):
+        """Finds the launch angle that gives the furthest descending impact at a surface height, and the distance of
+        that impact. See the envelope method for how it is found.
+
+        Parameters
+        ----------
+        surface_height : float, optional
+            The height of the surface relative to the launch height.
+        override_velocity : float, optional
+            Override that forces using a given initial launch velocity, if given it must be at least zero.
+
+        Returns
+        -------
+        angle, distance : float
+            The maximum range launch angle in degrees and the maximum range, or None and None if no launch angle
+            reaches the surface height.
+        """
+        velocity = self.initial_velocity if override_velocity is None else override_velocity
+        envelope = self.envelope(velocity, surface_height)
+        angle, distance = float(envelope["angle"][0, 0]), float(envelope["distance"][0, 0])
+        if math.isnan(distance):
+            return None, None
+        return angle, distance
+
+    def envelope(self, velocities=None, heights=0):
+        """Finds the reachable envelope of the projectile, which is the furthest distance at which it can descend
+        through each height for each launch velocity, along with the launch angle that reaches it. A coarse batch
+        sweep of launch angles locates the best angle for every pair at once, which is then refined by golden-section
+        search with every pair advancing in lockstep through the same batch simulations at the global time step. With
+        the analytic integrator the envelope is instead found from the exact trajectories.
+
+        Results are kept for each configuration of this object, so repeating the same velocities and heights is free.
+        The solve_angle method uses the kept results to reject targets beyond the envelope without simulating, and
+        to bracket the un-lofted and lofted solutions either side of the maximum range angle.
+
+        Parameters
+        ----------
+        velocities : array_like, optional
+            The launch velocities, by default the initial velocity of this object. Each must be at least zero.
+        heights : array_like, optional
+            The heights relative to the launch height.
+
+        Returns
+        -------
+        envelope : dict
+            A dictionary holding the 1-D "velocity" and "height" arrays, along with the "angle" and "distance" arrays
+            with one row per velocity and one column per height. Heights that a velocity never reaches have NaN
+            angles and distances.
+        """
+        velocities = np.atleast_1d(np.asarray(self.initial_velocity if velocities is None else velocities,
+                                              dtype=float))
+        heights = np.atleast_1d(np.asarray(heights, dtype=float))
+        assert velocities.ndim == 1 and heights.ndim == 1, "Velocities and heights must be 1-D"
+        assert np.all(velocities >= 0), "Initial velocity must be positive or zero"
+
+        angles = np.full((velocities.size, heights.size), np.nan)
+        distances = np.full((velocities.size, heights.size), np.nan)
+        missing = []
+        for row, velocity in enumerate(velocities.tolist()):
+            entries = self.__envelope.get(self.__envelope_key(velocity), {})
+            for column, height in enumerate(heights.tolist()):
+                if height in entries:
+                    angles[row, column], distances[row, column] = entries[height]
+                else:
+                    missing.append((row, column))
+
+        if missing:
+            rows, columns = np.array(missing).T
+            found = self.__max_ranges(velocities[rows], heights[columns])
+            angles[rows, columns], distances[rows, columns] = found
+            for row, column, angle, distance in zip(rows.tolist(), columns.tolist(),
+                                                    *(values.tolist() for values in found)):
+                key = self.__envelope_key(float(velocities[row]))
+                if key not in self.__envelope and len(self.__envelope) >= _ENVELOPE_CONFIGURATIONS:
+                    del self.__envelope[next(iter(self.__envelope))]
+                self.__envelope.setdefault(key, {})[float(heights[column])] = (angle, distance)
+
+        return {"velocity": velocities, "height": heights, "angle": angles, "distance": distances}
+
+    def __envelope_key(self, velocity):
+        """Builds the key identifying the kept envelope results of a launch velocity, from every parameter of this
+        object that affects them.
 
         Parameters
         ----------
-        angle : float
-            The initial angle of the fired projectile.
         velocity : float
-            The initial velocity of the fired projectile.
-        stop_height : float
-            The height at which the simulation will halt during the descending phase.
-        mass : float
-            The mass of the projectile being simulated.
-        drag_coefficient : float
-            The drag coefficient of the projectile.
-        cross_sectional_area : float
-            The cross-section area of the projectile.
-        fluid_density_profile : dict, optional
-            The desired fluid density profile for altitude aware drag calculations.
-            By default, this is based on real world air density measurements.
+            The launch velocity.
 
         Returns
         -------
-        positionValues, velocityValues : list
-            Output lists of coordinate pairs for both position and velocity.
+        key : tuple
+            The hashable key.
         """
-        assert mass is not None, "A mass must be specified for drag simulation"
-        assert type(mass) == float or type(mass) == int, "Mass must be Numerical"
-        assert mass >= 0, "A positive mass must be specified for drag simulation"
+        return self.__cache_key(self.drag, None, velocity, None, as_atmosphere(self.default_earth_atmospheric_density))
 
-        assert drag_coefficient is not None, "A drag coefficient must be specified for drag simulation"
-        assert type(drag_coefficient) == float or type(drag_coefficient) == int, "Drag coefficient must be Numerical"
-        assert drag_coefficient >= 0, "A positive drag coefficient must be specified for drag simulation"
+    def __max_ranges(self, velocities, heights):
+        """Finds the maximum range launch angle and distance for each pair of launch velocity and height.
 
-        assert cross_sectional_area is not None, "A cross-sectional area must be specified for drag simulation"
-        assert type(cross_sectional_area) == float or \
-               type(cross_sectional_area) == int, "Cross-sectional area must be Numerical"
-        assert cross_sectional_area >= 0, "A positive cross-sectional area must be specified for drag simulation"
+        Parameters
+        ----------
+        velocities : ndarray
+            A 1-D array of launch velocities.
+        heights : ndarray
+            A 1-D array of heights, the same length as velocities.
 
-        if fluid_density_profile == "Default":
-            fluid_density_profile = self.default_earth_atmospheric_density
-        else:
-            assert type(fluid_density_profile) is dict, "Fluid density profile must be a dictionary based lookup table."
+        Returns
+        -------
+        angles, distances : ndarray
+            The maximum range launch angle and distance of each pair, which are NaN if the height is never reached.
+        """
+        angles = np.full(velocities.size, np.nan)
+        distances = np.full(velocities.size, np.nan)
+
+        if self.integrator == "analytic":
+            drag_rate = self.__analytic_drag_rate(self.drag)
+            for lane, (velocity, height) in enumerate(zip(velocities.tolist(), heights.tolist())):
+                if not drag_rate:
+                    # Closed form maximum range of a dragless projectile
+                    if velocity * velocity >= 2 * self.gravity * height:
+                        root = math.sqrt(velocity * velocity - 2 * self.gravity * height)
+                        angles[lane] = math.degrees(math.atan2(velocity, root))
+                        distances[lane] = velocity * root / self.gravity
+                    continue
+
+                def impact(angle):
+                    solution = analytic.trajectory_solution(angle, velocity, self.gravity, drag_rate)
+                    time = solution.time_at_height(height)
+                    return -math.inf if time is None else float(solution.position(time)[0])
+
+                angle, distance = analytic._golden_section_maximum(impact, 0.0, 90.0)
+                if math.isfinite(distance):
+                    angles[lane], distances[lane] = angle, distance
+            return angles, distances
+
+        # Every lane records its own height among the surface heights of a shared batch
+        levels, index = np.unique(heights, return_inverse=True)
+        lanes = np.arange(velocities.size)
+
+        def impacts(launch_angles, lane_velocities, lane_levels, time_step=None):
+            found, _, _ = self.__simulate_batch(launch_angles, lane_velocities, levels[0], self.drag, levels,
+                                                time_step)
+            reached = found[lane_levels, np.arange(launch_angles.size), 0]
+            return np.where(np.isnan(reached), -np.inf, reached)
+
+        time_step = self.__sweep_time_step(float(np.max(velocities)))
+        sweep = np.arange(0.0, 90.0 + _ENVELOPE_SPACING / 2, _ENVELOPE_SPACING)
+        coarse = impacts(np.repeat(sweep, velocities.size), np.tile(velocities, sweep.size),
+                         np.tile(index, sweep.size), time_step).reshape(sweep.size, velocities.size)
+        best = np.argmax(coarse, axis=0)
+        valid = np.isfinite(coarse[best, lanes])
+        if not valid.any():
+            return angles, distances
+
+        # Golden-section search on every lane at once at the coarse time step, so each iteration is a single cheap
+        # batch simulation
+        velocities, index, best = velocities[valid], index[valid], best[valid]
+        lower = np.maximum(sweep[best] - _ENVELOPE_SPACING, -90.0)
+        upper = np.minimum(sweep[best] + _ENVELOPE_SPACING, 90.0)
+        ratio = (math.sqrt(5) - 1) / 2
+        left = upper - ratio * (upper - lower)
+        right = lower + ratio * (upper - lower)
+        both = impacts(np.concatenate([left, right]), np.tile(velocities, 2), np.tile(index, 2), time_step)
+        leftImpact, rightImpact = both[:left.size], both[left.size:]
+        while np.max(upper - lower) > _ENVELOPE_TOLERANCE:
+            falling = leftImpact > rightImpact
+            upper = np.where(falling, right, upper)
+            lower = np.where(falling, lower, left)
+            probe = np.where(falling, upper - ratio * (upper - lower), lower + ratio * (upper - lower))
+            probeImpact = impacts(probe, velocities, index, time_step)
+            left, right = np.where(falling, probe, right), np.where(falling, left, probe)
+            leftImpact, rightImpact = np.where(falling, probeImpact, rightImpact), \
+                np.where(falling, leftImpact, probeImpact)
+
+        # The coarse steps shift the maximum slightly, so a parabola through three launches either side of it at the
+        # global time step corrects the angle and distance in one more batch
+        centre = np.clip(0.5 * (lower + upper), _ENVELOPE_WIDTH - 90.0, 90.0 - _ENVELOPE_WIDTH)
+        fine = impacts(np.concatenate([centre - _ENVELOPE_WIDTH, centre, centre + _ENVELOPE_WIDTH]),
+                       np.tile(velocities, 3), np.tile(index, 3)).reshape(3, velocities.size)
+        below, middle, above = fine
+        curvature = below - 2 * middle + above
+        with np.errstate(invalid="ignore", divide="ignore"):
+            offset = np.clip(0.5 * (below - above) / curvature, -1.0, 1.0)
+            vertex = middle - 0.125 * (below - above) * (below - above) / curvature
+        # Launches that are not bent over their maximum take the furthest of the three instead
+        bent = np.isfinite(fine).all(axis=0) & (curvature < 0) & (vertex >= fine.max(axis=0))
+        furthest = np.argmax(fine, axis=0)
+        angles[valid] = np.where(bent, centre + offset * _ENVELOPE_WIDTH, centre + (furthest - 1) * _ENVELOPE_WIDTH)
+        distances[valid] = np.where(bent, vertex, fine[furthest, np.arange(velocities.size)])
+        distances[np.isinf(distances)] = np.nan
+        angles[np.isnan(distances)] = np.nan
+        return angles, distances
+
+    def __reachable(self, velocity, height):
+        """Looks up the kept maximum range of the highest height at or below a target height, which bounds the
+        maximum range at the target height as raising a target can only bring it closer.
 
-        positionVec = [0, 0]
-        velocityVec = [math.cos(math.radians(angle)) * velocity, math.sin(math.radians(angle)) * velocity]
+        Parameters
+        ----------
+        velocity : float
+            The launch velocity.
+        height : float
+            The target height.
 
-        positionValues = [positionVec[:]]
-        velocityValues = [velocityVec[:]]
+        Returns
+        -------
+        reachable : tuple
+            The kept height, maximum range angle and maximum range distance, or None if no height at or below the
+            target height has been kept.
+        """
+        entries = self.__envelope.get(self.__envelope_key(velocity))
+        if not entries:
+            return None
+        below = [kept for kept in entries if kept <= height]
+        if not below:
+            return None
+        nearest = max(below)
+        return (nearest,) + entries[nearest]
+
+    def solve_angle(self, target_vec, lofted=False, max_error=0.1, full_output=False, multi_resolution=False):
+        """Finds a launch angle firing solution on the target. A coarse batch sweep of launch angles first locates
+        the maximum range angle, which separates the un-lofted and lofted solutions, and seeds the requested one.
+        The seed is refined with Newton steps on the exact sensitivity of the impact to the launch angle, kept
+        within a bracket that every simulation narrows, and each simulation halts as soon as the projectile
+        descends through the target height or past the target distance. There are always two possible solutions
+        for launch angles. If a firing solution cannot be found, the method will return None. Maximum ranges kept by
+        the envelope and max_range methods reject targets beyond them without simulating, and bound the solution
+        either side of the maximum range angle. With the analytic integrator the solution is instead found directly
+        from the exact trajectory. The outcome, convergence history and cost of the solve are stored as a SolveResult
+        in the last_solve_result attribute. With multi-resolution solving, the Euler integrator first solves at two
+        coarse time steps, and extrapolates their solutions to seed the final simulations at the global time step.
 
-        while True:  # numerical integration (Euler method)
-            positionVec[0] += self.time_step * velocityVec[0]
-            positionVec[1] += self.time_step * velocityVec[1]
+        Parameters
+        ----------
+        target_vec : array_like
+            The first two elements of the object should correspond to the target distance and relative height.
+        lofted : bool
+            Defines whether the calculated firing angle should be the lofted or un-lofted solution.
+        max_error : float
+            Defines the termination accuracy for the iterative solving algorithm. Lower errors may require more
+            computation to obtain. May also depend on the global time_step parameter.
+        full_output : bool
+            Should the SolveResult be returned instead of the angle.
+        multi_resolution : bool
+            Should the early iterations use coarser time steps, which needs fewer simulation steps when the global
+            time_step is small. Only affects the euler integrator.
 
-            # Calculate drag forces and velocity
-            phi = math.atan2(velocityVec[1], velocityVec[0])
-            vel = math.sqrt(velocityVec[0] ** 2 + velocityVec[1] ** 2)
-            try:
-                drag = self.__calculate_drag_force(vel, fluid_density_profile[(positionVec[1]//50)*50],
-                                                   drag_coefficient, cross_sectional_area)
-            except KeyError:
-                raise ValueError("The used fluid density profile does not contain the needed key-value pair entry at",
-                                 (positionVec[1]//50)*50)
-            vel -= (drag/mass) * self.time_step
+        Returns
+        -------
+        angle : float
+            Firing solution angle in degrees, or None if not found.
+        """
+        start, initial, history = perf_counter(), self.counters.snapshot(), []
+
+        if self.integrator == "analytic":
+            angle = analytic.solve_angle(target_vec, self.initial_velocity, self.gravity,
+                                         self.__analytic_drag_rate(self.drag), lofted)
+            result = self.__finish_solve("solve_angle", target_vec, angle,
+                                         SolveResult.UNREACHABLE if angle is None else SolveResult.SOLVED,
+                                         history, initial, start)
+            return result if full_output else angle
+
+        angle = None
+        try:
+            # Only targets below the launch height can be hit by firing downwards, and a horizontal launch has no
+            # sensitivity to start from. Kept maximum ranges reject targets beyond them without simulating, and
+            # split the un-lofted and lofted solutions apart
+            lower, upper = (0.0 if target_vec[1] >= 0 else -90.0), 90.0
+            status = None
+            reachable = self.__reachable(self.initial_velocity, target_vec[1])
+            if reachable is not None:
+                height, best, furthest = reachable
+                if math.isnan(furthest) or target_vec[0] - furthest > max(max_error, _ENVELOPE_MARGIN * furthest):
+                    status = SolveResult.UNREACHABLE
+                elif height == target_vec[1]:
+                    lower, upper = (best, upper) if lofted else (lower, best)
+
+            if status is None:
+                angles = np.arange(2.0 if target_vec[1] >= 0 else -80.0, 89.0, 4.0)
+                ranges, apex = self.__sweep(target_vec, angles, self.initial_velocity)
+                seed = self.__sweep_seed(target_vec, angles, ranges, apex, not lofted)
+                if seed is None:
+                    status = SolveResult.UNREACHABLE
+                else:
+                    solve = self.__solve_multi_resolution if multi_resolution else self.__solve_bracketed
+                    angle, status = solve("solve_angle", target_vec, "angle", min(max(seed, lower), upper), lower,
+                                          upper, not lofted, max_error, history)
+        except AssertionError:
+            status = SolveResult.OUT_OF_RANGE
+
+        result = self.__finish_solve("solve_angle", target_vec, angle, status, history, initial, start)
+        if full_output:
+            return result
+        return False if status == SolveResult.OUT_OF_RANGE else result.value
+
+    async def solve_angle_async(self, target_vec, lofted=False, max_error=0.1, full_output=False, timeout=None,
+                                service=None):
+        """Finds a launch angle firing solution on the target without blocking the event loop, by running the
+        solve_angle method in a worker thread of an asynchronous service. The solve uses this object's current
+        configuration, while its stored simulation points, counters and last solve result are left unchanged.
+        Identical solves requested while one is in flight share its result, and cancelling the request or letting
+        it time out stops the running simulation once no other request is waiting on it.
 
-            # Update velocity vector
-            velocityVec[0] = math.cos(phi)*vel
-            velocityVec[1] = math.sin(phi)*vel
+        Parameters
+        ----------
+        target_vec : array_like
+            The first two elements of the object should correspond to the target distance and relative height.
+        lofted : bool
+            Defines whether the calculated firing angle should be the lofted or un-lofted solution.
+        max_error : float
+            Defines the termination accuracy for the iterative solving algorithm.
+        full_output : bool
+            Should the SolveResult be returned instead of the angle.
+        timeout : float, optional
+            The number of seconds to wait before cancelling the solve and raising asyncio.TimeoutError.
+        service : AsyncService, optional
+            The service that runs the solve, by default one shared service with one concurrent solve per processor.
 
-            # Apply gravity
-            velocityVec[1] -= self.time_step * self.gravity
+        Returns
+        -------
+        angle : float
+            Firing solution angle in degrees, or None if not found.
+        """
+        from projectilepy.service import default_service
+        service = default_service() if service is None else service
+        result = await service.solve_angle(self.simulation_config(), target_vec, lofted, max_error, timeout)
+        if full_output:
+            return result
+        return False if result.status == SolveResult.OUT_OF_RANGE else result.value
+
+    def __sweep(self, target_vec, angles, velocities):
+        """Runs a coarse batch of simulations to find where each launch descends through the target height. The
+        time step is chosen so that a vertical launch takes a fixed number of steps, while keeping the speed lost to
+        drag in each step small enough for the coarse steps to stay stable.
+
+        Parameters
+        ----------
+        target_vec : array_like
+            The target distance and relative height.
+        angles : array_like
+            The launch angles of the sweep in degrees.
+        velocities : array_like
+            The launch velocities of the sweep, broadcast against the angles.
+
+        Returns
+        -------
+        ranges, apex : ndarray
+            The descending impact distance at the target height of each launch, which is NaN if the target height
+            was never reached, and the distance-height coordinate pair of the apex of each launch.
+        """
+        angles, velocities = np.broadcast_arrays(np.asarray(angles, dtype=float), np.asarray(velocities, dtype=float))
+        impacts, apex, _ = self.__simulate_batch(angles.ravel(), velocities.ravel(), target_vec[1], self.drag,
+                                                 np.empty(0), self.__sweep_time_step(float(np.max(velocities))))
+        return impacts[-1, :, 0], apex
 
-            # Record position and velocity
-            positionValues.append(positionVec[:])
-            velocityValues.append(velocityVec[:])
+    def __sweep_time_step(self, fastest, steps=_SWEEP_STEPS):
+        """Chooses the time step of a coarse sweep, so that a vertical launch takes a fixed number of steps while the
+        speed lost to drag in each step stays small enough for the coarse steps to be stable. The global time step is
+        used instead if it is coarser.
 
-            if positionValues[-1][1] < positionValues[-2][1] < stop_height:
-                break
+        Parameters
+        ----------
+        fastest : float
+            The fastest launch velocity of the sweep.
+        steps : int, optional
+            The number of steps taken by a vertical dragless launch, where the speed lost to drag in each step is
+            reduced in proportion to more steps.
 
-        return positionValues, velocityValues
+        Returns
+        -------
+        time_step : float
+            The time step of the sweep.
+        """
+        time_step = 2 * fastest / self.gravity / steps
+        drag_loss = _SWEEP_DRAG_LOSS * _SWEEP_STEPS / steps
+        if self.drag == "Newtonian":
+            _validate_drag_parameters(self.mass, self.drag_coefficient, self.cross_sectional_area)
+            drag_factor = 0.5 * self.drag_coefficient * self.cross_sectional_area / self.mass
+            if self.drag_table is not None:
+                drag_factor *= float(np.max(as_drag_table(self.drag_table).grid))
+            densest = float(np.max(as_atmosphere(self.default_earth_atmospheric_density).grid))
+            if drag_factor * densest * fastest > 0:
+                time_step = min(time_step, drag_loss / (drag_factor * densest * fastest))
+        elif self.drag == "Stokes":
+            drag_rate = _stokes_drag_rate(self.mass, self.drag_coefficient)
+            if drag_rate > 0:
+                time_step = min(time_step, drag_loss / drag_rate)
+        return max(time_step, self.time_step)
 
     @staticmethod
-    def __calculate_drag_force(velocity, density, drag_coefficient, cross_sectional_area):
-        """Calculates the instantaneous newtonian drag force on a projectile.
+    def __sweep_seed(target_vec, parameters, ranges, apex, increasing):
+        """Picks the starting launch parameter for a solve from a coarse sweep, by interpolating between the swept
+        launches either side of the target distance. The furthest swept impact separates the solutions where the
+        impact distance increases with the parameter from those where it decreases.
 
         Parameters
         ----------
-        velocity : float
-            The magnitude of the projectile velocity.
-        density : float
-            The density of the fluid medium (usually air).
-        drag_coefficient : float
-            The drag coefficient of the projectile.
-        cross_sectional_area : float
-            The cross-sectional area of the projectile.
+        target_vec : array_like
+            The target distance and relative height.
+        parameters : ndarray
+            The swept launch parameters in increasing order.
+        ranges : ndarray
+            The descending impact distance at the target height of each swept launch, or NaN if never reached.
+        apex : ndarray
+            The distance-height coordinate pair of the apex of each swept launch.
+        increasing : bool
+            Should the seed be taken where the impact distance increases with the parameter, rather than where it
+            decreases.
 
         Returns
         -------
-        drag : float
-            The instantaneous drag of the projectile.
+        seed : float
+            The starting launch parameter, or None if the target is out of reach. This is either because the sweep
+            falls well short of the target, or because the launches that first reach the target height already
+            peak well beyond the target distance.
         """
-        return 0.5 * density * velocity * velocity * drag_coefficient * cross_sectional_area
+        distance, height = target_vec[0], target_vec[1]
+        reached = np.where(np.isnan(ranges), -np.inf, ranges)
+        furthest = int(np.argmax(reached))
+        if reached[furthest] < distance:
+            # Coarse steps are not exact, so only give up on targets that are well out of reach
+            if np.isfinite(reached[furthest]):
+                if reached[furthest] < (1 - _SWEEP_MARGIN) * distance:
+                    return None
+                return float(parameters[furthest])
+            highest = int(np.argmax(apex[:, 1]))
+            if apex[highest, 1] < height - _SWEEP_MARGIN * abs(height):
+                return None
+            return float(parameters[highest])
+
+        if increasing:
+            index = int(np.argmax(reached[:furthest + 1] >= distance))
+            neighbour = index - 1
+        else:
+            index = furthest + int(np.nonzero(reached[furthest:] >= distance)[0][-1])
+            neighbour = index + 1
+        if 0 <= neighbour < reached.size:
+            if np.isfinite(reached[neighbour]):
+                fraction = (distance - reached[neighbour]) / (reached[index] - reached[neighbour])
+                return float(parameters[neighbour] + fraction * (parameters[index] - parameters[neighbour]))
+            # Launches that only just reach the target height peak beyond the target, so descend even further out
+            if apex[neighbour, 0] > (1 + _SWEEP_MARGIN) * distance:
+                return None
+        return float(parameters[index])
+
+    def __target_miss(self, distance, height):
+        """Measures how far beyond the target distance the last simulation descended through the target height,
+        along with the derivative of the miss with respect to the sensitivity parameter of the simulation.
+        Simulations halted on passing the target distance are extrapolated down to the target height along a dragless
+        arc, which agrees with the Euler method to within the drop due to gravity over a single step when the crossing
+        is within the next step.
+
+        Parameters
+        ----------
+        distance : float
+            The target distance.
+        height : float
+            The target height.
 
-    def __simulate_stokes(self, angle, velocity, stop_height):
-        """Runs a single numerical simulation for a projectile as influenced by Stokes drag.
+        Returns
+        -------
+        miss, derivative, reached : float, float, bool
+            The distance the impact landed beyond the target, its derivative, and whether the projectile reached
+            the target height. If it did not, the miss is instead the height of the apex above the target height.
+        """
+        trajectory = self.trajectory
+        apex = trajectory.data[trajectory.apex_index]
+        if apex[Trajectory.Y] < height:
+            return float(apex[Trajectory.Y] - height), float(apex[Trajectory.DY]), False
+
+        final = trajectory.data[-1]
+        if final[Trajectory.Y] > height:
+            # Time to fall the remaining height along a dragless arc, written to avoid cancellation
+            x, y, vx, vy, dx, dy, dvx, dvy = final[Trajectory.X:].tolist()
+            speed = math.sqrt(vy * vy + 2 * self.gravity * (y - height))
+            denominator = speed - vy
+            fall = 2 * (y - height) / denominator
+            denominatorDerivative = (vy * dvy + self.gravity * dy) / speed - dvy
+            fallDerivative = 2 * (dy * denominator - (y - height) * denominatorDerivative) / (denominator * denominator)
+            return x + vx * fall - distance, dx + dvx * fall + vx * fallDerivative, True
+
+        return self.surface_impact(height)[0] - distance, self.surface_impact_derivative(height), True
+
+    def __flight_steps(self, angle, velocity, height, time_step):
+        """Estimates the number of steps a simulation would take from the dragless flight time to the target height,
+        so that a poor starting value cannot run an unbounded simulation. Drag shortens the flights of the fast
+        launches that this guards against, so the estimate is an upper bound for them.
 
         Parameters
         ----------
         angle : float
-            The initial angle of the fired projectile.
+            The launch angle in degrees.
         velocity : float
-            The initial velocity of the fired projectile.
-        stop_height : float
-            The height at which the simulation will halt during the descending phase.
+            The launch velocity.
+        height : float
+            The target height the simulation stops at.
+        time_step : float
+            The time step of the simulation.
+
+        Returns
+        -------
+        steps : float
+            The estimated number of simulation steps.
         """
-        raise NotImplementedError
+        return analytic.trajectory_solution(angle, velocity, self.gravity).stop_time(height) / time_step
 
-    def run(self, stop_height=0, override_drag=None, override_angle=None, override_velocity=None,
-            override_density_profile=None):
-        """Manages a numerical projectile motion simulation using the object parameters or method overrides.
-        This replaces the stored simulation points from previous simulations with newly computed values.
+    def __solve_bracketed(self, solver, target_vec, parameter, value, lower, upper, increasing, max_error, history,
+                          time_step=None):
+        """Refines a launch parameter until the projectile hits the target, using Newton steps on the exact
+        sensitivity of the impact within a bracket around the solution. Every simulation narrows the bracket from
+        the sign of its miss, or of its sensitivity if it falls short, and steps that would leave the bracket are
+        replaced by bisection. Once the bracket ends fall short either side of the furthest impact, their tangents
+        bound the furthest reachable impact, which ends the solve early if the target is out of reach. Likewise the
+        solve ends early once the launches that first reach the target height are known to peak beyond the target.
 
         Parameters
         ----------
-        stop_height : float, optional
-            Height at which the numerical simulation will be halted during the descending path.
-        override_drag : string, optional
-            Override that forces using a specific drag model for the numerical simulation.
-        override_angle : float, optional
-            Override that forces using a given initial launch angle in degrees between -90 and 90.
-        override_velocity : float, optional
-            Override that forces using a given initial launch velocity, if given it must be at least zero.
-        override_density_profile : float, optional
-            Override the fluid density profile used in drag calculations.
+        solver : string
+            The name of the solver method.
+        target_vec : array_like
+            The target distance and relative height.
+        parameter : string
+            The launch parameter to solve for, either "angle" or "velocity".
+        value : float
+            The starting value of the launch parameter.
+        lower, upper : float
+            The initial bracket of the launch parameter, where the upper end may be infinite.
+        increasing : bool
+            Does the impact distance increase with the launch parameter at the solution.
+        max_error : float
+            The termination accuracy of the impact distance.
+        history : list
+            The convergence history of the solve.
+        time_step : float, optional
+            The time step of the simulations, by default the global time step.
+
+        Returns
+        -------
+        value, status : float, string
+            The solved launch parameter or None, and the outcome of the solve.
         """
-        if override_drag is not None:
-            assert override_drag in ["None", "Stokes", "Newtonian"], "Drag type not recognised"
-            drag = override_drag
-        else:
-            drag = self.drag
+        distance, height = target_vec[0], target_vec[1]
+        lowerEnd = upperEnd = None
+        status = SolveResult.HEIGHT_NOT_REACHED
 
-        if override_angle is not None:
-            assert type(override_angle) == int or type(override_angle) == float, "Angle must be numerical"
-            assert -90 <= override_angle <= 90, "Angle must be between -90 and 90 degrees"
-            angle = override_angle
-        else:
-            angle = self.initial_angle
+        for iterations in range(50):
+            # The adaptive integrator's steps do not depend on the time step, so only Euler simulations are bounded
+            launch = (value, self.initial_velocity) if parameter == "angle" else (self.initial_angle, value)
+            if self.integrator == "euler" and \
+                    self.__flight_steps(*launch, height, time_step or self.time_step) > _SOLVE_MAX_STEPS:
+                return None, SolveResult.OUT_OF_RANGE
+            self.run(stop_height=height, stop_range=distance, sensitivity=parameter, override_time_step=time_step,
+                     **{"override_" + parameter: float(value)})
+            miss, derivative, reached = self.__target_miss(distance, height)
+            if reached:
+                status = SolveResult.NOT_CONVERGED
+                self.__count_iteration(solver, history, value, distance + miss, -miss)
+            else:
+                self.__count_iteration(solver, history, value, math.nan, math.nan)
+
+            # Overshooting puts the solution on the near side, and falling short puts it uphill of the sensitivity
+            end = (value, miss, derivative, reached, float(self.trajectory.x[self.trajectory.apex_index]))
+            if reached and miss >= 0:
+                if increasing:
+                    upper, upperEnd = value, end
+                else:
+                    lower, lowerEnd = value, end
+            elif derivative > 0 or derivative == 0 and increasing:
+                lower, lowerEnd = value, end
+            else:
+                upper, upperEnd = value, end
+
+            # Only the simulated launch is known to hit within the accuracy, so it is returned rather than a final
+            # Newton step that was never checked
+            if reached and abs(miss) < max_error:
+                return value, SolveResult.SOLVED
+            newton = value - miss / derivative if derivative else math.nan
+
+            # The apex distance has a single peak, so if it is beyond the target at both ends of a bracket that
+            # closes on the launch first reaching the target height, every launch in between descends beyond it
+            if lowerEnd is not None and upperEnd is not None and not lowerEnd[3] and upperEnd[3] and \
+                    upperEnd[1] >= 0 and min(lowerEnd[4], upperEnd[4]) > distance:
+                return None, SolveResult.UNREACHABLE
+
+            crossing = math.nan
+            if lowerEnd is not None and upperEnd is not None and lowerEnd[3] and upperEnd[3] and \
+                    lowerEnd[1] < 0 and upperEnd[1] < 0 and lowerEnd[2] > 0 > upperEnd[2]:
+                crossing = (upperEnd[1] - lowerEnd[1] + lowerEnd[2] * lowerEnd[0] - upperEnd[2] * upperEnd[0]) / \
+                           (lowerEnd[2] - upperEnd[2])
+                if lowerEnd[1] + lowerEnd[2] * (crossing - lowerEnd[0]) < -max_error:
+                    return None, SolveResult.UNREACHABLE
+
+            if lower < newton < upper:
+                value = newton
+            elif lower < crossing < upper:
+                value = crossing
+            elif math.isinf(upper):
+                value = 2 * lower
+            else:
+                value = 0.5 * (lower + upper)
 
-        if override_velocity is not None:
-            assert type(override_velocity) == int or type(override_velocity) == float, "Velocity must be numerical"
-            assert override_velocity >= 0, "Initial velocity must be positive or zero"
-            velocity = override_velocity
-        else:
-            velocity = self.initial_velocity
+            if upper - lower <= 1e-12 * max(1.0, abs(value)):
+                break
+        return None, status
 
-        if override_density_profile is not None:
-            assert type(override_velocity) == dict, "Density profile must be dictionary with keys as multiples of 50"
-            density_profile = override_density_profile
-        else:
-            density_profile = self.default_earth_atmospheric_density
+    def __solve_multi_resolution(self, solver, target_vec, parameter, value, lower, upper, increasing, max_error,
+                                 history):
+        """Solves at two coarse time steps before refining at the global time step. The Euler method's error is
+        first order in the time step, so the solutions at a coarse step and at half of it are extrapolated to the
+        global time step in the manner of Richardson extrapolation, which leaves only a small correction for the
+        simulations at the global time step. Coarse solves that fail fall back to solving from the starting value.
 
-        if drag == "None":
-            self.positionValues, self.velocityValues = \
-                self.__simulate_dragless(angle, velocity, stop_height)
-        elif drag == "Stokes":
-            self.positionValues, self.velocityValues = \
-                self.__simulate_stokes(angle, velocity, stop_height)
-        elif drag == "Newtonian":
-            self.positionValues, self.velocityValues = \
-                self.__simulate_newtonian(angle, velocity, stop_height, self.mass, self.drag_coefficient,
-                                          self.cross_sectional_area, density_profile)
-        else:
-            raise ValueError("Drag type not recognised")
+        Parameters
+        ----------
+        solver : string
+            The name of the solver method.
+        target_vec : array_like
+            The target distance and relative height.
+        parameter : string
+            The launch parameter to solve for, either "angle" or "velocity".
+        value : float
+            The starting value of the launch parameter.
+        lower, upper : float
+            The initial bracket of the launch parameter, where the upper end may be infinite.
+        increasing : bool
+            Does the impact distance increase with the launch parameter at the solution.
+        max_error : float
+            The termination accuracy of the impact distance.
+        history : list
+            The convergence history of the solve.
+
+        Returns
+        -------
+        value, status : float, string
+            The solved launch parameter or None, and the outcome of the solve.
+        """
+        fastest = self.initial_velocity if parameter == "angle" else value
+        coarsening = int(math.log2(self.__sweep_time_step(fastest, _RESOLUTION_STEPS) / self.time_step))
+        if self.integrator == "euler" and coarsening >= 2:
+            steps = [self.time_step * 2 ** coarsening, self.time_step * 2 ** (coarsening - 1)]
+            solutions = []
+            for time_step in steps:
+                coarse, status = self.__solve_bracketed(solver, target_vec, parameter, value, lower, upper,
+                                                        increasing, _RESOLUTION_ACCURACY * max_error, history,
+                                                        time_step)
+                if status != SolveResult.SOLVED:
+                    break
+                solutions.append(coarse)
+                value = coarse
+            if len(solutions) == 2:
+                value = solutions[1] + (solutions[1] - solutions[0]) * (steps[1] - self.time_step) / \
+                    (steps[0] - steps[1])
+                value = min(max(value, lower), upper)
+            else:
+                value = solutions[0] if solutions else value
+        return self.__solve_bracketed(solver, target_vec, parameter, value, lower, upper, increasing, max_error,
+                                      history)
+
+    def __count_iteration(self, solver, history, parameter, impact, error):
+        """Adds a solver iteration to the convergence history and counters, and notifies the observer.
+
+        Parameters
+        ----------
+        solver : string
+            The name of the solver method.
+        history : list
+            The convergence history of the solve.
+        parameter : float
+            The launch parameter simulated by the iteration.
+        impact : float
+            The impact distance of the simulation.
+        error : float
+            The distance from the impact to the target.
+        """
+        history.append((parameter, impact, error))
+        self.counters.iterations += 1
+        if self.observer is not None:
+            self.observer("iteration", {"solver": solver, "iteration": len(history), "parameter": parameter,
+                                        "impact": impact, "error": error})
 
-    def solve_angle(self, target_vec, lofted=False, max_error=0.1):
-        """Runs an iterative secant solving algorithm for obtaining a launch angle firing solution on the target.
-        There are always two possible solutions for launch angles. If a firing solution cannot be found, the method
-        will return None.
+    def __finish_solve(self, solver, target_vec, value, status, history, initial, start):
+        """Builds the result of a solve from its outcome and the work done since it started, and stores it in the
+        last_solve_result attribute.
 
         Parameters
         ----------
+        solver : string
+            The name of the solver method.
         target_vec : array_like
-            The first two elements of the object should correspond to the target distance and relative height.
+            The target of the solve.
+        value : float
+            The solved launch parameter, or None if the solve failed.
+        status : string
+            The outcome of the solve.
+        history : list
+            The convergence history of the solve.
+        initial : dict
+            The counters when the solve started.
+        start : float
+            The performance counter value when the solve started.
+
+        Returns
+        -------
+        result : SolveResult
+            The result of the solve.
+        """
+        self.counters.solves += 1
+        counters = {name: value - initial[name] for name, value in self.counters.snapshot().items()}
+        self.last_solve_result = SolveResult(solver, (target_vec[0], target_vec[1]), value, status, history,
+                                             counters, perf_counter() - start)
+        if self.observer is not None:
+            self.observer("solve", {"result": self.last_solve_result})
+        return self.last_solve_result
+
+    def solve_grid(self, ranges, heights, lofted=False, max_error=0.1, full_output=False):
+        """Finds the launch angle firing solutions for a grid of target distances and heights by continuation. Each
+        row of targets at one height is walked in order of increasing distance, and every solve is warm started from
+        the solutions of the previous targets in the row, stepped along the exact sensitivity of their impacts to the
+        launch angle, so most targets need only one or two simulations. Targets before the first solution of a row
+        are solved from scratch by the solve_angle method, whose coarse sweep rejects unreachable targets cheaply.
+        The reachable envelope bounds every row, so a row stops at the first target beyond its maximum range without
+        simulating the rest. With the analytic integrator every target is instead solved directly from the exact
+        trajectory.
+
+        Parameters
+        ----------
+        ranges : array_like
+            The target distances, which must be positive.
+        heights : array_like
+            The target heights relative to the launch height.
         lofted : bool
-            Defines whether the calculated firing angle should be the lofted or un-lofted solution.
+            Defines whether the calculated firing angles should be the lofted or un-lofted solutions.
         max_error : float
-            Defines the termination accuracy for the iterative solving algorithm. Lower errors may require more
-            computation to obtain. May also depend on the global time_step parameter.
+            Defines the termination accuracy for the iterative solving algorithm.
+        full_output : bool
+            Should the status and simulation count of each target be returned along with the angles.
 
         Returns
         -------
-        angle : float
-            Firing solution angle in degrees, or None if not found.
+        angles : ndarray
+            The firing solution angle in degrees of each target, with one row per height and one column per
+            distance, or NaN where no solution was found. With full_output a dictionary is returned instead, holding
+            the "angle" array along with the "status" of each solve and the number of "simulations" it needed.
         """
-        if lofted:
-            angle = 85
+        ranges = np.atleast_1d(np.asarray(ranges, dtype=float))
+        heights = np.atleast_1d(np.asarray(heights, dtype=float))
+        assert ranges.ndim == 1 and heights.ndim == 1, "Ranges and heights must be 1-D"
+        assert np.all(ranges > 0), "Target distance must be positive"
+        angles = np.full((heights.size, ranges.size), np.nan)
+        statuses = np.full(angles.shape, SolveResult.UNREACHABLE, dtype="U18")
+        simulations = np.zeros(angles.shape, dtype=int)
+
+        if self.integrator == "analytic":
+            for row, height in enumerate(heights.tolist()):
+                for column, distance in enumerate(ranges.tolist()):
+                    result = self.solve_angle((distance, height), lofted, max_error, full_output=True)
+                    angles[row, column] = math.nan if result.value is None else result.value
+                    statuses[row, column] = result.status
         else:
-            angle = 5
-        deltaPhi = 0.05
+            envelope = self.envelope(self.initial_velocity, heights)
+            order = np.argsort(ranges, kind="stable").tolist()
+            for row, height in enumerate(heights.tolist()):
+                best, furthest = float(envelope["angle"][0, row]), float(envelope["distance"][0, row])
+                lower, upper = (best, 90.0) if lofted else ((0.0 if height >= 0 else -90.0), best)
+                solved = []
+                for column in order:
+                    distance = float(ranges[column])
+                    if math.isnan(furthest) or distance - furthest > max(max_error, _ENVELOPE_MARGIN * furthest):
+                        break
+
+                    seed = self.__continuation_seed(solved, distance) if solved else None
+                    result = self.__solve_continued((distance, height), seed, lower, upper, lofted, max_error)
+                    angles[row, column] = math.nan if result.value is None else result.value
+                    statuses[row, column] = result.status
+                    simulations[row, column] = result.simulations
+
+                    if result.success:
+                        # The sensitivity of the last simulation steps the next target along the row
+                        solved = solved[-1:] + [(distance, result.value, self.__target_miss(distance, height)[1])]
+
+        if full_output:
+            return {"angle": angles, "status": statuses, "simulations": simulations}
+        return angles
 
-        for iterations in range(50):
-            try:
-                self.run(override_angle=angle)
-            except AssertionError:
-                return False
-            impact1 = self.surface_impact(target_vec[1])
-
-            try:
-                self.run(override_angle=angle + deltaPhi)
-            except AssertionError:
-                return False
-            impact2 = self.surface_impact(target_vec[1])
-
-            dx = (impact2[0] - impact1[0]) / deltaPhi
-            error = target_vec[0] - impact1[0]
-
-            angle += min(error / dx, 5)
-            deltaPhi = (error / target_vec[0]) + 0.01
-
-            if abs(error) < max_error:
-                return angle
-            elif iterations > 25 and abs(error / target_vec[0]) >= 0.02:
-                return None
+    @staticmethod
+    def __continuation_seed(solved, distance):
+        """Predicts the launch angle of the next target in a row from the solutions before it. The slope of the
+        angle against the target distance is the inverse of the impact sensitivity of each solution, and the change
+        in slope between the last two solutions adds a curvature term.
 
-        return None
+        Parameters
+        ----------
+        solved : list
+            The distance, angle and impact sensitivity of the last one or two solutions in the row.
+        distance : float
+            The distance of the next target.
 
-    def solve_velocity(self, target_vec, max_error=0.1):
-        """Runs an iterative secant solving algorithm for obtaining a launch velocity firing solution on the target.
-        If a firing solution cannot be found, the method will return None.
+        Returns
+        -------
+        seed : float
+            The predicted launch angle.
+        """
+        last, angle, sensitivity = solved[-1]
+        if not sensitivity:
+            return angle
+        step = distance - last
+        slope = 1 / sensitivity
+        if len(solved) == 2 and solved[0][2] and solved[0][0] != last:
+            slope += 0.5 * (slope - 1 / solved[0][2]) / (last - solved[0][0]) * step
+        return angle + slope * step
+
+    def __solve_continued(self, target_vec, seed, lower, upper, lofted, max_error):
+        """Solves for a single launch angle of a grid, starting from a predicted angle if there is one or otherwise
+        solving from scratch with the solve_angle method.
 
         Parameters
         ----------
-        target_vec : array_like
-            The first two elements of the object should correspond to the target distance and relative height.
+        target_vec : tuple
+            The target distance and relative height.
+        seed : float
+            The predicted launch angle, or None.
+        lower, upper : float
+            The bracket of the requested solution, either side of the maximum range angle.
+        lofted : bool
+            Defines whether the lofted or un-lofted solution is found.
         max_error : float
-            Defines the termination accuracy for the iterative solving algorithm. Lower errors may require more
-            computation to obtain. May also depend on the global time_step parameter.
+            Defines the termination accuracy for the iterative solving algorithm.
 
         Returns
         -------
-        velocity : float
-            Firing solution velocity in meters per second, or None if not found.
+        result : SolveResult
+            The result of the solve.
         """
-        velocity = 100
-        deltaV = 1
+        if seed is None:
+            return self.solve_angle(target_vec, lofted, max_error, full_output=True)
+
+        start, initial, history = perf_counter(), self.counters.snapshot(), []
+        try:
+            angle, status = self.__solve_bracketed("solve_grid", target_vec, "angle", min(max(seed, lower), upper),
+                                                   lower, upper, not lofted, max_error, history)
+        except AssertionError:
+            angle, status = None, SolveResult.OUT_OF_RANGE
+        return self.__finish_solve("solve_grid", target_vec, angle, status, history, initial, start)
+
+    def solve_angles(self, targets, workers=None, chunksize=64, max_error=0.1):
+        """Solves for both the direct and lofted launch angle firing solutions of many targets, distributing the
+        targets across a pool of worker processes. Each worker builds its own simulation object from this object's
+        configuration once, and the stored simulation points of this object are left unchanged.
 
-        for iterations in range(50):
-            try:
-                self.run(override_velocity=velocity)
-            except AssertionError:
-                return False
-            impact1 = self.surface_impact(target_vec[1])
+        Parameters
+        ----------
+        targets : array_like
+            The target distance and relative height pairs, one pair per row.
+        workers : int, optional
+            The number of worker processes, by default the number of processors. With a single worker the targets
+            are solved in this process.
+        chunksize : int
+            The number of targets sent to a worker at a time.
+        max_error : float
+            Defines the termination accuracy for the iterative solving algorithm.
+
+        Returns
+        -------
+        solutions : ndarray
+            A structured array with one record per target, holding the target "distance" and "height", the
+            "direct" and "lofted" angles in degrees (NaN if not found), and the "direct_status" and "lofted_status"
+            outcomes. The outcome is "solved" or the reason for failure, which is one of the SolveResult statuses,
+            or "invalid_target" or "failed" if the solver could not be run.
+        """
+        from projectilepy import parallel
+        return parallel.solve_angles(self.simulation_config(), targets, workers, chunksize, max_error)
+
+    def iter_solve_angles(self, targets, workers=None, chunksize=64, ordered=True, max_error=0.1):
+        """Solves for both the direct and lofted launch angle firing solutions of many targets like the solve_angles
+        method, streaming the solutions of each chunk of targets as soon as they are available. Targets may be any
+        iterable of pairs and are read lazily.
 
-            try:
-                self.run(override_velocity=velocity + deltaV)
-            except AssertionError:
-                return False
-            impact2 = self.surface_impact(target_vec[1])
+        Parameters
+        ----------
+        targets : iterable
+            The target distance and relative height pairs.
+        workers : int, optional
+            The number of worker processes, by default the number of processors.
+        chunksize : int
+            The number of targets sent to a worker at a time.
+        ordered : bool
+            Should chunks be yielded in the order of the targets, rather than in the order they are completed.
+        max_error : float
+            Defines the termination accuracy for the iterative solving algorithm.
+
+        Yields
+        ------
+        start, solutions : int, ndarray
+            The index of the first target of each chunk, and the structured array of its solutions as returned by
+            the solve_angles method.
+        """
+        from projectilepy import parallel
+        return parallel.iter_solve_angles(self.simulation_config(), targets, workers, chunksize, ordered, max_error)
 
-            dx = (impact2[0] - impact1[0]) / deltaV
-            error = target_vec[0] - impact1[0]
+    def dispersion(self, n_samples, distributions, seed=None, stop_height=0, chunksize=4096, workers=1, bins=256):
+        """Runs a Monte Carlo analysis of the impact dispersion caused by uncertain launch parameters. Samples are
+        drawn and simulated in chunks with the batch engine, and only running statistics of the impacts are kept, so
+        memory does not grow with the number of samples. Each chunk draws from its own generator spawned from the
+        seed, so the results are reproducible and do not depend on the number of workers. The stored simulation
+        points of this object are left unchanged.
 
-            velocity += min(error / dx, 20)
-            deltaV = (error / target_vec[0]) + 0.05
+        Parameters
+        ----------
+        n_samples : int
+            The number of samples to simulate.
+        distributions : dict
+            The distribution of each varied launch parameter, keyed by "velocity", "angle", "mass" or
+            "drag_coefficient". Parameters that are not given keep the value of this object. A distribution is
+            either a number, which is the standard deviation of a normal distribution about this object's value,
+            a ("normal", standard deviation) or ("uniform", half width) tuple about this object's value, or a
+            callable taking a numpy Generator and a sample count and returning that many values. Callables must be
+            picklable when using more than one worker.
+        seed : int or numpy.random.SeedSequence, optional
+            The root seed that the seed of every chunk is spawned from, by default fresh entropy.
+        stop_height : float, optional
+            The height at which each simulation will halt during the descending phase.
+        chunksize : int
+            The number of samples simulated in each batch.
+        workers : int, optional
+            The number of worker processes, or None for the number of processors. With a single worker the samples
+            are simulated in this process.
+        bins : int
+            The number of histogram bins, which are placed about the impacts of the first chunk.
+
+        Returns
+        -------
+        result : DispersionResult
+            The sample and miss counts, the mean and covariance of the impact distance and time of flight, their
+            histograms and the circular error probable of the impact distance.
+        """
+        from projectilepy import dispersion
+        return dispersion.dispersion(self, n_samples, distributions, seed, stop_height, chunksize, workers, bins)
+
+    def solve_velocity(self, target_vec, max_error=0.1, full_output=False, multi_resolution=False):
+        """Finds a launch velocity firing solution on the target. The dragless solution is first scaled up by a
+        coarse batch sweep of launch velocities until the target distance is passed, seeding a solve with Newton
+        steps on the exact sensitivity of the impact to the launch velocity, kept within a bracket that every
+        simulation narrows. Each simulation halts as soon as the projectile descends through the target height or
+        past the target distance. If a firing solution cannot be found, the method will return False, and a solve
+        that would need a launch taking more than a million Euler steps ends as out of range without simulating it.
+        With the analytic integrator the solution is instead found directly from the exact trajectory. The outcome,
+        convergence history and cost of the solve are stored as a SolveResult in the last_solve_result attribute.
+        With multi-resolution solving, the Euler integrator first solves at two coarse time steps, and extrapolates
+        their solutions to seed the final simulations at the global time step.
 
-            if abs(error) < max_error:
-                return velocity
-            elif iterations > 25 and abs(error / target_vec[0]) >= 0.02:
-                return False
+        Parameters
+        ----------
+        target_vec : array_like
+            The first two elements of the object should correspond to the target distance and relative height.
+        max_error : float
+            Defines the termination accuracy for the iterative solving algorithm. Lower errors may require more
+            computation to obtain. May also depend on the global time_step parameter.
+        full_output : bool
+            Should the SolveResult be returned instead of the velocity.
+        multi_resolution : bool
+            Should the early iterations use coarser time steps, which needs fewer simulation steps when the global
+            time_step is small. Only affects the euler integrator.
 
-        return False
+        Returns
+        -------
+        velocity : float
+            Firing solution velocity in meters per second, or False if not found.
+        """
+        start, initial, history = perf_counter(), self.counters.snapshot(), []
+
+        if self.integrator == "analytic":
+            velocity = analytic.solve_velocity(target_vec, self.initial_angle, self.gravity,
+                                               self.__analytic_drag_rate(self.drag))
+            result = self.__finish_solve("solve_velocity", target_vec, velocity,
+                                         SolveResult.UNREACHABLE if velocity is None else SolveResult.SOLVED,
+                                         history, initial, start)
+            if full_output:
+                return result
+            return False if velocity is None else velocity
+
+        velocity = None
+        try:
+            # Drag only shortens the flight, and no velocity reaches a target on or above the line of fire
+            dragless = analytic.solve_velocity(target_vec, self.initial_angle, self.gravity) \
+                if target_vec[0] > 0 else None
+            if dragless is None:
+                status = SolveResult.UNREACHABLE
+            else:
+                ranges = None
+                for expansion in range(4):
+                    expanded = dragless * 4 ** expansion * 2 ** np.arange(-1, 2.01, 0.25)
+                    # Sweeps are bounded like the solves they seed, by the steps of their fastest launch
+                    fastest = float(expanded[-1])
+                    if self.__flight_steps(self.initial_angle, fastest, target_vec[1],
+                                           self.__sweep_time_step(fastest)) > _SOLVE_MAX_STEPS:
+                        break
+                    velocities = expanded
+                    ranges, apex = self.__sweep(target_vec, self.initial_angle, velocities)
+                    if np.any(ranges >= target_vec[0]):
+                        break
+                if ranges is None:
+                    status = SolveResult.OUT_OF_RANGE
+                else:
+                    seed = self.__sweep_seed(target_vec, velocities, ranges, apex, True)
+                    solve = self.__solve_multi_resolution if multi_resolution else self.__solve_bracketed
+                    velocity, status = solve("solve_velocity", target_vec, "velocity",
+                                             float(velocities[-1]) if seed is None else seed, 0.0, math.inf, True,
+                                             max_error, history)
+        except AssertionError:
+            status = SolveResult.OUT_OF_RANGE
+
+        result = self.__finish_solve("solve_velocity", target_vec, velocity, status, history, initial, start)
+        if full_output:
+            return result
+        return result.value if result.success else False
 
     def solve_initial_height(self, target_vec):
         """Solves for the required initial height of the fired projectile in order to impact the target.
@@ -446,12 +1726,54 @@ class model:
             The initial height of the fired projectile required to impact the target.
         """
         self.run(stop_height=-1000)
-        matches = [pos for pos in self.positionValues if pos[0] <= target_vec[0]]
-        return target_vec[1] - matches[-1][1]
+        if self.__solution is not None:
+            return target_vec[1] - self.__solution.height_at_range(target_vec[0])
+        position = self.trajectory.position_at_range(target_vec[0], self.__interpolation)
+        if position is None:
+            raise ValueError("The projectile never reached the target distance")
+        return target_vec[1] - position[2]
+
+    def __surface_crossing(self, surface_height, descending_impact=True):
+        """Finds where the projectile passed through the given surface height, by binary searching the stored
+        trajectory and interpolating between steps. Trajectories from the adaptive integrator are interpolated with
+        cubic Hermite polynomials of the stored positions and velocities, and the others linearly.
+
+        Parameters
+        ----------
+        surface_height : float
+            The height of the surface to find a projectile impact for.
+        descending_impact : bool
+            Should the method return the projectile impact for the descending trajectory.
+
+        Returns
+        -------
+        position, time : list, float
+            The distance-height coordinate pair and time at the impact.
+        """
+        if self.__solution is not None:
+            time = self.__solution.time_at_height(surface_height, descending_impact)
+            if time is None:
+                raise ValueError("The projectile never reached the surface height")
+            time = min(time, self.__solution.stop_time(self.__stop_height))
+            return [float(value) for value in self.__solution.position(time)], time
+
+        start = perf_counter()
+        crossing = self.trajectory.surface_crossing(surface_height, descending_impact, self.__interpolation)
+        self.counters.query_seconds += perf_counter() - start
+        if crossing is None:
+            raise ValueError("The projectile never reached the surface height")
+        time, x, y = crossing
+        return [x, y], time
+
+    @property
+    def __interpolation(self):
+        """string : The interpolation used between the stored steps of the last simulation."""
+        return "hermite" if self.__dense_trajectory else "linear"
 
     def surface_impact(self, surface_height, descending_impact=True):
         """Finds the coordinates of the projectile when it passed through the given surface height.
-        By default, this gives the impact in the descending portion of the simulation.
+        By default, this gives the impact in the descending portion of the simulation. The impact is interpolated
+        between the simulation steps either side of the surface.
 
         Parameters
         ----------
@@ -465,10 +1787,31 @@ class model:
         impact : tuple
             The distance-height coordinate pair for the impact at the specified height.
         """
-        matches = [pos for pos in self.positionValues if pos[1] >= surface_height]
-        if descending_impact is True:
-            return tuple(matches[-1])
-        return tuple(matches[0])
+        return tuple(self.__surface_crossing(surface_height, descending_impact)[0])
+
+    def surface_impact_derivative(self, surface_height, descending_impact=True):
+        """Finds the rate of change of the impact distance at the given surface height with respect to the launch
+        parameter given as the sensitivity of the last simulation. For simulations using the Euler method this is
+        the exact derivative of the distance returned by the surface_impact method.
+
+        Parameters
+        ----------
+        surface_height : float
+            The height of the surface to find a projectile impact for.
+        descending_impact : bool
+            Should the method return the derivative for the descending trajectory.
+
+        Returns
+        -------
+        derivative : float
+            The derivative of the impact distance per degree of launch angle or per unit of launch velocity.
+        """
+        assert self.__solution is None and self.trajectory.sensitivities is not None, \
+            "The last simulation must be run with a sensitivity parameter"
+        derivative = self.trajectory.crossing_sensitivity(surface_height, descending_impact, self.__interpolation)
+        if derivative is None:
+            raise ValueError("The projectile never reached the surface height")
+        return derivative
 
     def final_position(self):
         """Returns the final position of the projectile. This is the position of the projectile after passing the
@@ -477,9 +1820,12 @@ class model:
         Returns
         -------
         position : tuple
-            The distance-height coordinate pair of the final projectile position as a list.
+            The distance-height coordinate pair of the final projectile position.
         """
-        return tuple(self.positionValues[-1])
+        if self.__solution is not None:
+            return tuple(float(value) for value in
+                         self.__solution.position(self.__solution.stop_time(self.__stop_height)))
+        return tuple(self.positionValues[-1].tolist())
 
     def max_height(self):
         """Finds the maximum height achieved by the projectile in the last simulation.
@@ -489,7 +1835,9 @@ class model:
         height : float
             The maximum height the projectile attained in the last simulation.
         """
-        return max([pos[1] for pos in self.positionValues])
+        if self.__solution is not None:
+            return float(self.__solution.position(self.__solution.apex_time())[1])
+        return float(self.trajectory.y[self.trajectory.apex_index])
 
     def time_of_flight(self, surface_height=None, descending_impact=True):
         """Calculates the total time of flight for the projectile after reaching its final position.
@@ -507,10 +1855,8 @@ class model:
             The time of flight for the projectile in seconds.
         """
         if surface_height is not None:
-            matches = [pos for pos in self.positionValues if pos[1] >= surface_height]
-            if descending_impact is True:
-                return self.positionValues.index(matches[-1]) * self.time_step
-            else:
-                return self.positionValues.index(matches[0]) * self.time_step
+            return self.__surface_crossing(surface_height, descending_impact)[1]
+        elif self.__solution is not None:
+            return self.__solution.stop_time(self.__stop_height)
         else:
-            return len(self.positionValues) * self.time_step
+            return float(self.timeValues[-1])
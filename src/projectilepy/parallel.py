@@ -0,0 +1,197 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+import numpy as np
+
+from projectilepy.model import model
+
+# Outcomes recorded for targets that could not be passed to the solver, in addition to those of SolveResult
+INVALID_TARGET = "invalid_target"
+FAILED = "failed"
+
+# Record layout of the array returned by solve_angles, with NaN angles for failed solutions
+SOLUTION_DTYPE = np.dtype([("distance", float), ("height", float), ("direct", float), ("lofted", float),
+                           ("direct_status", "U18"), ("lofted_status", "U18")])
+
+# Simulation object of a worker process, created once from the configuration passed to the pool initialiser
+_worker_simulator = None
+
+
+def _initialise_worker(config):
+    """Creates the simulation object used by every chunk solved in this worker process.
+
+    Parameters
+    ----------
+    config : dict or SimulationConfig
+        The configuration of the simulation object, as taken by model.from_config.
+    """
+    global _worker_simulator
+    _worker_simulator = model.from_config(config)
+
+
+def _solve_target(simulator, target, lofted, max_error):
+    """Solves for a single launch angle firing solution, classifying why the solver failed if it did.
+
+    Parameters
+    ----------
+    simulator : model
+        The simulation object used for solving.
+    target : tuple
+        The target distance and relative height.
+    lofted : bool
+        Defines whether the lofted or un-lofted solution is found.
+    max_error : float
+        Defines the termination accuracy for the iterative solving algorithm.
+
+    Returns
+    -------
+    angle, status : float, string
+        The firing solution angle in degrees, or NaN if it was not found, and the outcome of the solver.
+    """
+    if not np.all(np.isfinite(target)) or target[0] <= 0:
+        return np.nan, INVALID_TARGET
+    try:
+        result = simulator.solve_angle(target, lofted, max_error, full_output=True)
+    except (AssertionError, ArithmeticError, IndexError):
+        return np.nan, FAILED
+    return (float(result.value) if result.success else np.nan), result.status
+
+
+def _solve_chunk(start, targets, max_error, simulator=None):
+    """Solves for the direct and lofted firing solutions of a chunk of targets.
+
+    Parameters
+    ----------
+    start : int
+        The index of the first target of the chunk within all of the targets.
+    targets : ndarray
+        The target distances and relative heights, one pair per row.
+    max_error : float
+        Defines the termination accuracy for the iterative solving algorithm.
+    simulator : model, optional
+        The simulation object used for solving, by default that of the worker process.
+
+    Returns
+    -------
+    start, solutions : int, ndarray
+        The index of the first target and the solution records of the chunk.
+    """
+    simulator = _worker_simulator if simulator is None else simulator
+    solutions = np.zeros(len(targets), dtype=SOLUTION_DTYPE)
+    for row, target in enumerate(targets):
+        target = (float(target[0]), float(target[1]))
+        direct, direct_status = _solve_target(simulator, target, False, max_error)
+        lofted, lofted_status = _solve_target(simulator, target, True, max_error)
+        solutions[row] = target + (direct, lofted, direct_status, lofted_status)
+    return start, solutions
+
+
+def _chunks(targets, chunksize):
+    """Lazily splits targets into chunks.
+
+    Parameters
+    ----------
+    targets : iterable
+        The target distance and relative height pairs.
+    chunksize : int
+        The number of targets in each chunk.
+
+    Yields
+    ------
+    start, chunk : int, ndarray
+        The index of the first target of each chunk and its targets, one pair per row.
+    """
+    targets = iter(targets)
+    start = 0
+    while True:
+        chunk = np.array(list(islice(targets, chunksize)), dtype=float).reshape(-1, 2)
+        if not len(chunk):
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def iter_solve_angles(config, targets, workers=None, chunksize=64, ordered=True, max_error=0.1):
+    """Solves for the direct and lofted launch angle firing solutions of many targets across a pool of worker
+    processes, yielding each chunk of solutions as soon as it is available. Targets are read lazily and only a few
+    chunks per worker are in flight at once, so arbitrarily long target streams are solved in bounded memory.
+
+    Parameters
+    ----------
+    config : dict or SimulationConfig
+        The configuration of the simulation object, as taken by model.from_config. This is sent to each worker
+        once, when the worker starts, and should be a SimulationConfig to keep a custom air density profile.
+    targets : iterable
+        The target distance and relative height pairs.
+    workers : int, optional
+        The number of worker processes, by default the number of processors. With a single worker the targets
+        are solved in this process without starting a pool.
+    chunksize : int
+        The number of targets sent to a worker at a time.
+    ordered : bool
+        Should chunks be yielded in the order of the targets, rather than in the order they are completed.
+    max_error : float
+        Defines the termination accuracy for the iterative solving algorithm.
+
+    Yields
+    ------
+    start, solutions : int, ndarray
+        The index of the first target of each chunk and its solution records, with the SOLUTION_DTYPE layout.
+    """
+    assert chunksize > 0, "Chunk size must be positive"
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    assert workers > 0, "Number of workers must be positive"
+
+    chunks = _chunks(targets, chunksize)
+    if workers == 1:
+        simulator = model.from_config(config)
+        for start, chunk in chunks:
+            yield _solve_chunk(start, chunk, max_error, simulator)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_initialise_worker, initargs=(config,)) as executor:
+        pending = deque(executor.submit(_solve_chunk, start, chunk, max_error)
+                        for start, chunk in islice(chunks, 2 * workers))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done = wait(pending, return_when=FIRST_COMPLETED).done
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                for start, chunk in islice(chunks, 1):
+                    pending.append(executor.submit(_solve_chunk, start, chunk, max_error))
+                yield future.result()
+
+
+def solve_angles(config, targets, workers=None, chunksize=64, max_error=0.1):
+    """Solves for the direct and lofted launch angle firing solutions of many targets across a pool of worker
+    processes.
+
+    Parameters
+    ----------
+    config : dict or SimulationConfig
+        The configuration of the simulation object, as taken by model.from_config.
+    targets : array_like
+        The target distance and relative height pairs, one pair per row.
+    workers : int, optional
+        The number of worker processes, by default the number of processors.
+    chunksize : int
+        The number of targets sent to a worker at a time.
+    max_error : float
+        Defines the termination accuracy for the iterative solving algorithm.
+
+    Returns
+    -------
+    solutions : ndarray
+        One solution record per target with the SOLUTION_DTYPE layout, holding the target, the direct and lofted
+        angles in degrees, and the outcome of solving for each angle.
+    """
+    targets = np.asarray(targets, dtype=float).reshape(-1, 2)
+    solutions = np.zeros(len(targets), dtype=SOLUTION_DTYPE)
+    for start, chunk in iter_solve_angles(config, targets, workers, chunksize, False, max_error):
+        solutions[start:start + len(chunk)] = chunk
+    return solutions
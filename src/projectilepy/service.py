@@ -0,0 +1,363 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from projectilepy.model import model
+from projectilepy.simulation import _run
+
+# Number of simulation objects each worker thread keeps for reuse, one per configuration
+_THREAD_SIMULATORS = 16
+
+# Simulation objects of the worker threads, so that repeated solves of a configuration keep its envelope
+_local = threading.local()
+
+
+def _thread_simulator(config):
+    """Finds the simulation object of this worker thread for a configuration, creating it on first use.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation object.
+
+    Returns
+    -------
+    simulator : model
+        The simulation object of this thread.
+    """
+    simulators = getattr(_local, "simulators", None)
+    if simulators is None:
+        simulators = _local.simulators = {}
+    simulator = simulators.get(config)
+    if simulator is None:
+        if len(simulators) >= _THREAD_SIMULATORS:
+            del simulators[next(iter(simulators))]
+        simulator = simulators[config] = model.from_config(config)
+    return simulator
+
+
+def _solve_angle(cancel_event, config, target_vec, lofted, max_error):
+    """Solves for a launch angle firing solution in a worker thread.
+
+    Parameters
+    ----------
+    cancel_event : threading.Event
+        The event that stops the solve when it is set.
+    config : SimulationConfig
+        The configuration of the projectile.
+    target_vec : tuple
+        The target distance and relative height.
+    lofted : bool
+        Defines whether the lofted or un-lofted solution is found.
+    max_error : float
+        Defines the termination accuracy for the iterative solving algorithm.
+
+    Returns
+    -------
+    result : SolveResult
+        The result of the solve.
+    """
+    simulator = _thread_simulator(config)
+    simulator.cancel_event = cancel_event
+    try:
+        return simulator.solve_angle(target_vec, lofted, max_error, full_output=True)
+    finally:
+        simulator.cancel_event = None
+
+
+def _simulate(cancel_event, config, stop_height, record_every, sensitivity, stop_range):
+    """Simulates a trajectory in a worker thread.
+
+    Parameters
+    ----------
+    cancel_event : threading.Event
+        The event that stops the simulation when it is set.
+    config : SimulationConfig
+        The configuration of the simulation.
+    stop_height : float
+        Height at which the simulation will be halted during the descending path.
+    record_every : int
+        Keep every k-th state, or None to keep only the launch, apex, stop height and final states.
+    sensitivity : string
+        The launch parameter to also record the derivatives of the state with respect to, or None.
+    stop_range : float
+        Distance at which the simulation will be halted if it is passed during the descending path, or None.
+
+    Returns
+    -------
+    trajectory : Trajectory
+        The recorded steps of the simulation, which are read-only as they may be shared by several requests.
+    """
+    trajectory = _run(config, stop_height, record_every, sensitivity, stop_range, cancel_event)[0]
+    trajectory.freeze()
+    return trajectory
+
+
+class AsyncService:
+    def __init__(self, executor=None, max_concurrency=None):
+        """An asyncio front-end that runs simulations and solves in worker threads, so that they never block the
+        event loop. At most a fixed number of computations run at once, and identical requests made while one is
+        already in flight share its result instead of being computed again. Cancelling a request, or letting it
+        time out, stops its integration loop once no other request is waiting on it.
+
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor, optional
+            The thread based executor that runs the computations, by default a thread pool with one thread per
+            concurrent computation. Process pools are not supported, as cancellation is signalled through an event
+            shared with the worker.
+        max_concurrency : int, optional
+            The maximum number of computations running at once, by default the number of processors.
+        """
+        self.max_concurrency = (os.cpu_count() or 1) if max_concurrency is None else max_concurrency
+        assert self.max_concurrency > 0, "Maximum concurrency must be positive"
+        self.executor = executor
+        self.__own_executor = None
+        self.__loop = None
+        self.__semaphore = None
+        self.__in_flight = {}
+
+    @property
+    def in_flight(self):
+        """int : The number of distinct computations currently running or waiting to run."""
+        return len(self.__in_flight)
+
+    def __bind(self, loop):
+        """Creates the concurrency limit and in-flight requests of an event loop, as asyncio objects belong to the
+        loop they were first used in.
+
+        Parameters
+        ----------
+        loop : asyncio.AbstractEventLoop
+            The running event loop.
+        """
+        if self.__loop is not loop:
+            self.__loop = loop
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.__in_flight = {}
+
+    async def submit(self, key, function, *args, timeout=None):
+        """Runs a function in a worker thread, sharing the computation with any identical request still in flight.
+
+        Parameters
+        ----------
+        key : tuple
+            The hashable identity of the request, which must capture every argument that affects the result.
+        function : callable
+            The function to run, called with a threading.Event that is set to cancel it, followed by the arguments.
+        args : object
+            The arguments of the function.
+        timeout : float, optional
+            The number of seconds to wait before cancelling the request and raising asyncio.TimeoutError.
+
+        Returns
+        -------
+        result : object
+            The result of the function, which is shared by every request with the same key.
+        """
+        if timeout is not None:
+            return await asyncio.wait_for(self.submit(key, function, *args), timeout)
+
+        self.__bind(asyncio.get_running_loop())
+        entry = self.__in_flight.get(key)
+        if entry is None:
+            cancel_event = threading.Event()
+            task = asyncio.ensure_future(self.__execute(function, args, cancel_event))
+            entry = self.__in_flight[key] = [task, cancel_event, 0]
+            task.add_done_callback(lambda _, entry=entry: self.__forget(key, entry))
+        entry[2] += 1
+        try:
+            # Shielding keeps the shared computation running when only one of its requests is cancelled
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[2] -= 1
+            if not entry[2] and not entry[0].done():
+                entry[1].set()
+                entry[0].cancel()
+                self.__forget(key, entry)
+
+    def __forget(self, key, entry):
+        """Removes a finished or abandoned computation from the in-flight requests, so that later identical
+        requests start a new computation.
+
+        Parameters
+        ----------
+        key : tuple
+            The identity of the request.
+        entry : list
+            The task, cancellation event and number of waiting requests of the computation.
+        """
+        if self.__in_flight.get(key) is entry:
+            del self.__in_flight[key]
+
+    async def __execute(self, function, args, cancel_event):
+        """Runs a function in the executor once the concurrency limit allows it.
+
+        Parameters
+        ----------
+        function : callable
+            The function to run.
+        args : tuple
+            The arguments of the function, after the cancellation event.
+        cancel_event : threading.Event
+            The event that stops the function when it is set.
+
+        Returns
+        -------
+        result : object
+            The result of the function.
+        """
+        async with self.__semaphore:
+            if cancel_event.is_set():
+                raise asyncio.CancelledError()
+            work = self.__executor().submit(function, cancel_event, *args)
+            try:
+                return await asyncio.wrap_future(work)
+            except asyncio.CancelledError:
+                # Hold on to the concurrency slot until the worker has seen the event and stopped
+                cancel_event.set()
+                if not work.cancel():
+                    stopped = asyncio.wrap_future(work)
+                    await asyncio.wait([stopped])
+                    if not stopped.cancelled():
+                        stopped.exception()
+                raise
+
+    def __executor(self):
+        """Returns the executor, creating the default thread pool on first use.
+
+        Returns
+        -------
+        executor : concurrent.futures.Executor
+            The executor that runs the computations.
+        """
+        if self.executor is not None:
+            return self.executor
+        if self.__own_executor is None:
+            self.__own_executor = ThreadPoolExecutor(self.max_concurrency)
+        return self.__own_executor
+
+    def shutdown(self, wait=True):
+        """Shuts down the default thread pool if it was created. A given executor is left for its owner to shut down.
+
+        Parameters
+        ----------
+        wait : bool
+            Should this wait for the running computations to finish.
+        """
+        if self.__own_executor is not None:
+            self.__own_executor.shutdown(wait)
+            self.__own_executor = None
+
+    async def solve_angle(self, config, target_vec, lofted=False, max_error=0.1, timeout=None):
+        """Finds a launch angle firing solution on the target in a worker thread.
+
+        Parameters
+        ----------
+        config : SimulationConfig
+            The configuration of the projectile, as returned by model.simulation_config.
+        target_vec : array_like
+            The first two elements of the object should correspond to the target distance and relative height.
+        lofted : bool
+            Defines whether the calculated firing angle should be the lofted or un-lofted solution.
+        max_error : float
+            Defines the termination accuracy for the iterative solving algorithm.
+        timeout : float, optional
+            The number of seconds to wait before cancelling the solve and raising asyncio.TimeoutError.
+
+        Returns
+        -------
+        result : SolveResult
+            The result of the solve.
+        """
+        target_vec = (float(target_vec[0]), float(target_vec[1]))
+        return await self.submit(("solve_angle", config, target_vec, bool(lofted), max_error), _solve_angle,
+                                 config, target_vec, bool(lofted), max_error, timeout=timeout)
+
+    async def simulate(self, config, stop_height=0, record="all", record_every=1, sensitivity=None, stop_range=None,
+                       timeout=None):
+        """Simulates the projectile described by a configuration in a worker thread. See the simulate function for
+        a description of the parameters.
+
+        Parameters
+        ----------
+        config : SimulationConfig
+            The configuration of the simulation.
+        stop_height : float, optional
+            Height at which the simulation will be halted during the descending path.
+        record : string, optional
+            Either "all" to record the simulation steps, or "endpoints" to keep only the launch, apex, impact and
+            final steps.
+        record_every : int, optional
+            Record every k-th simulation step when recording "all" steps.
+        sensitivity : string, optional
+            Also record the derivatives of the position and velocity with respect to "angle" or "velocity".
+        stop_range : float, optional
+            Distance at which the simulation will be halted if it is passed during the descending path.
+        timeout : float, optional
+            The number of seconds to wait before cancelling the simulation and raising asyncio.TimeoutError.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The recorded steps of the simulation, which are read-only as they may be shared by several requests.
+        """
+        assert record in ["all", "endpoints"], "Recording mode not recognised"
+        assert type(record_every) == int and record_every > 0, "Recording interval must be a positive integer"
+        record_every = record_every if record == "all" else None
+        return await self.submit(("simulate", config, stop_height, record_every, sensitivity, stop_range), _simulate,
+                                 config, stop_height, record_every, sensitivity, stop_range, timeout=timeout)
+
+
+# Service used by the asynchronous functions when none is given
+_default_service = None
+
+
+def default_service():
+    """Returns the shared service used when no other is given, creating it on first use.
+
+    Returns
+    -------
+    service : AsyncService
+        The default service, with one concurrent computation per processor.
+    """
+    global _default_service
+    if _default_service is None:
+        _default_service = AsyncService()
+    return _default_service
+
+
+async def simulate_async(config, stop_height=0, record="all", record_every=1, sensitivity=None, stop_range=None,
+                         timeout=None, service=None):
+    """Simulates the projectile described by a configuration without blocking the event loop, using the default
+    service unless another is given. Identical simulations requested while one is in flight share its trajectory.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation.
+    stop_height : float, optional
+        Height at which the simulation will be halted during the descending path.
+    record : string, optional
+        Either "all" to record the simulation steps, or "endpoints" to keep only the launch, apex, impact and final
+        steps.
+    record_every : int, optional
+        Record every k-th simulation step when recording "all" steps.
+    sensitivity : string, optional
+        Also record the derivatives of the position and velocity with respect to "angle" or "velocity".
+    stop_range : float, optional
+        Distance at which the simulation will be halted if it is passed during the descending path.
+    timeout : float, optional
+        The number of seconds to wait before cancelling the simulation and raising asyncio.TimeoutError.
+    service : AsyncService, optional
+        The service that runs the simulation.
+
+    Returns
+    -------
+    trajectory : Trajectory
+        The recorded steps of the simulation, which are read-only.
+    """
+    service = default_service() if service is None else service
+    return await service.simulate(config, stop_height, record, record_every, sensitivity, stop_range, timeout)
+
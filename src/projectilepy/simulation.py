@@ -0,0 +1,933 @@
+import math
+
+import numpy as np
+
+from projectilepy import analytic
+from projectilepy.atmosphere import Atmosphere, as_atmosphere, default_atmosphere
+from projectilepy.drag import as_drag_table
+from projectilepy.trajectory import Trajectory, hermite_interpolate, hermite_root
+
+# Dormand-Prince 5(4) coefficients used by the adaptive integrator
+_DORMAND_PRINCE_A = [[1 / 5],
+                     [3 / 40, 9 / 40],
+                     [44 / 45, -56 / 15, 32 / 9],
+                     [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+                     [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]]
+_DORMAND_PRINCE_B = [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84]
+_DORMAND_PRINCE_E = [71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40]
+
+# Cancellable simulations check their cancellation event once every this many steps
+_CANCEL_INTERVAL = 256
+
+
+class SimulationCancelled(Exception):
+    """Raised by a simulation when its cancellation event is set."""
+
+
+class SimulationConfig:
+    # Constructor parameters that fully describe a configuration, which are also its only attributes
+    __slots__ = ["initial_velocity", "initial_angle", "initial_height", "time_step", "gravity", "drag", "mass",
+                 "drag_coefficient", "cross_sectional_area", "integrator", "relative_tolerance", "absolute_tolerance",
+                 "drag_table", "density_profile"]
+
+    def __init__(self, initial_velocity, initial_angle, initial_height=0, time_step=0.0005, gravity=9.981,
+                 drag="None", mass=None, drag_coefficient=None, cross_sectional_area=None, integrator="euler",
+                 relative_tolerance=1e-6, absolute_tolerance=1e-6, drag_table=None, density_profile=None):
+        """An immutable description of a projectile and its launch, holding the same parameters as the model class
+        along with the fluid density profile. Configurations never change once built and simulating one has no
+        side effects, so a single configuration can be shared by any number of threads or coroutines. Variations are
+        made with the replace method.
+
+        Parameters
+        ----------
+        initial_velocity : float
+            The initial launch velocity of the projectile.
+        initial_angle : float
+            The initial launch angle of the projectile.
+        initial_height : float
+            The initial launch height of the projectile.
+        time_step : float
+            The time step used in numerical simulations.
+        gravity : float
+            The acceleration due to gravity that the projectile experiences.
+        drag : string
+            The method for calculating drag, either "None", "Stokes" or "Newtonian".
+        mass : float
+            Optional, the mass of the projectile used in drag calculations.
+        drag_coefficient : float
+            Optional, the drag coefficient of the projectile used in drag calculations, which for Stokes drag is the
+            linear drag constant in kilograms per second.
+        cross_sectional_area : float
+            Optional, the cross-sectional area of the projectile in square meters used in drag calculations.
+        integrator : string
+            The integration method, either "euler", "rk45" or "analytic".
+        relative_tolerance : float
+            Optional, the relative error tolerance of each step taken by the adaptive integrator.
+        absolute_tolerance : float
+            Optional, the absolute error tolerance of each step taken by the adaptive integrator.
+        drag_table : DragTable, string, array_like or dict, optional
+            The drag coefficient curve against Mach number for Newtonian drag, either as a drag table, the name of
+            a standard table such as "G1" or "G7", or as Mach-drag coefficient pairs. The drag coefficient then
+            scales the curve, as the form factor of the projectile.
+        density_profile : Atmosphere, array_like or dict, optional
+            The fluid density profile used in drag calculations, by default the shared Earth atmosphere.
+        """
+        assert drag in ["None", "Stokes", "Newtonian"], "Drag type not recognised"
+        assert integrator in ["euler", "rk45", "analytic"], "Integrator not recognised"
+        if density_profile is None:
+            density_profile = default_atmosphere()
+        assert isinstance(density_profile, (Atmosphere, dict, list, tuple, np.ndarray)), \
+            "Density profile must be an atmosphere, or altitude-density pairs"
+
+        values = [initial_velocity, initial_angle, initial_height, time_step, gravity, drag, mass, drag_coefficient,
+                  cross_sectional_area, integrator, relative_tolerance, absolute_tolerance,
+                  None if drag_table is None else as_drag_table(drag_table), as_atmosphere(density_profile)]
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Simulation configurations are immutable, use the replace method instead")
+
+    def __delattr__(self, name):
+        raise AttributeError("Simulation configurations are immutable")
+
+    def __reduce__(self):
+        return SimulationConfig, tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, SimulationConfig) and all(getattr(self, name) == getattr(other, name)
+                                                           for name in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return "SimulationConfig(" + ", ".join("{}={!r}".format(name, getattr(self, name))
+                                               for name in self.__slots__[:-2]) + ")"
+
+    def as_dict(self):
+        """Returns the parameters of this configuration as a dictionary of constructor arguments.
+
+        Returns
+        -------
+        config : dict
+            The constructor arguments that recreate this configuration.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def replace(self, **changes):
+        """Creates a new configuration with some of the parameters of this one changed.
+
+        Parameters
+        ----------
+        **changes
+            The constructor arguments to change.
+
+        Returns
+        -------
+        config : SimulationConfig
+            The new configuration.
+        """
+        config = self.as_dict()
+        config.update(changes)
+        return SimulationConfig(**config)
+
+
+def simulate(config, stop_height=0, record="all", record_every=1, sensitivity=None, stop_range=None,
+             cancel_event=None):
+    """Simulates the projectile described by a configuration and returns its trajectory. This has no side effects,
+    so it can be called concurrently with the same configuration from any number of threads.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation.
+    stop_height : float, optional
+        Height at which the simulation will be halted during the descending path.
+    record : string, optional
+        Either "all" to record the simulation steps, or "endpoints" to keep only the launch, apex, impact and final
+        steps.
+    record_every : int, optional
+        Record every k-th simulation step when recording "all" steps.
+    sensitivity : string, optional
+        Also record the derivatives of the position and velocity at each step with respect to a launch parameter,
+        either "angle" in degrees or "velocity", which are not available with the analytic integrator.
+    stop_range : float, optional
+        Distance at which the simulation will be halted if it is passed during the descending path, which is not
+        available with the analytic integrator.
+    cancel_event : threading.Event, optional
+        An event that stops the simulation from another thread when it is set, by raising SimulationCancelled.
+
+    Returns
+    -------
+    trajectory : Trajectory
+        The recorded steps of the simulation. Analytic simulations are sampled exactly at the time step.
+    """
+    assert record in ["all", "endpoints"], "Recording mode not recognised"
+    assert type(record_every) == int and record_every > 0, "Recording interval must be a positive integer"
+    return _run(config, stop_height, record_every if record == "all" else None, sensitivity, stop_range,
+                cancel_event)[0]
+
+
+def iter_simulate(config, stop_height=0, sensitivity=None, stop_range=None, events=None):
+    """Lazily simulates the projectile described by a configuration, generating its state after each step
+    without recording anything.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation.
+    stop_height : float, optional
+        Height at which the simulation will be halted during the descending path.
+    sensitivity : string, optional
+        Also generate the derivatives of the position and velocity with respect to a launch parameter, either
+        "angle" in degrees or "velocity".
+    stop_range : float, optional
+        Distance at which the simulation will be halted if it is passed during the descending path.
+    events : list, optional
+        A list that the time of every state generated at an event, rather than after an integration step, is
+        appended to. Only the rk45 integrator generates such states, at the apex.
+
+    Returns
+    -------
+    states : generator
+        A generator of the time, distance, height, horizontal velocity and vertical velocity of the projectile at
+        each step, followed by the derivatives of the position and velocity if a sensitivity parameter is given.
+    """
+    drag, angle, velocity = config.drag, config.initial_angle, config.initial_velocity
+    if stop_range is None:
+        stop_range = math.inf
+    else:
+        assert config.integrator != "analytic", "Stop ranges are only available for the euler and rk45 integrators"
+
+    if sensitivity is not None:
+        assert config.integrator != "analytic", "Sensitivities are only available for the euler and rk45 integrators"
+        if config.integrator == "rk45":
+            return _simulate_adaptive(config, angle, velocity, stop_height, drag, config.density_profile, sensitivity,
+                                      stop_range, events)
+        return _simulate_sensitivity(config, angle, velocity, stop_height, drag, config.density_profile, sensitivity,
+                                     stop_range)
+    elif config.integrator == "analytic":
+        return analytic_solution(config).iterate(config.time_step, stop_height)
+    elif config.integrator == "rk45":
+        return _simulate_adaptive(config, angle, velocity, stop_height, drag, config.density_profile,
+                                  stop_range=stop_range, events=events)
+    elif drag == "None":
+        return _simulate_dragless(config, angle, velocity, stop_height, stop_range)
+    elif drag == "Stokes":
+        return _simulate_stokes(config, angle, velocity, stop_height, stop_range)
+    else:
+        return _simulate_newtonian(config, angle, velocity, stop_height, config.mass, config.drag_coefficient,
+                                   config.cross_sectional_area, config.density_profile, stop_range)
+
+
+def _run(config, stop_height, record_every=1, sensitivity=None, stop_range=None, cancel_event=None):
+    """Simulates and records a trajectory, counting the integration steps taken.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation.
+    stop_height : float
+        Height at which the simulation will be halted during the descending path.
+    record_every : int, optional
+        Keep every k-th state, or None to keep only the launch, apex, stop height and final states.
+    sensitivity : string, optional
+        The launch parameter to also record the derivatives of the state with respect to.
+    stop_range : float, optional
+        Distance at which the simulation will be halted if it is passed during the descending path.
+    cancel_event : threading.Event, optional
+        An event that stops the simulation when it is set.
+
+    Returns
+    -------
+    trajectory, steps : Trajectory, int
+        The recorded states and the number of integration steps taken, which is zero for sampled analytic
+        trajectories.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise SimulationCancelled("Simulation cancelled")
+    if config.integrator == "analytic" and sensitivity is None and stop_range is None:
+        return analytic_solution(config).sample(config.time_step, stop_height), 0
+    # States generated at events are not integration steps, so they are left out of the step count
+    events = []
+    states = iter_simulate(config, stop_height, sensitivity, stop_range, events)
+    if cancel_event is not None:
+        states = _cancellable(states, cancel_event)
+    trajectory, generated = _record(states, stop_height, record_every, sensitivity is not None)
+    return trajectory, generated - len(events)
+
+
+def _cancellable(states, cancel_event):
+    """Passes on the states generated by a simulation until its cancellation event is set.
+
+    Parameters
+    ----------
+    states : iterable
+        The states generated by a simulation.
+    cancel_event : threading.Event
+        The event that stops the simulation when it is set.
+
+    Yields
+    ------
+    state : tuple
+        Each state of the simulation, until it is cancelled.
+    """
+    for index, state in enumerate(states):
+        if not index % _CANCEL_INTERVAL and cancel_event.is_set():
+            raise SimulationCancelled("Simulation cancelled")
+        yield state
+
+
+def analytic_solution(config):
+    """Constructs the exact trajectory of the projectile described by a configuration.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of a dragless or Stokes drag projectile.
+
+    Returns
+    -------
+    solution : DraglessSolution or StokesSolution
+        The exact trajectory of the projectile.
+    """
+    return analytic.trajectory_solution(config.initial_angle, config.initial_velocity, config.gravity,
+                                        analytic_drag_rate(config.drag, config.mass, config.drag_coefficient))
+
+
+def analytic_drag_rate(drag, mass, drag_coefficient):
+    """Finds the drag rate used by the exact trajectory solutions for the given drag model.
+
+    Parameters
+    ----------
+    drag : string
+        The drag model of the trajectory, either "None" or "Stokes".
+    mass : float
+        The mass of the projectile.
+    drag_coefficient : float
+        The linear drag constant of the projectile.
+
+    Returns
+    -------
+    drag_rate : float
+        The linear drag constant divided by the mass, or zero for dragless trajectories.
+    """
+    assert drag in ["None", "Stokes"], "Analytic integration is only available for dragless and Stokes drag"
+    return _stokes_drag_rate(mass, drag_coefficient) if drag == "Stokes" else 0
+
+
+def _simulate_dragless(config, angle, velocity, stop_height, stop_range=math.inf):
+    """Runs a single numerical simulation for a dragless projectile. Simulations are run using numerical
+    integration with the Euler method, with the time step of the configuration. States are generated lazily,
+    one per step.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation.
+    angle : float
+        The initial angle of the fired projectile.
+    velocity : float
+        The initial velocity of the fired projectile.
+    stop_height : float
+        The height at which the simulation will halt during the descending phase.
+    stop_range : float
+        The distance at which the simulation will halt if it is passed during the descending phase.
+
+    Yields
+    ------
+    state : tuple
+        The time, position and velocity of the projectile at each step.
+    """
+    positionVec = [0, 0]
+    velocityVec = [math.cos(math.radians(angle)) * velocity, math.sin(math.radians(angle)) * velocity]
+
+    yield 0.0, positionVec[0], positionVec[1], velocityVec[0], velocityVec[1]
+    step = 0
+
+    while True:  # numerical integration (Euler method)
+        previousHeight = positionVec[1]
+        positionVec[0] += config.time_step * velocityVec[0]
+        positionVec[1] += config.time_step * velocityVec[1]
+
+        # Apply gravity
+        velocityVec[1] -= config.time_step * config.gravity
+
+        # Yield position and velocity
+        step += 1
+        yield step * config.time_step, positionVec[0], positionVec[1], velocityVec[0], velocityVec[1]
+
+        if positionVec[1] < previousHeight < stop_height:
+            break
+        if positionVec[0] > stop_range:
+            # Only a range passed while descending halts, so keep going if it was passed on the way up
+            if positionVec[1] < previousHeight:
+                break
+            stop_range = math.inf
+
+
+def _simulate_newtonian(config, angle, velocity, stop_height, mass, drag_coefficient, cross_sectional_area,
+                        fluid_density_profile=None, stop_range=math.inf):
+    """Runs a single numerical simulation for a projectile as influenced by Newtonian drag, generating the
+    state after each step lazily.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation.
+    angle : float
+        The initial angle of the fired projectile.
+    velocity : float
+        The initial velocity of the fired projectile.
+    stop_height : float
+        The height at which the simulation will halt during the descending phase.
+    mass : float
+        The mass of the projectile being simulated.
+    drag_coefficient : float
+        The drag coefficient of the projectile.
+    cross_sectional_area : float
+        The cross-section area of the projectile.
+    fluid_density_profile : Atmosphere, optional
+        The desired fluid density profile for altitude aware drag calculations, by default that of the
+        configuration.
+    stop_range : float
+        The distance at which the simulation will halt if it is passed during the descending phase.
+
+    Yields
+    ------
+    state : tuple
+        The time, position and velocity of the projectile at each step.
+    """
+    _validate_drag_parameters(mass, drag_coefficient, cross_sectional_area)
+
+    if fluid_density_profile is None:
+        fluid_density_profile = config.density_profile
+    atmosphere = as_atmosphere(fluid_density_profile)
+    density, sound = atmosphere.density, atmosphere.speed_of_sound
+    coefficient = None if config.drag_table is None else config.drag_table.coefficient
+
+    positionVec = [0, 0]
+    velocityVec = [math.cos(math.radians(angle)) * velocity, math.sin(math.radians(angle)) * velocity]
+
+    yield 0.0, positionVec[0], positionVec[1], velocityVec[0], velocityVec[1]
+    step = 0
+
+    while True:  # numerical integration (Euler method)
+        previousHeight = positionVec[1]
+        positionVec[0] += config.time_step * velocityVec[0]
+        positionVec[1] += config.time_step * velocityVec[1]
+
+        # Calculate drag forces and velocity
+        phi = math.atan2(velocityVec[1], velocityVec[0])
+        vel = math.sqrt(velocityVec[0] ** 2 + velocityVec[1] ** 2)
+        if coefficient is None:
+            drag = _calculate_drag_force(vel, density(positionVec[1]), drag_coefficient, cross_sectional_area)
+        else:
+            # The drag coefficient is the form factor of the projectile scaling the drag curve at its Mach number
+            drag = _calculate_drag_force(vel, density(positionVec[1]),
+                                         drag_coefficient * coefficient(vel / sound(positionVec[1])),
+                                         cross_sectional_area)
+        vel -= (drag/mass) * config.time_step
+
+        # Update velocity vector
+        velocityVec[0] = math.cos(phi)*vel
+        velocityVec[1] = math.sin(phi)*vel
+
+        # Apply gravity
+        velocityVec[1] -= config.time_step * config.gravity
+
+        # Yield position and velocity
+        step += 1
+        yield step * config.time_step, positionVec[0], positionVec[1], velocityVec[0], velocityVec[1]
+
+        if positionVec[1] < previousHeight < stop_height:
+            break
+        if positionVec[0] > stop_range:
+            # Only a range passed while descending halts, so keep going if it was passed on the way up
+            if positionVec[1] < previousHeight:
+                break
+            stop_range = math.inf
+
+
+def _simulate_sensitivity(config, angle, velocity, stop_height, drag, fluid_density_profile, parameter,
+                          stop_range=math.inf):
+    """Runs a single numerical simulation with the Euler method exactly like the dragless, Stokes and Newtonian
+    drag simulations, while also propagating the derivatives of the state with respect to the launch angle or
+    velocity. The derivatives are those of the discrete Euler update itself, so they are exact for the
+    simulated trajectory rather than approximations of the continuous motion.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation.
+    angle : float
+        The initial angle of the fired projectile.
+    velocity : float
+        The initial velocity of the fired projectile.
+    stop_height : float
+        The height at which the simulation will halt during the descending phase.
+    drag : string
+        The drag model used for the simulation.
+    fluid_density_profile : Atmosphere
+        The fluid density profile for altitude aware drag calculations.
+    parameter : string
+        The launch parameter to differentiate with respect to, either "angle" in degrees or "velocity".
+    stop_range : float
+        The distance at which the simulation will halt if it is passed during the descending phase.
+
+    Yields
+    ------
+    state : tuple
+        The time, position and velocity of the projectile at each step, followed by the derivatives of the
+        position and velocity.
+    """
+    time_step = config.time_step
+    if drag == "Newtonian":
+        _validate_drag_parameters(config.mass, config.drag_coefficient, config.cross_sectional_area)
+        atmosphere = as_atmosphere(fluid_density_profile)
+        density, gradient = atmosphere.density, atmosphere.gradient
+        sound, soundGradient = atmosphere.speed_of_sound, atmosphere.speed_of_sound_gradient
+        drag_factor = 0.5 * config.drag_coefficient * config.cross_sectional_area / config.mass
+        table = config.drag_table
+    elif drag == "Stokes":
+        drag_rate = _stokes_drag_rate(config.mass, config.drag_coefficient)
+
+    x, y = 0, 0
+    vx, vy = math.cos(math.radians(angle)) * velocity, math.sin(math.radians(angle)) * velocity
+    dx, dy = 0.0, 0.0
+    dvx, dvy = _launch_sensitivity(angle, velocity, parameter)
+
+    yield 0.0, x, y, vx, vy, dx, dy, dvx, dvy
+    step = 0
+
+    while True:  # numerical integration (Euler method)
+        previousHeight = y
+        x += time_step * vx
+        y += time_step * vy
+        dx += time_step * dvx
+        dy += time_step * dvy
+
+        if drag == "Newtonian":
+            phi = math.atan2(vy, vx)
+            vel = math.sqrt(vx ** 2 + vy ** 2)
+            rho = density(y)
+
+            # Drag scales the velocity by one minus the drag factor times density, speed and time step
+            if table is None:
+                machFactor = 1.0
+                scale = 1 - drag_factor * rho * vel * time_step
+                scaleDerivative = -drag_factor * time_step * (gradient(y) * dy * vel +
+                                                              (rho * (vx * dvx + vy * dvy) / vel if vel else 0.0))
+            else:
+                # The drag curve also varies with the Mach number, through both the speed and the speed of sound
+                speedOfSound = sound(y)
+                mach = vel / speedOfSound
+                machFactor = table.coefficient(mach)
+                speedDerivative = (vx * dvx + vy * dvy) / vel if vel else 0.0
+                machDerivative = (speedDerivative - mach * soundGradient(y) * dy) / speedOfSound
+                scale = 1 - drag_factor * machFactor * rho * vel * time_step
+                scaleDerivative = -drag_factor * time_step * (
+                    machFactor * (gradient(y) * dy * vel + rho * speedDerivative) +
+                    table.slope(mach) * machDerivative * rho * vel)
+            dvx, dvy = dvx * scale + vx * scaleDerivative, dvy * scale + vy * scaleDerivative
+
+            vel -= (_calculate_drag_force(vel, rho, config.drag_coefficient * machFactor,
+                                          config.cross_sectional_area) / config.mass) * time_step
+            vx = math.cos(phi) * vel
+            vy = math.sin(phi) * vel
+        elif drag == "Stokes":
+            vx -= time_step * drag_rate * vx
+            vy -= time_step * drag_rate * vy
+            dvx -= time_step * drag_rate * dvx
+            dvy -= time_step * drag_rate * dvy
+
+        # Apply gravity
+        vy -= time_step * config.gravity
+
+        step += 1
+        yield step * time_step, x, y, vx, vy, dx, dy, dvx, dvy
+
+        if y < previousHeight < stop_height:
+            break
+        if x > stop_range:
+            if y < previousHeight:
+                break
+            stop_range = math.inf
+
+
+def _launch_sensitivity(angle, velocity, parameter):
+    """Finds the derivatives of the launch velocity components with respect to a launch parameter.
+
+    Parameters
+    ----------
+    angle : float
+        The initial angle of the fired projectile.
+    velocity : float
+        The initial velocity of the fired projectile.
+    parameter : string
+        The launch parameter to differentiate with respect to, either "angle" in degrees or "velocity".
+
+    Returns
+    -------
+    dvx, dvy : float
+        The derivatives of the horizontal and vertical launch velocity.
+    """
+    assert parameter in ["angle", "velocity"], "Sensitivity parameter not recognised"
+    if parameter == "angle":
+        scale = velocity * math.pi / 180
+        return -math.sin(math.radians(angle)) * scale, math.cos(math.radians(angle)) * scale
+    return math.cos(math.radians(angle)), math.sin(math.radians(angle))
+
+
+def _validate_drag_parameters(mass, drag_coefficient, cross_sectional_area):
+    """Checks that the projectile parameters required for drag calculations are present and valid.
+
+    Parameters
+    ----------
+    mass : float
+        The mass of the projectile being simulated.
+    drag_coefficient : float
+        The drag coefficient of the projectile.
+    cross_sectional_area : float
+        The cross-section area of the projectile.
+    """
+    assert mass is not None, "A mass must be specified for drag simulation"
+    assert type(mass) == float or type(mass) == int, "Mass must be Numerical"
+    assert mass >= 0, "A positive mass must be specified for drag simulation"
+
+    assert drag_coefficient is not None, "A drag coefficient must be specified for drag simulation"
+    assert type(drag_coefficient) == float or type(drag_coefficient) == int, "Drag coefficient must be Numerical"
+    assert drag_coefficient >= 0, "A positive drag coefficient must be specified for drag simulation"
+
+    assert cross_sectional_area is not None, "A cross-sectional area must be specified for drag simulation"
+    assert type(cross_sectional_area) == float or \
+           type(cross_sectional_area) == int, "Cross-sectional area must be Numerical"
+    assert cross_sectional_area >= 0, "A positive cross-sectional area must be specified for drag simulation"
+
+
+def _calculate_drag_force(velocity, density, drag_coefficient, cross_sectional_area):
+    """Calculates the instantaneous newtonian drag force on a projectile.
+
+    Parameters
+    ----------
+    velocity : float
+        The magnitude of the projectile velocity.
+    density : float
+        The density of the fluid medium (usually air).
+    drag_coefficient : float
+        The drag coefficient of the projectile.
+    cross_sectional_area : float
+        The cross-sectional area of the projectile.
+
+    Returns
+    -------
+    drag : float
+        The instantaneous drag of the projectile.
+    """
+    return 0.5 * density * velocity * velocity * drag_coefficient * cross_sectional_area
+
+
+def _simulate_adaptive(config, angle, velocity, stop_height, drag, fluid_density_profile, sensitivity=None,
+                       stop_range=math.inf, events=None):
+    """Runs a single numerical simulation using an adaptive step Dormand-Prince integrator. The apex is located
+    and yielded exactly, and the simulation halts exactly where the projectile descends through the stop height
+    or the stop range, or at the apex if the stop height is never reached.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation.
+    angle : float
+        The initial angle of the fired projectile.
+    velocity : float
+        The initial velocity of the fired projectile.
+    stop_height : float
+        The height at which the simulation will halt during the descending phase.
+    drag : string
+        The drag model used for the simulation.
+    fluid_density_profile : Atmosphere
+        The fluid density profile for altitude aware drag calculations.
+    sensitivity : string, optional
+        The launch parameter to also integrate the derivatives of the state with respect to, either "angle" in
+        degrees or "velocity". These follow the variational equations of the motion, and do not influence the
+        step size control.
+    stop_range : float
+        The distance at which the simulation will halt exactly if it is passed during the descending phase.
+    events : list, optional
+        A list that the time of the apex is appended to, since it is generated between integration steps.
+
+    Yields
+    ------
+    state : tuple
+        The time, position and velocity of the projectile at each step, followed by the derivatives of the
+        position and velocity if a sensitivity parameter is given.
+    """
+    gravity = config.gravity
+
+    if drag == "Newtonian":
+        _validate_drag_parameters(config.mass, config.drag_coefficient, config.cross_sectional_area)
+        drag_factor = 0.5 * config.drag_coefficient * config.cross_sectional_area / config.mass
+        density, gradient = fluid_density_profile.density, fluid_density_profile.gradient
+        table = config.drag_table
+
+        if table is None:
+            def derivative(state):
+                deceleration = drag_factor * density(state[1]) * math.hypot(state[2], state[3])
+                return np.array([state[2], state[3], -deceleration * state[2], -deceleration * state[3] - gravity])
+
+            def variation(state):
+                speed = math.hypot(state[2], state[3])
+                rho = density(state[1])
+                deceleration = drag_factor * rho * speed
+                decelerationDerivative = drag_factor * (gradient(state[1]) * state[5] * speed + (
+                    rho * (state[2] * state[6] + state[3] * state[7]) / speed if speed else 0.0))
+                return [state[6], state[7], -deceleration * state[6] - decelerationDerivative * state[2],
+                        -deceleration * state[7] - decelerationDerivative * state[3]]
+        else:
+            sound, soundGradient = fluid_density_profile.speed_of_sound, fluid_density_profile.speed_of_sound_gradient
+
+            def derivative(state):
+                speed = math.hypot(state[2], state[3])
+                deceleration = drag_factor * density(state[1]) * speed * table.coefficient(speed / sound(state[1]))
+                return np.array([state[2], state[3], -deceleration * state[2], -deceleration * state[3] - gravity])
+
+            def variation(state):
+                speed = math.hypot(state[2], state[3])
+                rho = density(state[1])
+                speedOfSound = sound(state[1])
+                mach = speed / speedOfSound
+                machFactor = table.coefficient(mach)
+                deceleration = drag_factor * rho * speed * machFactor
+                speedDerivative = (state[2] * state[6] + state[3] * state[7]) / speed if speed else 0.0
+                machDerivative = (speedDerivative - mach * soundGradient(state[1]) * state[5]) / speedOfSound
+                decelerationDerivative = drag_factor * (
+                    machFactor * (gradient(state[1]) * state[5] * speed + rho * speedDerivative) +
+                    table.slope(mach) * machDerivative * rho * speed)
+                return [state[6], state[7], -deceleration * state[6] - decelerationDerivative * state[2],
+                        -deceleration * state[7] - decelerationDerivative * state[3]]
+    elif drag == "Stokes":
+        drag_rate = _stokes_drag_rate(config.mass, config.drag_coefficient)
+
+        def derivative(state):
+            return np.array([state[2], state[3], -drag_rate * state[2], -drag_rate * state[3] - gravity])
+
+        def variation(state):
+            return [state[6], state[7], -drag_rate * state[6], -drag_rate * state[7]]
+    else:
+        def derivative(state):
+            return np.array([state[2], state[3], 0.0, -gravity])
+
+        def variation(state):
+            return [state[6], state[7], 0.0, 0.0]
+
+    state = [0.0, 0.0, math.cos(math.radians(angle)) * velocity, math.sin(math.radians(angle)) * velocity]
+    if sensitivity is not None:
+        # Augment the state with its derivatives, which evolve with the Jacobian of the motion
+        state += [0.0, 0.0] + list(_launch_sensitivity(angle, velocity, sensitivity))
+        motion = derivative
+
+        def derivative(state):
+            return np.concatenate((motion(state), variation(state)))
+    state = np.array(state)
+    slope = derivative(state)
+    time = 0.0
+
+    yield (time,) + tuple(state.tolist())
+
+    def error_scale(*states):
+        return config.absolute_tolerance + config.relative_tolerance * np.max(np.abs(states), axis=0)[:4]
+
+    # Initial step from the ratio of the state to its rate of change
+    d0 = np.sqrt(np.mean((state[:4] / error_scale(state)) ** 2))
+    d1 = np.sqrt(np.mean((slope[:4] / error_scale(state)) ** 2))
+    step = float(0.01 * d0 / d1) if d0 > 1e-5 and d1 > 1e-5 else 1e-3
+
+    while True:  # numerical integration (Dormand-Prince method)
+        stages = [slope]
+        for row in _DORMAND_PRINCE_A:
+            stages.append(derivative(state + step * sum(a * k for a, k in zip(row, stages))))
+        new_state = state + step * sum(b * k for b, k in zip(_DORMAND_PRINCE_B, stages))
+        new_slope = derivative(new_state)
+        stages.append(new_slope)
+
+        error = step * sum(e * k[:4] for e, k in zip(_DORMAND_PRINCE_E, stages))
+        error_norm = float(np.sqrt(np.mean((error / error_scale(state, new_state)) ** 2)))
+
+        if error_norm > 1:
+            step *= max(0.2, 0.9 * error_norm ** -0.2)
+            continue
+
+        # Record the apex exactly when the vertical velocity changes sign during the step, and halt there if the
+        # projectile never reaches the stop height, as the other integrators do
+        if state[3] > 0 >= new_state[3]:
+            fraction = hermite_root(state, slope, new_state, new_slope, step, 3, 0)
+            apex = hermite_interpolate(state, slope, new_state, new_slope, step, fraction)
+            if events is not None:
+                events.append(time + fraction * step)
+            yield (time + fraction * step,) + tuple(apex.tolist())
+            if apex[1] < stop_height:
+                break
+
+        # Halt exactly where the projectile descends through the stop height
+        if state[1] > stop_height > new_state[1]:
+            fraction = hermite_root(state, slope, new_state, new_slope, step, 1, stop_height)
+            new_state = hermite_interpolate(state, slope, new_state, new_slope, step, fraction)
+            new_state[1] = stop_height
+            step *= fraction
+        elif state[0] <= stop_range < new_state[0]:
+            # Halt exactly at the stop range if it is passed while descending, otherwise ignore it from now on
+            fraction = hermite_root(state, slope, new_state, new_slope, step, 0, stop_range)
+            passed = hermite_interpolate(state, slope, new_state, new_slope, step, fraction)
+            if passed[3] < 0:
+                new_state = passed
+                new_state[0] = stop_range
+                step *= fraction
+            else:
+                stop_range = math.inf
+
+        time += step
+        yield (time,) + tuple(new_state.tolist())
+
+        if new_state[1] <= stop_height and new_state[3] < 0 or new_state[0] >= stop_range:
+            break
+
+        state, slope = new_state, new_slope
+        step *= min(5.0, 0.9 * error_norm ** -0.2) if error_norm > 0 else 5.0
+
+
+def _simulate_stokes(config, angle, velocity, stop_height, stop_range=math.inf):
+    """Runs a single numerical simulation for a projectile as influenced by Stokes drag, generating the
+    state after each step lazily.
+
+    Parameters
+    ----------
+    config : SimulationConfig
+        The configuration of the simulation.
+    angle : float
+        The initial angle of the fired projectile.
+    velocity : float
+        The initial velocity of the fired projectile.
+    stop_height : float
+        The height at which the simulation will halt during the descending phase.
+    stop_range : float
+        The distance at which the simulation will halt if it is passed during the descending phase.
+
+    Yields
+    ------
+    state : tuple
+        The time, position and velocity of the projectile at each step.
+    """
+    drag_rate = _stokes_drag_rate(config.mass, config.drag_coefficient)
+
+    positionVec = [0, 0]
+    velocityVec = [math.cos(math.radians(angle)) * velocity, math.sin(math.radians(angle)) * velocity]
+
+    yield 0.0, positionVec[0], positionVec[1], velocityVec[0], velocityVec[1]
+    step = 0
+
+    while True:  # numerical integration (Euler method)
+        previousHeight = positionVec[1]
+        positionVec[0] += config.time_step * velocityVec[0]
+        positionVec[1] += config.time_step * velocityVec[1]
+
+        # Apply linear drag
+        velocityVec[0] -= config.time_step * drag_rate * velocityVec[0]
+        velocityVec[1] -= config.time_step * drag_rate * velocityVec[1]
+
+        # Apply gravity
+        velocityVec[1] -= config.time_step * config.gravity
+
+        # Yield position and velocity
+        step += 1
+        yield step * config.time_step, positionVec[0], positionVec[1], velocityVec[0], velocityVec[1]
+
+        if positionVec[1] < previousHeight < stop_height:
+            break
+        if positionVec[0] > stop_range:
+            # Only a range passed while descending halts, so keep going if it was passed on the way up
+            if positionVec[1] < previousHeight:
+                break
+            stop_range = math.inf
+
+
+def _stokes_drag_rate(mass, drag_coefficient):
+    """Checks the projectile parameters required for Stokes drag and calculates the resulting drag rate.
+
+    Parameters
+    ----------
+    mass : float
+        The mass of the projectile being simulated.
+    drag_coefficient : float
+        The linear drag constant of the projectile.
+
+    Returns
+    -------
+    drag_rate : float
+        The linear drag constant divided by the mass, in units of 1/s.
+    """
+    assert mass is not None, "A mass must be specified for drag simulation"
+    assert type(mass) == float or type(mass) == int, "Mass must be Numerical"
+    assert mass > 0, "A positive mass must be specified for drag simulation"
+
+    assert drag_coefficient is not None, "A drag coefficient must be specified for drag simulation"
+    assert type(drag_coefficient) == float or type(drag_coefficient) == int, "Drag coefficient must be Numerical"
+    assert drag_coefficient >= 0, "A positive drag coefficient must be specified for drag simulation"
+
+    return drag_coefficient / mass
+
+
+def _record(states, stop_height, record_every=1, sensitivities=False):
+    """Records the states generated by a simulation. When decimating, the launch, the apex, the final state
+    and the two states either side of the stop height are always kept alongside every k-th state, so that the
+    apex, final position, time of flight and the impact at the stop height are unchanged from a full recording.
+
+    Parameters
+    ----------
+    states : iterable
+        The time, position and velocity of the projectile at each step.
+    stop_height : float
+        The height at which the simulation halts during the descending phase.
+    record_every : int, optional
+        Keep every k-th state, or None to keep only the launch, apex, stop height and final states.
+    sensitivities : bool, optional
+        Do the states include the derivatives of the position and velocity.
+
+    Returns
+    -------
+    trajectory, generated : Trajectory, int
+        The recorded states and the number of states generated after the launch.
+    """
+    if record_every == 1:
+        trajectory = Trajectory(sensitivities=sensitivities)
+        record = trajectory.append
+        for state in states:
+            record(*state)
+        trajectory.trim()
+        return trajectory, len(trajectory) - 1
+
+    trajectory = Trajectory(capacity=64, sensitivities=sensitivities)
+    record = trajectory.append
+    ascending = True
+    descended = False
+    pending = None
+    pendingKept = True
+
+    # Each state is recorded once the next one is known, so that the apex and stop height crossing can be kept
+    index = 0
+    for index, state in enumerate(states):
+        kept = index == 0 or (record_every is not None and index % record_every == 0)
+        if pending is not None:
+            if ascending and state[2] < pending[2]:
+                ascending = False
+                pendingKept = True
+            if not ascending and not descended and state[2] < stop_height <= pending[2]:
+                descended = True
+                pendingKept = kept = True
+            if pendingKept:
+                record(*pending)
+        pending, pendingKept = state, kept
+
+    record(*pending)
+    trajectory.trim()
+    return trajectory, index
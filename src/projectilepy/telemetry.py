@@ -0,0 +1,114 @@
+class Counters:
+    def __init__(self):
+        """Running totals of the work done by a simulation object, which are cheap enough to always be collected.
+
+        Attributes
+        ----------
+        simulations : int
+            The number of simulations run, including those restored from the cache.
+        cache_hits : int
+            The number of simulations restored from the cache instead of being integrated.
+        steps : int
+            The number of integration steps taken.
+        solves : int
+            The number of firing solutions attempted.
+        iterations : int
+            The number of solver iterations.
+        simulate_seconds : float
+            The wall time spent running simulations.
+        query_seconds : float
+            The wall time spent querying impacts from simulations.
+        """
+        self.reset()
+
+    # Names of the counted quantities, in the order they are reported
+    FIELDS = ["simulations", "cache_hits", "steps", "solves", "iterations", "simulate_seconds", "query_seconds"]
+
+    def reset(self):
+        """Sets every counter back to zero."""
+        self.simulations = 0
+        self.cache_hits = 0
+        self.steps = 0
+        self.solves = 0
+        self.iterations = 0
+        self.simulate_seconds = 0.0
+        self.query_seconds = 0.0
+
+    def snapshot(self):
+        """Returns the current value of every counter.
+
+        Returns
+        -------
+        counters : dict
+            The counter values keyed by name.
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self):
+        return "Counters(" + ", ".join("{}={}".format(name, getattr(self, name)) for name in self.FIELDS) + ")"
+
+
+class SolveResult:
+    # Outcomes of a solve
+    SOLVED = "solved"
+    NOT_CONVERGED = "not_converged"
+    OUT_OF_RANGE = "out_of_range"
+    UNREACHABLE = "unreachable"
+    HEIGHT_NOT_REACHED = "height_not_reached"
+
+    def __init__(self, solver, target, value, status, history, counters, seconds):
+        """The outcome of a firing solution solve along with its convergence history and cost.
+
+        Parameters
+        ----------
+        solver : string
+            The name of the solver method, for example "solve_angle".
+        target : tuple
+            The target distance and relative height.
+        value : float
+            The solved launch parameter, or None if the solve failed.
+        status : string
+            Either "solved", or the reason the solve failed: "not_converged" if the iterations did not reach the
+            required accuracy, "out_of_range" if they left the valid range of the launch parameter,
+            "height_not_reached" if a simulation never reached the target height, or "unreachable" if the exact
+            solution, the launch sweep or the bracket shows that no launch parameter reaches the target.
+        history : list
+            One (parameter, impact distance, error) tuple per iteration, with NaN impact distance and error for
+            iterations that did not reach the target height.
+        counters : dict
+            The counters of the work done by the solve, with the same names as the Counters class.
+        seconds : float
+            The total wall time of the solve.
+        """
+        self.solver = solver
+        self.target = target
+        self.value = value
+        self.status = status
+        self.history = history
+        self.counters = counters
+        self.seconds = seconds
+
+    @property
+    def success(self):
+        """bool : Whether a firing solution was found."""
+        return self.status == self.SOLVED
+
+    @property
+    def iterations(self):
+        """int : The number of solver iterations."""
+        return len(self.history)
+
+    @property
+    def simulations(self):
+        """int : The number of simulations run by the solve."""
+        return self.counters["simulations"]
+
+    @property
+    def steps(self):
+        """int : The number of integration steps taken by the solve."""
+        return self.counters["steps"]
+
+    def __repr__(self):
+        return "SolveResult(solver={!r}, value={!r}, status={!r}, iterations={}, simulations={}, steps={}, " \
+               "seconds={:.6f})".format(self.solver, self.value, self.status, self.iterations, self.simulations,
+                                        self.steps, self.seconds)
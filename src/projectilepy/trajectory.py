@@ -0,0 +1,601 @@
+import numpy as np
+
+
+class Trajectory:
+    # Column layout of the underlying storage array, where the optional sensitivity columns hold the derivatives
+    # of the position and velocity with respect to a launch parameter
+    TIME, X, Y, VX, VY, DX, DY, DVX, DVY = range(9)
+
+    def __init__(self, capacity=4096, sensitivities=False):
+        """A recorded projectile trajectory backed by a contiguous float64 array with one row per simulation step
+        and columns for time, position and velocity. Storage grows in chunks as steps are appended, and all of the
+        accessors return views into the storage rather than copies.
+
+        Parameters
+        ----------
+        capacity : int
+            The number of steps to allocate storage for up front.
+        sensitivities : bool
+            Should each step also store the sensitivity of the position and velocity to a launch parameter.
+        """
+        assert capacity > 0, "Capacity must be positive"
+        self._data = np.empty((int(capacity), 9 if sensitivities else 5))
+        self._length = 0
+        self.__apex = None
+
+    @classmethod
+    def from_data(cls, data):
+        """Wraps recorded steps as a trajectory without copying them, such as an array memory-mapped from an
+        archive. Appending to the trajectory copies the steps into new storage first.
+
+        Parameters
+        ----------
+        data : ndarray
+            A 2-D float64 array with one row per step and the columns time, x, y, vx and vy, optionally followed by
+            the four sensitivity columns.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The trajectory backed by the given array.
+        """
+        assert data.ndim == 2 and data.shape[1] in (5, 9), "Data must have the trajectory columns"
+        assert data.dtype == np.float64, "Data must be float64"
+        trajectory = cls(capacity=1, sensitivities=data.shape[1] == 9)
+        trajectory._data = data
+        trajectory._length = data.shape[0]
+        return trajectory
+
+    def __len__(self):
+        return self._length
+
+    def __reserve(self, count):
+        """Grows the storage so that at least the given number of further steps can be appended without another
+        reallocation. The capacity is at least doubled on each growth to keep appending amortised constant time.
+
+        Parameters
+        ----------
+        count : int
+            The number of steps that are about to be appended.
+        """
+        required = self._length + count
+        if required > self._data.shape[0]:
+            data = np.empty((max(required, 2 * self._data.shape[0]), self._data.shape[1]))
+            data[:self._length] = self._data[:self._length]
+            self._data = data
+
+    def append(self, time, x, y, vx, vy, *sensitivities):
+        """Records a single simulation step.
+
+        Parameters
+        ----------
+        time : float
+            The simulation time of the step.
+        x, y : float
+            The distance-height coordinates of the projectile.
+        vx, vy : float
+            The horizontal and vertical velocity components of the projectile.
+        sensitivities : float
+            The derivatives of x, y, vx and vy with respect to the launch parameter, if they are stored.
+        """
+        if self._length == self._data.shape[0]:
+            self.__reserve(1)
+        self._data[self._length] = (time, x, y, vx, vy) + sensitivities
+        self._length += 1
+
+    def extend(self, rows):
+        """Records many simulation steps at once.
+
+        Parameters
+        ----------
+        rows : array_like
+            A 2-D array with one row per step and the columns time, x, y, vx and vy, followed by the sensitivity
+            columns if they are stored.
+        """
+        rows = np.asarray(rows, dtype=float)
+        assert rows.ndim == 2 and rows.shape[1] == self._data.shape[1], "Rows must have a value for every column"
+        self.__reserve(rows.shape[0])
+        self._data[self._length:self._length + rows.shape[0]] = rows
+        self._length += rows.shape[0]
+
+    def trim(self):
+        """Releases any storage allocated beyond the recorded steps. Views taken before trimming keep referencing
+        the previous storage.
+        """
+        if self._data.shape[0] != self._length:
+            self._data = self._data[:max(self._length, 1)].copy()
+
+    def freeze(self):
+        """Trims the storage and marks it read-only, so that the trajectory can be safely shared."""
+        self.trim()
+        self._data.flags.writeable = False
+
+    @property
+    def data(self):
+        """ndarray : A view of all recorded steps with the columns time, x, y, vx and vy, followed by the
+        sensitivity columns if they are stored."""
+        return self._data[:self._length]
+
+    @property
+    def times(self):
+        """ndarray : A view of the time of each recorded step."""
+        return self._data[:self._length, self.TIME]
+
+    @property
+    def positions(self):
+        """ndarray : A view of the distance-height coordinate pair of each recorded step."""
+        return self._data[:self._length, self.X:self.Y + 1]
+
+    @property
+    def velocities(self):
+        """ndarray : A view of the velocity coordinate pair of each recorded step."""
+        return self._data[:self._length, self.VX:self.VY + 1]
+
+    @property
+    def x(self):
+        """ndarray : A view of the distance of each recorded step."""
+        return self._data[:self._length, self.X]
+
+    @property
+    def y(self):
+        """ndarray : A view of the height of each recorded step."""
+        return self._data[:self._length, self.Y]
+
+    @property
+    def sensitivities(self):
+        """ndarray : A view of the derivatives of x, y, vx and vy with respect to the launch parameter at each
+        recorded step, or None if sensitivities are not stored."""
+        if self._data.shape[1] == 5:
+            return None
+        return self._data[:self._length, self.DX:self.DVY + 1]
+
+    @property
+    def nbytes(self):
+        """int : The number of bytes of storage currently allocated."""
+        return self._data.nbytes
+
+    @property
+    def apex_index(self):
+        """int : The index of the highest recorded step. Heights increase up to this step and decrease after it,
+        which allows the crossing queries to binary search each branch."""
+        if self.__apex is None or self.__apex[0] != self._length:
+            self.__apex = self._length, int(np.argmax(self.y)) if self._length else 0
+        return self.__apex[1]
+
+    @staticmethod
+    def __bisect(values, target, lower, upper, increasing=True):
+        """Binary searches a monotonic range of values for the last index that has not yet passed the target.
+
+        Parameters
+        ----------
+        values : ndarray
+            The values to search.
+        target : float
+            The value to search for.
+        lower, upper : int
+            The inclusive index range to search, where the value at the lower index has not passed the target.
+        increasing : bool
+            Whether the values increase or decrease over the index range.
+
+        Returns
+        -------
+        index : int
+            The last index in the range whose value is at most the target if increasing, or at least the target
+            if decreasing.
+        """
+        while lower < upper:
+            middle = (lower + upper + 1) // 2
+            if (values[middle] <= target) if increasing else (values[middle] >= target):
+                lower = middle
+            else:
+                upper = middle - 1
+        return lower
+
+    def __step(self, index):
+        """Returns the time and position of a recorded step.
+
+        Parameters
+        ----------
+        index : int
+            The index of the step.
+
+        Returns
+        -------
+        time, x, y : float
+            The time and position of the step.
+        """
+        return float(self._data[index, self.TIME]), float(self._data[index, self.X]), float(self._data[index, self.Y])
+
+    def __interpolate(self, index, fraction, interpolation):
+        """Interpolates the recorded state part of the way between a step and the next one.
+
+        Parameters
+        ----------
+        index : int
+            The index of the earlier step.
+        fraction : float
+            The fraction of the way to the next step, between 0 and 1.
+        interpolation : string
+            Either "linear" or "hermite" for cubic Hermite interpolation of positions using the velocities.
+
+        Returns
+        -------
+        time, x, y : float
+            The interpolated time and position.
+        """
+        first, second = self._data[index], self._data[index + 1]
+        time = first[self.TIME] + fraction * (second[self.TIME] - first[self.TIME])
+        if interpolation == "hermite":
+            x, y = hermite_interpolate(first[self.X:self.Y + 1], first[self.VX:self.VY + 1],
+                                       second[self.X:self.Y + 1], second[self.VX:self.VY + 1],
+                                       second[self.TIME] - first[self.TIME], fraction)
+        else:
+            x = first[self.X] + fraction * (second[self.X] - first[self.X])
+            y = first[self.Y] + fraction * (second[self.Y] - first[self.Y])
+        return float(time), float(x), float(y)
+
+    def __crossing(self, height, descending):
+        """Locates the step at or just before the projectile passed through the given height.
+
+        Parameters
+        ----------
+        height : float
+            The height of the surface to find the crossing for.
+        descending : bool
+            Should the crossing on the descending branch be found, rather than the ascending one.
+
+        Returns
+        -------
+        index, exact : int, bool
+            The index of the step, and whether the crossing is at the step itself rather than between it and the
+            next one, or None if the projectile never reached the height.
+        """
+        if not self._length:
+            return None
+        y = self.y
+        apex = self.apex_index
+        if y[apex] < height:
+            return None
+
+        if descending:
+            index = self.__bisect(y, height, apex, self._length - 1, increasing=False)
+            return index, bool(index == self._length - 1 or y[index] == height)
+        if y[0] >= height:
+            return 0, True
+        index = self.__bisect(y, height, 0, apex, increasing=True)
+        return index, bool(y[index] == height)
+
+    def surface_crossing(self, height, descending=True, interpolation="linear"):
+        """Finds where the projectile passed through the given height, using a binary search on the ascending or
+        descending branch of the trajectory and interpolating between the two steps either side of the crossing.
+        If the recording ends above the height, the final step is returned for descending crossings, and likewise
+        the first step is returned for ascending crossings if the recording starts above the height.
+
+        Parameters
+        ----------
+        height : float
+            The height of the surface to find the crossing for.
+        descending : bool
+            Should the crossing on the descending branch be found, rather than the ascending one.
+        interpolation : string
+            Either "linear" or "hermite" for cubic Hermite interpolation of positions using the velocities.
+
+        Returns
+        -------
+        time, x, y : float
+            The time and position of the crossing, or None if the projectile never reached the height.
+        """
+        crossing = self.__crossing(height, descending)
+        if crossing is None:
+            return None
+        index, exact = crossing
+        if exact:
+            return self.__step(index)
+
+        y = self.y
+        fraction = (height - y[index]) / (y[index + 1] - y[index])
+        if interpolation == "hermite":
+            data = self._data
+            fraction = hermite_root(data[index, self.X:self.Y + 1], data[index, self.VX:self.VY + 1],
+                                    data[index + 1, self.X:self.Y + 1], data[index + 1, self.VX:self.VY + 1],
+                                    data[index + 1, self.TIME] - data[index, self.TIME], 1, height)
+        time, x, _ = self.__interpolate(index, fraction, interpolation)
+        return time, x, float(height)
+
+    def crossing_sensitivity(self, height, descending=True, interpolation="linear"):
+        """Finds the derivative of the distance at which the projectile passed through the given height with
+        respect to the launch parameter that sensitivities were stored for. Linearly interpolated crossings are
+        differentiated exactly, so that the derivative is consistent with the crossing found by the
+        surface_crossing method, while Hermite interpolated crossings use the sensitivities of the continuous
+        trajectory.
+
+        Parameters
+        ----------
+        height : float
+            The height of the surface to find the crossing for.
+        descending : bool
+            Should the crossing on the descending branch be found, rather than the ascending one.
+        interpolation : string
+            Either "linear" or "hermite", matching the interpolation used to find the crossing.
+
+        Returns
+        -------
+        derivative : float
+            The derivative of the crossing distance, or None if the projectile never reached the height.
+        """
+        assert self._data.shape[1] > 5, "Sensitivities were not stored for this trajectory"
+        crossing = self.__crossing(height, descending)
+        if crossing is None:
+            return None
+        index, exact = crossing
+        first = self._data[index]
+        if exact:
+            # A crossing exactly at a step moves along the trajectory to stay at the surface height
+            if first[self.Y] == height and first[self.VY] != 0:
+                return float(first[self.DX] - first[self.VX] / first[self.VY] * first[self.DY])
+            return float(first[self.DX])
+
+        second = self._data[index + 1]
+        rise = second[self.Y] - first[self.Y]
+        fraction = (height - first[self.Y]) / rise
+        if interpolation == "hermite":
+            step = second[self.TIME] - first[self.TIME]
+            fraction = hermite_root(first[self.X:self.Y + 1], first[self.VX:self.VY + 1],
+                                    second[self.X:self.Y + 1], second[self.VX:self.VY + 1], step, 1, height)
+            vx, vy = hermite_derivative(first[self.X:self.Y + 1], first[self.VX:self.VY + 1],
+                                        second[self.X:self.Y + 1], second[self.VX:self.VY + 1], step, fraction)
+            dx, dy = hermite_interpolate(first[self.DX:self.DY + 1], first[self.DVX:self.DVY + 1],
+                                         second[self.DX:self.DY + 1], second[self.DVX:self.DVY + 1], step, fraction)
+            return float(dx - vx / vy * dy)
+
+        rise_derivative = second[self.DY] - first[self.DY]
+        fraction_derivative = -(first[self.DY] + fraction * rise_derivative) / rise
+        return float(first[self.DX] + fraction * (second[self.DX] - first[self.DX]) +
+                     fraction_derivative * (second[self.X] - first[self.X]))
+
+    def position_at_range(self, distance, interpolation="linear"):
+        """Finds where the projectile reached the given distance, using a binary search on the increasing
+        distances and interpolating between the two steps either side of it.
+
+        Parameters
+        ----------
+        distance : float
+            The horizontal distance from the launch point.
+        interpolation : string
+            Either "linear" or "hermite" for cubic Hermite interpolation of positions using the velocities.
+
+        Returns
+        -------
+        time, x, y : float
+            The time and position of the projectile at the distance, or None if it was never reached.
+        """
+        x = self.x
+        if not self._length or not x[0] <= distance <= x[-1]:
+            return None
+        index = self.__bisect(x, distance, 0, self._length - 1, increasing=True)
+        if index == self._length - 1 or x[index] == distance:
+            return self.__step(index)
+
+        fraction = (distance - x[index]) / (x[index + 1] - x[index])
+        if interpolation == "hermite":
+            data = self._data
+            fraction = hermite_root(data[index, self.X:self.Y + 1], data[index, self.VX:self.VY + 1],
+                                    data[index + 1, self.X:self.Y + 1], data[index + 1, self.VX:self.VY + 1],
+                                    data[index + 1, self.TIME] - data[index, self.TIME], 0, distance)
+        time, _, y = self.__interpolate(index, fraction, interpolation)
+        return time, float(distance), y
+
+    def states_at(self, times, interpolation="hermite"):
+        """Finds the position and velocity of the projectile at many times at once, using a binary search on the
+        recorded times and interpolating between the two steps either side of each time. Hermite interpolation
+        stays accurate between widely spaced steps, so trajectories recorded with a large recording interval can
+        still be queried at any time.
+
+        Parameters
+        ----------
+        times : array_like
+            The times since launch to find the state at.
+        interpolation : string
+            Either "hermite" for cubic Hermite interpolation of positions using the velocities, with velocities
+            from its derivative, or "linear" to interpolate both linearly.
+
+        Returns
+        -------
+        positions, velocities : ndarray
+            The distance-height and velocity coordinate pairs at each time, shaped like the times with an extra
+            coordinate axis. Times outside of the recording give NaN coordinates.
+        """
+        assert interpolation in ["linear", "hermite"], "Interpolation not recognised"
+        times = np.asarray(times, dtype=float)
+        shape = times.shape
+        times = times.ravel()
+        positions = np.full((times.size, 2), np.nan)
+        velocities = np.full((times.size, 2), np.nan)
+        if not self._length:
+            return positions.reshape(shape + (2,)), velocities.reshape(shape + (2,))
+
+        data = self._data[:self._length]
+        recorded = data[:, self.TIME]
+        inside = (recorded[0] <= times) & (times <= recorded[-1])
+        if self._length == 1:
+            positions[inside] = data[0, self.X:self.Y + 1]
+            velocities[inside] = data[0, self.VX:self.VY + 1]
+            return positions.reshape(shape + (2,)), velocities.reshape(shape + (2,))
+
+        index = np.clip(np.searchsorted(recorded, times[inside], side="right") - 1, 0, self._length - 2)
+        first, second = data[index], data[index + 1]
+        step = (second[:, self.TIME] - first[:, self.TIME])[:, None]
+        # Steps truncated to nothing at a stop height or range take the state at their start
+        fraction = np.divide(times[inside, None] - first[:, self.TIME, None], step, out=np.zeros_like(step),
+                             where=step > 0)
+        states = first[:, self.X:self.Y + 1], first[:, self.VX:self.VY + 1], \
+            second[:, self.X:self.Y + 1], second[:, self.VX:self.VY + 1]
+        if interpolation == "hermite":
+            positions[inside] = hermite_interpolate(*states, step, fraction)
+            velocities[inside] = np.where(step > 0, hermite_derivative(*states, np.where(step > 0, step, 1.0),
+                                                                       fraction), states[1])
+        else:
+            positions[inside] = states[0] + fraction * (states[2] - states[0])
+            velocities[inside] = states[1] + fraction * (states[3] - states[1])
+        return positions.reshape(shape + (2,)), velocities.reshape(shape + (2,))
+
+    def positions_at(self, times, interpolation="hermite"):
+        """Finds the position of the projectile at many times at once, as described by the states_at method.
+
+        Parameters
+        ----------
+        times : array_like
+            The times since launch to find the position at.
+        interpolation : string
+            Either "hermite" for cubic Hermite interpolation of positions using the velocities, or "linear".
+
+        Returns
+        -------
+        positions : ndarray
+            The distance-height coordinate pairs at each time, which are NaN for times outside of the recording.
+        """
+        return self.states_at(times, interpolation)[0]
+
+    def position_at(self, time, interpolation="hermite"):
+        """Finds the position of the projectile at the given time.
+
+        Parameters
+        ----------
+        time : float
+            The time since launch.
+        interpolation : string
+            Either "hermite" for cubic Hermite interpolation of positions using the velocities, or "linear".
+
+        Returns
+        -------
+        x, y : float
+            The position of the projectile, or None if the time is outside of the recording.
+        """
+        position = self.states_at(time, interpolation)[0]
+        if np.isnan(position[0]):
+            return None
+        return float(position[0]), float(position[1])
+
+    def velocity_at(self, time, interpolation="hermite"):
+        """Finds the velocity of the projectile at the given time.
+
+        Parameters
+        ----------
+        time : float
+            The time since launch.
+        interpolation : string
+            Either "hermite" to differentiate the cubic Hermite interpolant of the positions, or "linear" to
+            interpolate the velocities linearly.
+
+        Returns
+        -------
+        vx, vy : float
+            The velocity of the projectile, or None if the time is outside of the recording.
+        """
+        velocity = self.states_at(time, interpolation)[1]
+        if np.isnan(velocity[0]):
+            return None
+        return float(velocity[0]), float(velocity[1])
+
+
+def hermite_interpolate(state0, slope0, state1, slope1, step, fraction):
+    """Evaluates the cubic Hermite interpolant between two integration steps.
+
+    Parameters
+    ----------
+    state0, state1 : ndarray
+        The states at the start and end of the step.
+    slope0, slope1 : ndarray
+        The time derivatives of the states at the start and end of the step.
+    step : float
+        The duration of the step.
+    fraction : float
+        The fraction of the step at which to evaluate the interpolant, between 0 and 1.
+
+    Returns
+    -------
+    state : ndarray
+        The interpolated state.
+    """
+    f2 = fraction * fraction
+    f3 = f2 * fraction
+    return (2 * f3 - 3 * f2 + 1) * np.asarray(state0) + (f3 - 2 * f2 + fraction) * step * np.asarray(slope0) + \
+        (3 * f2 - 2 * f3) * np.asarray(state1) + (f3 - f2) * step * np.asarray(slope1)
+
+
+def hermite_derivative(state0, slope0, state1, slope1, step, fraction):
+    """Evaluates the time derivative of the cubic Hermite interpolant between two integration steps.
+
+    Parameters
+    ----------
+    state0, state1 : ndarray
+        The states at the start and end of the step.
+    slope0, slope1 : ndarray
+        The time derivatives of the states at the start and end of the step.
+    step : float
+        The duration of the step.
+    fraction : float
+        The fraction of the step at which to evaluate the derivative, between 0 and 1.
+
+    Returns
+    -------
+    slope : ndarray
+        The time derivative of the interpolated state.
+    """
+    f2 = fraction * fraction
+    return ((6 * f2 - 6 * fraction) * (np.asarray(state0) - np.asarray(state1)) / step +
+            (3 * f2 - 4 * fraction + 1) * np.asarray(slope0) + (3 * f2 - 2 * fraction) * np.asarray(slope1))
+
+
+def hermite_root(state0, slope0, state1, slope1, step, component, level, tolerance=1e-12):
+    """Finds the fraction of a step at which a component of the cubic Hermite interpolant crosses a level.
+    The component must lie on opposite sides of the level at either end of the step.
+
+    Parameters
+    ----------
+    state0, state1 : ndarray
+        The states at the start and end of the step.
+    slope0, slope1 : ndarray
+        The time derivatives of the states at the start and end of the step.
+    step : float
+        The duration of the step.
+    component : int
+        The index of the state component to find the crossing for.
+    level : float
+        The value of the component at the crossing.
+    tolerance : float
+        The termination accuracy for the crossing fraction.
+
+    Returns
+    -------
+    fraction : float
+        The fraction of the step at which the crossing occurs.
+    """
+    def residual(fraction):
+        f2 = fraction * fraction
+        f3 = f2 * fraction
+        return (2 * f3 - 3 * f2 + 1) * state0[component] + (f3 - 2 * f2 + fraction) * step * slope0[component] + \
+            (3 * f2 - 2 * f3) * state1[component] + (f3 - f2) * step * slope1[component] - level
+
+    # Illinois variant of the false position method
+    lower, upper = 0.0, 1.0
+    f_lower, f_upper = residual(lower), residual(upper)
+    if f_lower == 0:
+        return lower
+    side = 0
+    for iterations in range(100):
+        fraction = (lower * f_upper - upper * f_lower) / (f_upper - f_lower)
+        f_fraction = residual(fraction)
+        if f_fraction == 0 or upper - lower < tolerance:
+            return float(fraction)
+        if (f_fraction > 0) == (f_lower > 0):
+            lower, f_lower = fraction, f_fraction
+            if side == -1:
+                f_upper /= 2
+            side = -1
+        else:
+            upper, f_upper = fraction, f_fraction
+            if side == 1:
+                f_lower /= 2
+            side = 1
+    return float(fraction)
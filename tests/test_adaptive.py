@@ -0,0 +1,28 @@
+import pytest
+
+from projectilepy import model
+
+
+def exact_impact(**parameters):
+    simulator = model(120, 35, integrator="analytic", **parameters)
+    simulator.run()
+    return simulator.surface_impact(0)[0]
+
+
+@pytest.mark.parametrize("tolerance", [1e-4, 1e-8])
+def test_error_follows_tolerance(tolerance):
+    parameters = {"drag": "Stokes", "mass": 2.0, "drag_coefficient": 0.1}
+    simulator = model(120, 35, integrator="rk45", relative_tolerance=tolerance, absolute_tolerance=tolerance,
+                      **parameters)
+    simulator.run()
+    assert simulator.surface_impact(0)[0] == pytest.approx(exact_impact(**parameters), rel=100 * tolerance)
+
+
+def test_adaptive_steps_are_fewer_than_euler():
+    euler = model(120, 35, drag="Newtonian", mass=2.0, drag_coefficient=0.4, cross_sectional_area=0.01)
+    euler.run()
+    adaptive = model(120, 35, integrator="rk45", drag="Newtonian", mass=2.0, drag_coefficient=0.4,
+                     cross_sectional_area=0.01)
+    adaptive.run()
+    assert len(adaptive.trajectory) < len(euler.trajectory) / 10
+    assert adaptive.trajectory.y[-1] == pytest.approx(0, abs=1e-9)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from projectilepy import TrajectoryArchive, load_batch, model, save_batch
+
+
+def test_trajectory_archive_round_trip(tmp_path):
+    simulator = model(150, 30, drag="Newtonian", mass=43, drag_coefficient=0.45, cross_sectional_area=0.1,
+                      drag_table="G7")
+    trajectories = []
+    for angle in [20.0, 40.0, 60.0]:
+        simulator.run(override_angle=angle)
+        trajectories.append(simulator.trajectory)
+    archive = TrajectoryArchive.write(str(tmp_path), iter(trajectories), simulator.get_config(), stop_height=0)
+    loaded = TrajectoryArchive.load(str(tmp_path))
+    assert len(archive) == len(loaded) == 3
+    assert isinstance(loaded.data, np.memmap)
+    for trajectory, data in zip(loaded, trajectories):
+        assert np.array_equal(trajectory.data, data.data)
+    assert loaded.metadata["stop_height"] == 0
+
+    copy = model.from_config(loaded.config)
+    copy.run(override_angle=40.0)
+    assert np.array_equal(copy.trajectory.data, trajectories[1].data)
+
+
+def test_batch_results_round_trip(tmp_path):
+    simulator = model(150, 30)
+    results = simulator.run_batch([10.0, 30.0, 50.0], 150)
+    save_batch(str(tmp_path), results, simulator.get_config(), stop_height=0)
+    loaded, metadata = load_batch(str(tmp_path))
+    assert sorted(loaded) == sorted(results)
+    for name in results:
+        assert np.array_equal(loaded[name], results[name], equal_nan=True)
+    assert metadata["config"]["initial_velocity"] == 150
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from projectilepy import Atmosphere, model
+from projectilepy.atmosphere import EARTH_DENSITY_PROFILE
+
+
+def test_densities_interpolate_the_profile():
+    atmosphere = Atmosphere(EARTH_DENSITY_PROFILE, interval=500)
+    profile = np.array(EARTH_DENSITY_PROFILE)
+    altitudes = np.linspace(-1000, 10000, 37)
+    assert np.allclose(atmosphere.densities(altitudes), np.interp(altitudes, profile[:, 0], profile[:, 1]))
+    assert atmosphere.density(1500.0) == pytest.approx(float(np.interp(1500, profile[:, 0], profile[:, 1])))
+
+
+def test_bounds():
+    clamped = Atmosphere([[0, 1.0], [100, 0.5]])
+    assert clamped.density(-50) == 1.0 and clamped.density(500) == 0.5
+    raising = Atmosphere([[0, 1.0], [100, 0.5]], bounds="raise")
+    with pytest.raises(ValueError):
+        raising.density(500)
+
+
+def test_atmospheres_are_shared_and_comparable():
+    assert model(100, 30).default_earth_atmospheric_density is model(50, 10).default_earth_atmospheric_density
+    assert Atmosphere({0: 1.0, 100: 0.5}) == Atmosphere([[0, 1.0], [100, 0.5]])
+    assert hash(Atmosphere({0: 1.0, 100: 0.5})) == hash(Atmosphere([[0, 1.0], [100, 0.5]]))
+
+
+def test_grids_keep_profile_breakpoints_and_ends():
+    profile = np.array([[0, 1.2], [150, 1.0], [400, 0.6], [1000, 0.1]])
+    atmosphere = Atmosphere(profile)
+    assert np.allclose(atmosphere.densities(profile[:, 0]), profile[:, 1])
+    assert atmosphere.altitudes[-1] == pytest.approx(1000)
+    coarse = Atmosphere(profile, interval=300)
+    assert coarse.interval <= 300
+    assert coarse.altitudes[-1] == pytest.approx(1000)
+    assert coarse.density(1000.0) == pytest.approx(0.1)
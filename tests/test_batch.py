@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from projectilepy import model
+
+CASES = [("None", {}), ("Stokes", {"mass": 2.0, "drag_coefficient": 0.1}),
+         ("Newtonian", {"mass": 43, "drag_coefficient": 0.45, "cross_sectional_area": 0.1})]
+
+
+@pytest.mark.parametrize("drag, parameters", CASES)
+def test_batch_matches_single_runs(drag, parameters):
+    simulator = model(150, 30, time_step=0.001, drag=drag, **parameters)
+    angles, velocities = np.array([10.0, 35.0, 70.0]), np.array([80.0, 150.0])
+    results = simulator.run_batch(angles[:, None], velocities[None, :], stop_height=-5)
+    assert results["impact"].shape == (3, 2, 2)
+    for row, angle in enumerate(angles):
+        for column, velocity in enumerate(velocities):
+            simulator.run(stop_height=-5, override_angle=float(angle), override_velocity=float(velocity))
+            assert results["impact"][row, column, 0] == pytest.approx(simulator.surface_impact(-5)[0], abs=1e-9)
+            assert results["time_of_flight"][row, column] == pytest.approx(simulator.time_of_flight(-5), abs=1e-9)
+            assert results["apex"][row, column, 1] == pytest.approx(simulator.max_height(), abs=1e-9)
+
+
+def test_batch_surface_heights_and_unreached_heights():
+    simulator = model(100, 45, time_step=0.001)
+    results = simulator.run_batch([5.0, 45.0], 100, stop_height=0, surface_heights=[0, 100])
+    assert results["surface_impact"].shape == (2, 2, 2)
+    assert np.isnan(results["surface_impact"][0, 1, 0])
+    simulator.run(stop_height=0, override_angle=45.0)
+    assert results["surface_impact"][1, 1, 0] == pytest.approx(simulator.surface_impact(100)[0], abs=1e-9)
+
+
+def test_batch_leaves_stored_simulation_untouched():
+    simulator = model(100, 45)
+    simulator.run()
+    before = simulator.final_position()
+    simulator.run_batch([10.0, 20.0], 50)
+    assert simulator.final_position() == before
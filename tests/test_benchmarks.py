@@ -0,0 +1,27 @@
+import importlib.util
+import os
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "benchmarks", "run_benchmarks.py")
+
+
+def load_benchmarks():
+    spec = importlib.util.spec_from_file_location("run_benchmarks", BENCHMARKS)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_compare_flags_regressions():
+    benchmarks = load_benchmarks()
+    baseline = {"benchmarks": {"fast": {"seconds": 1.0}, "solve": {"seconds": 1.0, "simulations": 5, "solved": True},
+                               "steady": {"seconds": 1.0}}}
+    current = {"benchmarks": {"fast": {"seconds": 1.5}, "solve": {"seconds": 0.5, "simulations": 6, "solved": True},
+                              "steady": {"seconds": 1.05}, "new": {"seconds": 1.0}}}
+    assert benchmarks.compare(baseline, current, threshold=0.1) == ["fast", "solve"]
+
+
+def test_quick_suite_reports_every_benchmark():
+    benchmarks = load_benchmarks()
+    results = benchmarks.run(quick=True, repeat=1, pattern="surface_impact")
+    assert results["benchmarks"] and all(result["seconds"] > 0 for result in results["benchmarks"].values())
+    assert benchmarks.compare(results, results) == []
@@ -0,0 +1,44 @@
+from projectilepy import model
+
+PROJECTILE = {"drag": "Newtonian", "mass": 43, "drag_coefficient": 0.45, "cross_sectional_area": 0.1}
+
+
+def test_repeated_runs_hit_the_cache():
+    simulator = model(150, 30, **PROJECTILE)
+    cache = simulator.enable_cache()
+    simulator.run()
+    first = simulator.final_position()
+    simulator.run()
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert simulator.final_position() == first
+    assert not simulator.trajectory.data.flags.writeable
+
+
+def test_changed_parameters_miss_the_cache():
+    simulator = model(150, 30, **PROJECTILE)
+    cache = simulator.enable_cache()
+    simulator.run()
+    first = simulator.final_position()
+    changes = [("mass", 20), ("drag_coefficient", 0.3), ("time_step", 0.001), ("initial_angle", 40),
+               ("default_earth_atmospheric_density", [[-1000, 0.3], [90000, 0.0]])]
+    for name, value in changes:
+        original = getattr(simulator, name)
+        setattr(simulator, name, value)
+        misses = cache.misses
+        simulator.run()
+        assert cache.misses == misses + 1, name
+        assert simulator.final_position() != first, name
+        setattr(simulator, name, original)
+    simulator.run()
+    assert simulator.final_position() == first
+    assert cache.hits == 1
+
+
+def test_cache_evicts_least_recently_used():
+    simulator = model(150, 30)
+    cache = simulator.enable_cache(max_entries=2)
+    for angle in [10.0, 20.0, 30.0]:
+        simulator.run(override_angle=angle)
+    assert len(cache) == 2 and cache.evictions == 1
+    simulator.run(override_angle=10.0)
+    assert cache.misses == 4
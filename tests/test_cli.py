@@ -0,0 +1,56 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from projectilepy import model
+from projectilepy.cli import main
+
+CONFIG = {"initial_velocity": 150, "initial_angle": 30, "time_step": 0.002, "drag": "Newtonian", "mass": 43,
+          "drag_coefficient": 0.45, "cross_sectional_area": 0.1}
+
+
+def solve(tmp_path, lines, output="out.csv", *options):
+    config = tmp_path / "shell.json"
+    config.write_text(json.dumps(CONFIG))
+    targets = tmp_path / "targets.csv"
+    targets.write_text("\n".join(lines) + "\n")
+    output = tmp_path / output
+    status = main(["solve", "--config", str(config), "--input", str(targets), "--output", str(output),
+                   "--workers", "1", "--chunksize", "2", "--quiet"] + list(options))
+    assert status == 0
+    return output
+
+
+def read_csv(path):
+    with open(str(path)) as file:
+        return list(csv.DictReader(file))
+
+
+def test_rows_line_up_with_input(tmp_path):
+    rows = read_csv(solve(tmp_path, ["500,0", "bad,row", "", "700,-20", "600"]))
+    assert [row["distance"] for row in rows] == ["500.0", "nan", "700.0", "600.0"]
+    assert [row["direct_status"] for row in rows] == ["solved", "invalid_target", "solved", "invalid_target"]
+    assert float(rows[0]["direct"]) == pytest.approx(model.from_config(CONFIG).solve_angle([500, 0]), abs=1e-9)
+
+
+def test_malformed_first_row_is_kept(tmp_path):
+    rows = read_csv(solve(tmp_path, ["x,bad,", "500,0"]))
+    assert [row["direct_status"] for row in rows] == ["invalid_target", "solved"]
+
+
+def test_header_selects_columns(tmp_path):
+    rows = read_csv(solve(tmp_path, ["id,height,distance", "1,-20,700", "2,0,500"]))
+    assert [(row["distance"], row["height"]) for row in rows] == [("700.0", "-20.0"), ("500.0", "0.0")]
+
+
+def test_output_formats_agree(tmp_path):
+    lines = ["500,0", "bad", "700,-20"]
+    records = np.load(str(solve(tmp_path, lines, "out.npy")))
+    with open(str(solve(tmp_path, lines, "out.jsonl"))) as file:
+        entries = [json.loads(line) for line in file]
+    assert len(records) == len(entries) == 3
+    assert [entry["direct"] for entry in entries][1] is None
+    assert np.allclose(records["direct"], [np.nan if entry["direct"] is None else entry["direct"]
+                                           for entry in entries], equal_nan=True)
@@ -0,0 +1,24 @@
+import numpy as np
+
+from projectilepy import model
+from projectilepy.analytic import trajectory_solution
+from projectilepy.simulation import analytic_drag_rate
+
+
+def test_dense_output_matches_exact_trajectory():
+    simulator = model(120, 35, drag="Stokes", mass=2.0, drag_coefficient=0.1, integrator="rk45",
+                      relative_tolerance=1e-9, absolute_tolerance=1e-9)
+    simulator.run()
+    exact = trajectory_solution(35, 120, simulator.gravity, analytic_drag_rate("Stokes", 2.0, 0.1))
+    times = simulator.trajectory.times
+    midpoints = 0.5 * (times[:-1] + times[1:])
+    assert np.allclose(simulator.trajectory.positions_at(midpoints), np.stack(exact.position(midpoints), axis=-1),
+                       atol=1e-3)
+
+
+def test_dense_output_reproduces_recorded_steps():
+    simulator = model(150, 30, integrator="rk45")
+    simulator.run()
+    trajectory = simulator.trajectory
+    assert np.allclose(trajectory.positions_at(trajectory.times), trajectory.positions)
+    assert np.allclose(trajectory.velocity_at(float(trajectory.times[3])), trajectory.velocities[3])
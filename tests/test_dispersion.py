@@ -0,0 +1,30 @@
+import numpy as np
+
+from projectilepy import model
+
+# Thin custom atmosphere, which carries the pumpkin much further than the default one
+THIN_AIR = [[-1000, 0.3], [90000, 0.0]]
+DISTRIBUTIONS = {"angle": ("normal", 0.5), "velocity": ("normal", 2.0)}
+
+
+def thin_air_model():
+    simulator = model(150, 30, time_step=0.005, drag="Newtonian", mass=43, drag_coefficient=0.45,
+                      cross_sectional_area=0.1)
+    simulator.default_earth_atmospheric_density = THIN_AIR
+    return simulator
+
+
+def test_statistics_do_not_depend_on_workers():
+    simulator = thin_air_model()
+    serial = simulator.dispersion(600, DISTRIBUTIONS, seed=3, chunksize=100, workers=1)
+    pooled = simulator.dispersion(600, DISTRIBUTIONS, seed=3, chunksize=100, workers=2)
+    assert serial.samples == pooled.samples == 600
+    assert np.allclose(serial.mean, pooled.mean, rtol=1e-12)
+    assert np.allclose(serial.std, pooled.std, rtol=1e-12)
+
+
+def test_statistics_use_custom_atmosphere():
+    simulator = thin_air_model()
+    result = simulator.dispersion(200, DISTRIBUTIONS, seed=3, chunksize=100)
+    simulator.run()
+    assert abs(result.mean[0] - simulator.final_position()[0]) < 0.05 * simulator.final_position()[0]
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from projectilepy import DragTable, model
+from projectilepy.drag import STANDARD_TABLES, as_drag_table
+
+
+def test_coefficients_interpolate_the_table():
+    table = as_drag_table("G7")
+    curve = np.array(STANDARD_TABLES["G7"])
+    machs = np.linspace(0, 4, 41)
+    assert np.allclose(table.coefficients(machs), np.interp(machs, curve[:, 0], curve[:, 1]), atol=1e-9)
+    assert table.coefficient(100) == pytest.approx(curve[-1, 1])
+
+
+def test_flat_table_matches_constant_drag():
+    parameters = {"drag": "Newtonian", "mass": 10, "cross_sectional_area": 0.005}
+    constant = model(400, 30, drag_coefficient=0.3, **parameters)
+    constant.run()
+    tabulated = model(400, 30, drag_coefficient=1.0, drag_table=DragTable([[0, 0.3], [10, 0.3]]), **parameters)
+    tabulated.run()
+    assert tabulated.final_position() == pytest.approx(constant.final_position(), rel=1e-9)
+
+
+def test_transonic_drag_shortens_the_flight():
+    parameters = {"drag": "Newtonian", "mass": 10, "cross_sectional_area": 0.005}
+    subsonic = model(800, 30, drag_coefficient=0.12, **parameters)
+    subsonic.run()
+    g7 = model(800, 30, drag_coefficient=1.0, drag_table="G7", **parameters)
+    g7.run()
+    assert g7.final_position()[0] < subsonic.final_position()[0]
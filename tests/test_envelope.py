@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from projectilepy import model
+
+PROJECTILE = {"drag": "Newtonian", "mass": 8, "drag_coefficient": 0.35, "cross_sectional_area": 0.07}
+
+
+def brute_force_range(simulator, height):
+    angles = np.arange(1.0, 89.0, 0.01)
+    distances = simulator.run_batch(angles, simulator.initial_velocity, stop_height=height)["impact"][:, 0]
+    best = int(np.nanargmax(distances))
+    return angles[best], distances[best]
+
+
+@pytest.mark.parametrize("height", [0, 50])
+def test_max_range_matches_brute_force(height):
+    simulator = model(75, 30, time_step=0.001, **PROJECTILE)
+    angle, distance = simulator.max_range(height)
+    best_angle, best_distance = brute_force_range(simulator, height)
+    assert distance == pytest.approx(best_distance, abs=0.01)
+    assert angle == pytest.approx(best_angle, abs=0.1)
+
+
+def test_max_range_dragless_is_exact():
+    simulator = model(100, 30, integrator="analytic")
+    angle, distance = simulator.max_range()
+    assert angle == pytest.approx(45)
+    assert distance == pytest.approx(100 ** 2 / simulator.gravity)
+
+
+def test_envelope_shapes_and_unreachable_heights():
+    simulator = model(75, 30, time_step=0.001, **PROJECTILE)
+    envelope = simulator.envelope([50, 75], [0, 1000])
+    assert envelope["angle"].shape == envelope["distance"].shape == (2, 2)
+    assert envelope["distance"][1, 0] > envelope["distance"][0, 0]
+    assert np.isnan(envelope["distance"][:, 1]).all()
+    assert simulator.max_range(1000) == (None, None)
@@ -0,0 +1,72 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from projectilepy import FiringTable, model
+from projectilepy.drag import as_drag_table
+
+
+def g7_model():
+    return model(300, 30, time_step=0.002, drag="Newtonian", mass=10, drag_coefficient=1,
+                 cross_sectional_area=0.005, drag_table=as_drag_table("G7"))
+
+
+def build(simulator):
+    return FiringTable.build(simulator, angles=np.linspace(5, 85, 17), velocities=[250, 300, 350])
+
+
+def test_save_and_load_round_trip(tmp_path):
+    table = build(g7_model())
+    table.save(str(tmp_path))
+    loaded = FiringTable.load(str(tmp_path))
+    for name in FiringTable.ARRAYS:
+        assert np.array_equal(getattr(loaded, name), getattr(table, name), equal_nan=True)
+    drag_table = as_drag_table(loaded.config["drag_table"])
+    assert np.allclose(drag_table.machs, table.config["drag_table"].machs)
+    assert np.allclose(drag_table.grid, table.config["drag_table"].grid)
+    assert loaded.solve_angle([2000, 0]) == pytest.approx(table.solve_angle([2000, 0]), abs=0.01)
+
+
+def test_failed_save_keeps_existing_table(tmp_path):
+    table = build(g7_model())
+    table.save(str(tmp_path))
+    table.config["drag_table"] = object()
+    with pytest.raises(TypeError):
+        table.save(str(tmp_path))
+    with open(os.path.join(str(tmp_path), "config.json")) as file:
+        assert len(json.load(file)["drag_table"]) > 2
+    FiringTable.load(str(tmp_path))
+
+
+def test_solve_velocity_falls_back_outside_velocity_grid():
+    simulator = model(150, 30, drag="Newtonian", mass=43, drag_coefficient=0.45, cross_sectional_area=0.1)
+    table = FiringTable.build(simulator, angles=np.linspace(5, 85, 17), velocities=[100, 120, 140])
+    velocity = table.solve_velocity([1200, 0], angle=35)
+    assert velocity is not False and velocity > 140
+    table.simulator.run(override_velocity=velocity, override_angle=35.0)
+    assert abs(table.simulator.surface_impact(0)[0] - 1200) < 0.1
+
+
+def test_solvers_leave_simulator_launch_unchanged():
+    simulator = model(150, 30, drag="Newtonian", mass=43, drag_coefficient=0.45, cross_sectional_area=0.1)
+    table = FiringTable.build(simulator, angles=np.linspace(5, 85, 17), velocities=[100, 150, 200])
+    table.solve_angle([600, 0], velocity=120)
+    table.solve_angle([600, 0], velocity=400)
+    table.solve_velocity([600, 0], angle=40)
+    table.solve_velocity([600, 500], angle=60)
+    assert (table.simulator.initial_velocity, table.simulator.initial_angle) == (150, 30)
+
+
+def test_tables_keep_the_density_profile(tmp_path):
+    simulator = model(150, 30, drag="Newtonian", mass=43, drag_coefficient=0.45, cross_sectional_area=0.1)
+    simulator.default_earth_atmospheric_density = [[-1000, 0.3], [90000, 0.0]]
+    table = FiringTable.build(simulator, angles=np.linspace(5, 85, 17), velocities=[100, 150, 200])
+    direct = simulator.solve_angle([1200, 0])
+    assert table.solve_angle([1200, 0]) == pytest.approx(direct, abs=0.05)
+    assert table.solve_angle([1200, 0], refine=False) == pytest.approx(direct, abs=0.5)
+    table.save(str(tmp_path))
+    loaded = FiringTable.load(str(tmp_path))
+    assert loaded.simulator.simulation_config() == table.simulator.simulation_config()
+    assert loaded.solve_angle([1200, 0]) == table.solve_angle([1200, 0])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from projectilepy import model
+
+CASES = [("None", {}), ("Stokes", {"mass": 2.0, "drag_coefficient": 0.1})]
+
+
+@pytest.mark.parametrize("drag, parameters", CASES)
+def test_integrators_agree_on_impact(drag, parameters):
+    impacts = {}
+    for integrator in ["euler", "rk45", "analytic"]:
+        simulator = model(120, 35, time_step=0.0001, drag=drag, integrator=integrator, **parameters)
+        simulator.run()
+        impacts[integrator] = simulator.surface_impact(0)[0]
+    assert impacts["rk45"] == pytest.approx(impacts["analytic"], rel=1e-5)
+    assert impacts["euler"] == pytest.approx(impacts["analytic"], rel=1e-3)
+
+
+@pytest.mark.parametrize("drag, parameters", CASES)
+def test_integrators_agree_on_trajectory(drag, parameters):
+    exact = model(120, 35, drag=drag, integrator="analytic", **parameters)
+    exact.run()
+    simulator = model(120, 35, drag=drag, integrator="rk45", **parameters)
+    simulator.run()
+    times = np.linspace(0, 0.9 * simulator.time_of_flight(), 7)
+    positions = simulator.trajectory.positions_at(times)
+    assert np.allclose(positions, exact.trajectory.positions_at(times), rtol=1e-4, atol=1e-3)
+
+
+@pytest.mark.parametrize("drag, parameters", CASES)
+def test_integrators_halt_at_apex_below_stop_height(drag, parameters):
+    ends = {}
+    for integrator in ["euler", "rk45", "analytic"]:
+        simulator = model(50, 30, time_step=0.0001, drag=drag, integrator=integrator, **parameters)
+        simulator.run(stop_height=1000)
+        ends[integrator] = simulator.final_position() + (float(simulator.trajectory.times[-1]),)
+        assert simulator.final_position()[1] == pytest.approx(simulator.max_height(), rel=1e-6)
+    assert ends["rk45"] == pytest.approx(ends["analytic"], rel=1e-4)
+    assert ends["euler"] == pytest.approx(ends["analytic"], rel=1e-3)
+
+
+@pytest.mark.parametrize("drag, parameters", CASES)
+@pytest.mark.parametrize("target, lofted", [([100, 50], False), ([100, 50], True), ([300, 0], False),
+                                            ([250, -40], True)])
+def test_angle_solutions_agree(drag, parameters, target, lofted):
+    angles = {}
+    for integrator in ["euler", "rk45", "analytic"]:
+        simulator = model(100, 30, time_step=0.0005, drag=drag, integrator=integrator, **parameters)
+        angles[integrator] = simulator.solve_angle(target, lofted)
+    if angles["analytic"] is None:
+        assert angles["euler"] is None and angles["rk45"] is None
+    else:
+        assert angles["rk45"] == pytest.approx(angles["analytic"], abs=0.01)
+        assert angles["euler"] == pytest.approx(angles["analytic"], abs=0.05)
+
+
+def test_analytic_solutions_hit_on_the_way_down():
+    simulator = model(100, 30, integrator="analytic")
+    assert simulator.solve_angle([100, 50]) is None
+    assert simulator.solve_velocity([100, 50]) is False
+    angle = simulator.solve_angle([100, 50], True)
+    simulator.run(stop_height=50, override_angle=angle)
+    assert simulator.surface_impact(50)[0] == pytest.approx(100, abs=1e-6)
@@ -0,0 +1,41 @@
+import pytest
+
+from projectilepy import SolveResult, model
+
+PROJECTILE = {"drag": "Newtonian", "mass": 8, "drag_coefficient": 0.35, "cross_sectional_area": 0.07}
+
+
+def impact_miss(simulator, target, **overrides):
+    simulator.run(stop_height=target[1], **overrides)
+    return simulator.surface_impact(target[1])[0] - target[0]
+
+
+@pytest.mark.parametrize("target, lofted", [([550, 0], False), ([550, 0], True), ([400, 60], False)])
+def test_multi_resolution_angle_matches_fixed_step(target, lofted):
+    simulator = model(150, 30, time_step=0.0002, **PROJECTILE)
+    fixed = simulator.solve_angle(target, lofted, full_output=True)
+    coarse = simulator.solve_angle(target, lofted, full_output=True, multi_resolution=True)
+    assert coarse.status == SolveResult.SOLVED
+    assert abs(impact_miss(simulator, target, override_angle=coarse.value)) < 0.1
+    assert coarse.value == pytest.approx(fixed.value, abs=0.05)
+    assert coarse.steps < fixed.steps
+
+
+def test_multi_resolution_velocity_matches_fixed_step():
+    simulator = model(150, 40, time_step=0.0002, **PROJECTILE)
+    fixed = simulator.solve_velocity([700, 0], full_output=True)
+    coarse = simulator.solve_velocity([700, 0], full_output=True, multi_resolution=True)
+    assert coarse.status == SolveResult.SOLVED
+    assert abs(impact_miss(simulator, [700, 0], override_velocity=coarse.value)) < 0.1
+    assert coarse.value == pytest.approx(fixed.value, rel=1e-3)
+
+
+def test_multi_resolution_rejects_unreachable_targets():
+    simulator = model(150, 30, time_step=0.0002, **PROJECTILE)
+    assert simulator.solve_angle([5000, 0], multi_resolution=True) is None
+    assert simulator.last_solve_result.status == SolveResult.UNREACHABLE
+
+
+def test_other_integrators_ignore_multi_resolution():
+    simulator = model(150, 30, integrator="rk45", **PROJECTILE)
+    assert simulator.solve_angle([550, 0], multi_resolution=True) == simulator.solve_angle([550, 0])
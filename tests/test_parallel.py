@@ -0,0 +1,45 @@
+import numpy as np
+
+from projectilepy import model
+
+# Thin custom atmosphere, which carries the pumpkin much further than the default one
+THIN_AIR = [[-1000, 0.3], [90000, 0.0]]
+
+
+def thin_air_model():
+    simulator = model(150, 30, drag="Newtonian", mass=43, drag_coefficient=0.45, cross_sectional_area=0.1)
+    simulator.default_earth_atmospheric_density = THIN_AIR
+    return simulator
+
+
+def test_solve_angles_matches_serial_solver():
+    simulator = thin_air_model()
+    targets = [[700, 0], [400, -50]]
+    solutions = simulator.solve_angles(targets, workers=1)
+    for target, solution in zip(targets, solutions):
+        assert solution["direct"] == simulator.solve_angle(target, False)
+        assert solution["lofted"] == simulator.solve_angle(target, True)
+
+
+def test_solve_angles_does_not_depend_on_workers():
+    simulator = thin_air_model()
+    targets = [[700, 0], [400, -50], [-5, 0], [1e6, 0]]
+    serial = simulator.solve_angles(targets, workers=1, chunksize=1)
+    pooled = simulator.solve_angles(targets, workers=2, chunksize=1)
+    for name in ["direct", "lofted"]:
+        assert np.array_equal(serial[name], pooled[name], equal_nan=True)
+        assert np.array_equal(serial[name + "_status"], pooled[name + "_status"])
+    assert list(serial["direct_status"]) == ["solved", "solved", "invalid_target", "unreachable"]
+
+
+def test_iter_solve_angles_keeps_target_order():
+    simulator = thin_air_model()
+    targets = [[300 + 100 * index, 0] for index in range(5)]
+    starts = [start for start, _ in simulator.iter_solve_angles(iter(targets), workers=2, chunksize=2)]
+    assert starts == [0, 2, 4]
+
+
+def test_from_config_keeps_density_profile():
+    simulator = thin_air_model()
+    copy = model.from_config(simulator.simulation_config())
+    assert copy.simulation_config() == simulator.simulation_config()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from projectilepy import model
+
+
+def linear_crossing(positions, height, descending):
+    heights = positions[:, 1]
+    apex = int(np.argmax(heights))
+    indices = range(apex, len(heights) - 1) if descending else range(apex)
+    for index in indices:
+        low, high = sorted(heights[index:index + 2])
+        if low <= height <= high and heights[index] != heights[index + 1]:
+            fraction = (height - heights[index]) / (heights[index + 1] - heights[index])
+            return positions[index, 0] + fraction * (positions[index + 1, 0] - positions[index, 0])
+    return None
+
+
+@pytest.mark.parametrize("height", [-20, 0, 35.5, 120])
+@pytest.mark.parametrize("descending", [True, False])
+def test_surface_impact_matches_linear_search(height, descending):
+    simulator = model(100, 50, time_step=0.01, drag="Newtonian", mass=5, drag_coefficient=0.4,
+                      cross_sectional_area=0.01)
+    simulator.run(stop_height=-20)
+    positions = np.asarray(simulator.positionValues)
+    expected = linear_crossing(positions, height, descending)
+    if expected is None and not descending and height < positions[0, 1]:
+        # Recordings starting above the surface give the launch position as the ascending crossing
+        assert simulator.surface_impact(height, descending) == tuple(positions[0])
+    elif expected is None:
+        with pytest.raises(ValueError):
+            simulator.surface_impact(height, descending)
+    else:
+        assert simulator.surface_impact(height, descending)[0] == pytest.approx(expected, abs=1e-9)
+
+
+def test_time_of_flight_orders_crossings():
+    simulator = model(100, 50)
+    simulator.run()
+    assert 0 < simulator.time_of_flight(50, False) < simulator.time_of_flight(50) < simulator.time_of_flight()
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from projectilepy import model
+
+PROJECTILE = {"drag": "Newtonian", "mass": 43, "drag_coefficient": 0.45, "cross_sectional_area": 0.1}
+
+
+@pytest.mark.parametrize("options", [{"record_every": 7}, {"record": "endpoints"}])
+def test_decimated_recording_keeps_summaries(options):
+    simulator = model(150, 30, **PROJECTILE)
+    simulator.run(stop_height=-10)
+    full = (simulator.final_position(), simulator.max_height(), simulator.time_of_flight(-10),
+            simulator.surface_impact(-10), len(simulator.trajectory))
+    simulator.run(stop_height=-10, **options)
+    assert simulator.final_position() == full[0]
+    assert simulator.max_height() == full[1]
+    assert simulator.time_of_flight(-10) == pytest.approx(full[2], abs=1e-12)
+    assert simulator.surface_impact(-10) == pytest.approx(full[3], abs=1e-9)
+    assert len(simulator.trajectory) < full[4]
+
+
+def test_iter_run_generates_every_state():
+    simulator = model(150, 30, **PROJECTILE)
+    simulator.run()
+    states = list(simulator.iter_run())
+    assert len(states) == len(simulator.trajectory)
+    assert np.allclose(states[-1][:5], simulator.trajectory.data[-1, :5])
@@ -0,0 +1,30 @@
+import pytest
+
+from projectilepy import model
+
+PROJECTILE = {"drag": "Newtonian", "mass": 43, "drag_coefficient": 0.45, "cross_sectional_area": 0.1}
+
+
+def impact(simulator, height, **overrides):
+    simulator.run(stop_height=height, **overrides)
+    return simulator.surface_impact(height)[0]
+
+
+@pytest.mark.parametrize("integrator", ["euler", "rk45"])
+@pytest.mark.parametrize("parameter, value, step", [("angle", 35.0, 1e-4), ("velocity", 150.0, 1e-4)])
+@pytest.mark.parametrize("height", [0, 60])
+def test_impact_sensitivity_matches_finite_difference(integrator, parameter, value, step, height):
+    simulator = model(150, 35, integrator=integrator, **PROJECTILE)
+    override = "override_" + parameter
+    simulator.run(stop_height=height, sensitivity=parameter, **{override: value})
+    derivative = simulator.surface_impact_derivative(height)
+    difference = (impact(simulator, height, **{override: value + step}) -
+                  impact(simulator, height, **{override: value - step})) / (2 * step)
+    assert derivative == pytest.approx(difference, rel=1e-4 if integrator == "euler" else 1e-3)
+
+
+def test_sensitivity_needs_a_sensitivity_run():
+    simulator = model(150, 35, **PROJECTILE)
+    simulator.run()
+    with pytest.raises(AssertionError):
+        simulator.surface_impact_derivative(0)
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from projectilepy import AsyncService, model
+
+
+def newtonian():
+    return model(150, 30, drag="Newtonian", mass=43, drag_coefficient=0.45, cross_sectional_area=0.1)
+
+
+def test_identical_requests_are_coalesced():
+    service = AsyncService(max_concurrency=2)
+    config = newtonian().simulation_config()
+
+    async def solve():
+        first = service.solve_angle(config, [700, 0])
+        second = service.solve_angle(config, [700, 0])
+        return await asyncio.gather(first, second)
+
+    try:
+        first, second = asyncio.run(solve())
+    finally:
+        service.shutdown()
+    assert first is second
+    assert first.value == newtonian().solve_angle([700, 0])
+    assert service.in_flight == 0
+
+
+def test_timeouts_cancel_the_simulation():
+    service = AsyncService(max_concurrency=1)
+    config = model(150, 30, time_step=1e-7).simulation_config()
+
+    async def simulate():
+        with pytest.raises(asyncio.TimeoutError):
+            await service.simulate(config, timeout=0.05)
+        return service.in_flight
+
+    try:
+        assert asyncio.run(simulate()) == 0
+    finally:
+        service.shutdown()
+
+
+def test_solve_angle_async_matches_solve_angle():
+    simulator = newtonian()
+    assert asyncio.run(simulator.solve_angle_async([700, 0])) == simulator.solve_angle([700, 0])
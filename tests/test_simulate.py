@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from projectilepy import SimulationConfig, model, simulate
+
+
+def newtonian():
+    return model(150, 30, drag="Newtonian", mass=43, drag_coefficient=0.45, cross_sectional_area=0.1)
+
+
+def test_simulate_matches_run():
+    simulator = newtonian()
+    simulator.run(stop_height=-5)
+    trajectory = simulate(simulator.simulation_config(), stop_height=-5)
+    assert np.array_equal(trajectory.data, simulator.trajectory.data)
+
+
+def test_configs_are_immutable_and_hashable():
+    config = newtonian().simulation_config()
+    with pytest.raises(AttributeError):
+        config.mass = 1
+    assert config == newtonian().simulation_config()
+    assert len({config, newtonian().simulation_config()}) == 1
+    assert config.replace(mass=20).mass == 20
+    assert isinstance(config.replace(mass=20), SimulationConfig)
+
+
+def test_simulate_is_thread_safe():
+    configs = [newtonian().simulation_config(override_angle=float(angle)) for angle in [20, 40, 60, 20]]
+    with ThreadPoolExecutor(4) as executor:
+        trajectories = list(executor.map(simulate, configs))
+    assert np.array_equal(trajectories[0].data, trajectories[3].data)
+    assert np.array_equal(trajectories[1].data, simulate(configs[1]).data)
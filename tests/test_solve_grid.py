@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from projectilepy import SolveResult, model
+
+PROJECTILE = {"drag": "Newtonian", "mass": 43, "drag_coefficient": 0.45, "cross_sectional_area": 0.1}
+
+
+def impact_miss(simulator, target, **overrides):
+    simulator.run(stop_height=target[1], **overrides)
+    return simulator.surface_impact(target[1])[0] - target[0]
+
+
+@pytest.mark.parametrize("lofted", [False, True])
+def test_solve_grid_matches_solve_angle(lofted):
+    simulator = model(150, 30, **PROJECTILE)
+    grid = simulator.solve_grid([500, 700, 900], [0, 40], lofted)
+    for row, height in enumerate([0, 40]):
+        for column, distance in enumerate([500, 700, 900]):
+            assert abs(impact_miss(simulator, [distance, height], override_angle=float(grid[row, column]))) < 0.1
+            assert grid[row, column] == pytest.approx(simulator.solve_angle([distance, height], lofted), abs=0.05)
+
+
+def test_warm_starts_need_fewer_simulations():
+    simulator = model(150, 30, **PROJECTILE)
+    ranges = np.linspace(300, 900, 13)
+    result = simulator.solve_grid(ranges, [0], full_output=True)
+    assert np.all(result["status"] == SolveResult.SOLVED)
+    cold = sum(simulator.solve_angle([distance, 0], full_output=True).simulations for distance in ranges.tolist())
+    assert result["simulations"].sum() < cold
+    assert np.all(result["simulations"][0, 2:] <= 3)
+
+
+def test_targets_beyond_the_envelope_are_not_simulated():
+    simulator = model(150, 30, **PROJECTILE)
+    result = simulator.solve_grid([900, 5000, 700], [0], full_output=True)
+    assert result["status"][0, 1] == SolveResult.UNREACHABLE
+    assert np.isnan(result["angle"][0, 1]) and result["simulations"][0, 1] == 0
+    assert result["status"][0, 0] == result["status"][0, 2] == SolveResult.SOLVED
+
+
+def test_analytic_grid_matches_solve_angle():
+    simulator = model(120, 30, integrator="analytic", drag="Stokes", mass=2.0, drag_coefficient=0.1)
+    grid = simulator.solve_grid([200, 400, 800], [0, 30])
+    for row, height in enumerate([0, 30]):
+        for column, distance in enumerate([200, 400, 800]):
+            angle = simulator.solve_angle([distance, height])
+            assert np.isnan(grid[row, column]) if angle is None else grid[row, column] == angle
+    assert not np.all(np.isnan(grid))
@@ -0,0 +1,72 @@
+import pytest
+
+from projectilepy import SolveResult, model
+
+PROJECTILE = {"drag": "Newtonian", "mass": 43, "drag_coefficient": 0.45, "cross_sectional_area": 0.1}
+
+
+def impact_miss(simulator, target, **overrides):
+    simulator.run(stop_height=target[1], **overrides)
+    return simulator.surface_impact(target[1])[0] - target[0]
+
+
+@pytest.mark.parametrize("integrator", ["euler", "rk45"])
+@pytest.mark.parametrize("target, lofted", [([900, 0], False), ([900, 0], True), ([600, 80], True),
+                                            ([700, -60], False)])
+def test_solve_angle_hits_target(integrator, target, lofted):
+    simulator = model(150, 30, integrator=integrator, **PROJECTILE)
+    result = simulator.solve_angle(target, lofted, max_error=0.1, full_output=True)
+    assert result.status == SolveResult.SOLVED
+    assert result.value == result.history[-1][0]
+    assert abs(impact_miss(simulator, target, override_angle=result.value)) < 0.1
+    assert (result.value > simulator.max_range(target[1])[0]) == lofted
+
+
+def test_solve_angle_returns_verified_launch():
+    simulator = model(827, 30, integrator="rk45", drag="Newtonian", mass=43, drag_coefficient=1,
+                      cross_sectional_area=0.0188, drag_table="G1")
+    target = [9607.7, 516.4]
+    result = simulator.solve_angle(target, True, max_error=0.1, full_output=True)
+    assert result.value == result.history[-1][0]
+    assert abs(impact_miss(simulator, target, override_angle=result.value)) < 0.1
+
+
+def test_solve_velocity_hits_target():
+    simulator = model(150, 35, **PROJECTILE)
+    result = simulator.solve_velocity([1200, 20], max_error=0.1, full_output=True)
+    assert result.status == SolveResult.SOLVED
+    assert abs(impact_miss(simulator, [1200, 20], override_velocity=result.value)) < 0.1
+
+
+@pytest.mark.parametrize("integrator", ["euler", "rk45"])
+def test_unreachable_targets_are_rejected(integrator):
+    simulator = model(150, 30, integrator=integrator, **PROJECTILE)
+    assert simulator.solve_angle([5000, 0]) is None
+    assert simulator.last_solve_result.status == SolveResult.UNREACHABLE
+    assert simulator.solve_angle([100, 2000], True) is None
+
+
+@pytest.mark.parametrize("integrator, drag", [("euler", PROJECTILE), ("rk45", PROJECTILE), ("analytic", {}),
+                                              ("analytic", {"drag": "Stokes", "mass": 2.0, "drag_coefficient": 0.1})])
+@pytest.mark.parametrize("angle", [90, 90 - 1e-9])
+def test_vertical_launches_have_no_velocity_solution(integrator, drag, angle):
+    simulator = model(150, angle, integrator=integrator, **drag)
+    assert simulator.solve_velocity([500, 0]) is False
+    assert simulator.last_solve_result.status == SolveResult.UNREACHABLE
+    assert simulator.last_solve_result.simulations == 0
+
+
+@pytest.mark.parametrize("drag", [{}, PROJECTILE])
+def test_near_vertical_velocity_solves_are_bounded(drag):
+    simulator = model(150, 89.999, **drag)
+    assert simulator.solve_velocity([500, 0]) is False
+    assert simulator.last_solve_result.status == SolveResult.OUT_OF_RANGE
+    assert simulator.last_solve_result.steps < 10 ** 6
+
+
+def test_rejection_from_envelope_needs_no_simulations():
+    simulator = model(150, 30, **PROJECTILE)
+    simulator.max_range()
+    result = simulator.solve_angle([5000, 0], full_output=True)
+    assert result.status == SolveResult.UNREACHABLE
+    assert result.simulations == 0
@@ -0,0 +1,32 @@
+import pytest
+
+from projectilepy import SolveResult, model
+
+
+def test_counters_and_observer():
+    simulator = model(150, 30, drag="Newtonian", mass=43, drag_coefficient=0.45, cross_sectional_area=0.1)
+    events = []
+    simulator.observer = lambda event, details: events.append(event)
+    simulator.run()
+    assert simulator.counters.simulations == 1
+    assert simulator.counters.steps > 0
+    result = simulator.solve_angle([700, 0], full_output=True)
+    assert result.success and result.status == SolveResult.SOLVED
+    assert simulator.last_solve_result is result
+    assert result.iterations == len(result.history) > 0
+    assert simulator.counters.solves == 1
+    assert "simulation" in events
+    simulator.counters.reset()
+    assert simulator.counters.snapshot()["simulations"] == 0
+
+
+@pytest.mark.parametrize("integrator, events", [("euler", 0), ("rk45", 1)])
+def test_steps_count_integration_steps(integrator, events):
+    simulator = model(150, 30, integrator=integrator, drag="Newtonian", mass=43, drag_coefficient=0.45,
+                      cross_sectional_area=0.1)
+    simulator.run()
+    steps = simulator.counters.steps
+    assert steps == len(simulator.trajectory) - 1 - events
+    simulator.run(record_every=5)
+    simulator.run(record="endpoints")
+    assert simulator.counters.steps == 3 * steps
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from projectilepy import Trajectory, model
+
+
+def test_storage_grows_and_returns_views():
+    trajectory = Trajectory(capacity=2)
+    for step in range(10):
+        trajectory.append(0.1 * step, step, 10 - step, 1.0, -1.0)
+    assert len(trajectory) == 10
+    assert np.array_equal(trajectory.x, np.arange(10))
+    assert np.shares_memory(trajectory.positions, trajectory.data)
+    trajectory.extend(np.ones((3, 5)))
+    assert len(trajectory) == 13
+
+
+def test_frozen_trajectories_are_read_only():
+    simulator = model(100, 45)
+    simulator.run()
+    trajectory = simulator.trajectory
+    trajectory.freeze()
+    with pytest.raises(ValueError):
+        trajectory.data[0, 0] = 1.0
+
+
+def test_from_data_wraps_without_copying():
+    data = np.zeros((4, 5))
+    data[:, Trajectory.Y] = [0, 2, 1, -1]
+    trajectory = Trajectory.from_data(data)
+    assert np.shares_memory(trajectory.data, data)
+    assert trajectory.apex_index == 1